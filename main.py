@@ -22,22 +22,90 @@ Academic Project: Python B1 2025-2026
 # ============================================================================
 # IMPORTS - All dependencies organized by purpose
 # ============================================================================
-from packages import STRATEGIES, EXPORTERS  # Our 34 scanning modules + exporters
+from packages import STRATEGIES, EXPORTERS, SHARED_INPUTS, STRATEGY_SCOPES  # Our 34 scanning modules + exporters (imported on first use)
+from packages.strategy_graph import StrategyGraph  # Strategies that reuse other strategies' results
+from packages.zone_cuts import ZoneCuts  # Apex vs host detection for strategy gating
 from packages.wordlist_utils import load_wordlist, get_default_subdomains, get_default_srv_services
+from packages.query_broker import QueryBroker, get_broker, set_broker  # Shared, coalescing DNS lookups
+from packages.disk_cache import DiskCache, DEFAULT_CACHE_FILE  # Persistent answer cache
+from packages.negative_cache import NegativeCache  # RFC 2308 NXDOMAIN/NODATA cache
+from packages.resolver_pool import ResolverPool  # Load-balanced upstream resolvers
+from packages.rate_limit import ZoneRateLimiter  # Per-zone QPS ceiling
+from packages.iterative_resolver import IterativeResolver  # Root-down resolution
+from packages.async_engine import AsyncScanEngine  # Event-loop scan engine (--engine async)
 from datetime import datetime  # For timestamping scan results
-from concurrent.futures import ThreadPoolExecutor, as_completed  # Parallel execution
+from packages.executor import BoundedExecutor, get_executor, set_executor  # One shared worker budget
+from packages.bulkhead import Bulkheads, get_bulkheads, set_bulkheads  # Own lanes for slow strategies
+from packages.deadline import Deadline, deadline_scope  # Scan/domain time limits seen by every query
+from packages.result_store import ResultStore, ShardedSet  # Results shared by all workers
+from packages.memo import get_memo  # Verdicts shared by domains on the same infrastructure
+from packages.records import Host, Finding, discoveries, plain  # Typed strategy results
+from packages.planner import ScanPlanner  # --time-budget / --query-budget / --dry-run
+from concurrent.futures import FIRST_COMPLETED, Future, wait  # Parallel execution
+import collections  # Per-depth frontier counters
+import heapq  # Best-first frontier
+import itertools  # Frontier tie-breaker (discovery order)
+import threading  # Guards the frontier shared by all workers
 import dns.resolver  # Core DNS query library (dnspython)
 import sys  # For exit codes and error handling
 
 # ============================================================================
 # DNS RESOLVER CONFIGURATION - Optimized for speed
 # ============================================================================
-# Global DNS resolver with aggressive timeouts for maximum throughput
-# LRUCache prevents redundant queries for same domain
-resolver = dns.resolver.Resolver()
-resolver.timeout = 1  # Wait max 1 second per query (aggressive)
-resolver.lifetime = 2  # Total time for query including retries
-resolver.cache = dns.resolver.LRUCache()  # Cache DNS responses in memory
+def configure_broker(args):
+    """
+    Build the shared query broker every strategy routes through.
+
+    Identical concurrent lookups are collapsed into one wire query; repeated
+    ones are served from the persistent on-disk cache (shared with other
+    runs and processes) or, with --no-cache, from an in-memory LRUCache.
+    Names known not to exist (and everything below them) never hit the wire,
+    and with the on-disk cache that knowledge is kept for later runs too.
+    Wire queries are spread over --nameserver upstreams (or /etc/resolv.conf),
+    under per-upstream (--upstream-qps) and per-zone (--zone-qps) QPS ceilings.
+    With --iterative, no upstream is used: queries walk down from the root hints.
+    """
+    # Upstream resolvers: adaptive per-attempt timeout capped at --timeout,
+    # slow queries hedged to a second upstream, failover to the next upstream
+    # and paced under --upstream-qps; --transport tcp/tls pipelines over pooled
+    # connections, https multiplexes over one HTTP/2 connection
+    # Queries in flight per upstream adapt (AIMD) up to --threads
+    concurrency = args.threads if args.adaptive else None
+    pool_options = {'timeout': args.timeout, 'hedge': args.hedge, 'concurrency': concurrency,
+                    'qps': args.upstream_qps or None, 'transport': args.transport}
+    if args.iterative:
+        # --upstream-qps then applies to each authoritative server
+        hints = IterativeResolver.load_root_hints(args.root_hints) if args.root_hints else None
+        pool = IterativeResolver(root_hints=hints, timeout=args.timeout, hedge=args.hedge,
+                                 qps=args.upstream_qps or None, concurrency=concurrency)
+    else:
+        try:
+            if args.nameserver:
+                pool = ResolverPool(ResolverPool.load_nameservers(args.nameserver), **pool_options)
+            else:
+                pool = ResolverPool.from_system(**pool_options)
+        except ImportError:
+            if args.transport != 'https':
+                raise
+            # Reported like argparse reports a bad option, not as a crash
+            print("dns_mapper: error: --transport https needs httpx with HTTP/2 support, "
+                  "install it with: pip install 'httpx[http2]'", file=sys.stderr)
+            sys.exit(2)
+
+    cache = dns.resolver.LRUCache()
+    if args.cache:
+        try:
+            cache = DiskCache(args.cache_file or DEFAULT_CACHE_FILE)
+        except (OSError, ValueError) as e:
+            print(f"{Fore.YELLOW}[!] Persistent cache unavailable ({e}), using memory cache{Style.RESET_ALL}")
+
+    zone_limiter = ZoneRateLimiter(args.zone_qps) if args.zone_qps else None
+    # NXDOMAIN/NODATA answers are persisted next to the positive ones
+    store = cache if isinstance(cache, DiskCache) else None
+    broker = QueryBroker(pool, cache=cache, negative_cache=NegativeCache(store=store),
+                         zone_limiter=zone_limiter)
+    set_broker(broker)
+    return broker
 
 # ============================================================================
 # COLORAMA - Terminal color support for beautiful output
@@ -66,7 +134,7 @@ class DNSMapper:
     PRESENTATION EXPLANATION:
     This class orchestrates all 34 scanning modules and manages:
     - Recursive domain/IP discovery (depth-first traversal)
-    - Parallel execution with ThreadPoolExecutor (up to 60 threads)
+    - Parallel execution on one shared, bounded thread pool (up to 60 threads)
     - Result aggregation and deduplication
     - Early termination when max results reached
     - Beautiful terminal output with visual indicators
@@ -95,18 +163,36 @@ class DNSMapper:
         self.args = args
         self.domain = args.domain
         
-        # RESULT STORAGE - Dictionaries and sets for efficient lookups
-        self.results = {}  # Main results: {strategy_name: [results]}
-        self.all_domains = set([self.domain])  # All discovered domains (deduped)
-        self.all_ips = set()  # All discovered IPs (deduped)
+        # RESULT STORAGE - Sharded and thread-safe, written by every worker
+        self.results = ResultStore()  # Main results: {strategy_name: [results]}, counted for --max-results
+        self.all_domains = ShardedSet([self.domain])  # All discovered domains (deduped)
+        self.all_ips = ShardedSet()  # All discovered IPs (deduped)
+        
+        # FRONTIER - Discovered targets waiting to be processed, best first:
+        # heap of (score, order, kind, target, depth)
+        self.frontier = []
+        self._frontier_order = itertools.count()
+        self._frontier_lock = threading.Lock()
+        self._frontier_signal = Future()  # Completed by the next discovery
+        self._scheduled = collections.Counter()  # (kind, depth) -> targets taken
+        # Each domain fans out ~34 strategies on the same workers, so only a
+        # few targets are expanded at once; the rest wait in score order
+        self.targets_in_flight = max(1, args.threads // 8) if args.parallel else 1
+        self._detached = 0  # Slow-lane strategies still running for finished domains
+        
+        # ZONE CUTS - Apex-only strategies skip names below a zone apex
+        self.zone_cuts = ZoneCuts()
+        
+        # PLUGINS - Strategies other packages register through entry points
+        self.plugin_strategies = {name: name for name in STRATEGIES.discover()}
         
         # VISITED TRACKING - Prevents scanning same target twice
-        self.visited_domains = set()  # Already processed domains
-        self.visited_ips = set()  # Already processed IPs
+        self.visited_domains = ShardedSet()  # Already processed domains
+        self.visited_ips = ShardedSet()  # Already processed IPs
         
         # PERFORMANCE METRICS
-        self.result_count = 0  # Total results found
         self.max_reached = False  # Flag for early termination
+        self.deadline = Deadline()  # Scan deadline (--scan-timeout, set by run()), cancelled on early termination
     
     # ========================================================================
     # UTILITY METHODS - Logging and DNS helpers
@@ -143,9 +229,9 @@ class DNSMapper:
         print(f"{color}{Style.BRIGHT}{icon} {msg}{Style.RESET_ALL}")
     
     def get_a_records(self, domain):
-        """Quick A record lookup with LRUCache for performance."""
+        """Quick A record lookup through the shared query broker."""
         try:
-            answers = resolver.resolve(domain, 'A')
+            answers = get_broker().resolve(domain, 'A')
             return [str(rdata) for rdata in answers]
         except:
             return []
@@ -154,42 +240,22 @@ class DNSMapper:
     # STRATEGY EXECUTION - Running individual scan modules
     # ========================================================================
     
-    def run_strategy(self, strategy_name, target, depth=0):
+    def run_strategy(self, strategy_name, target, depth=0, inputs=None):
         """
         Execute a scanning strategy (SPF, MX, NS, etc.).
         Handles special cases: srv (needs services), subdomains (needs wordlist), ip_neighbors (needs range).
+        inputs are results of other strategies it reuses (see StrategyGraph).
         """
-        # Respect max depth limit
-        if depth > self.args.depth:
-            return []
-        
-        # Check if user disabled this strategy (--disable flag)
-        disable_flag = f"disable_{strategy_name}"
-        if hasattr(self.args, disable_flag) and getattr(self.args, disable_flag):
+        if strategy_name in SHARED_INPUTS:
+            return SHARED_INPUTS[strategy_name](target)
+        if not self.strategy_enabled(strategy_name, depth):
             return []
         
         try:
             if strategy_name in STRATEGIES:
                 self.log(f"Running {strategy_name} on {target}", 'debug')
-                
-                # Handle strategies with special parameters
-                if strategy_name == 'srv':
-                    services = load_wordlist(self.args.srv_services) if self.args.srv_services else get_default_srv_services()
-                    return STRATEGIES[strategy_name](target, services)
-                elif strategy_name == 'subdomains':
-                    if self.args.subdomain_wordlist:
-                        wordlist = load_wordlist(self.args.subdomain_wordlist)
-                    elif self.args.subdomain_quick:
-                        wordlist = get_default_subdomains()[:20]
-                    elif self.args.subdomain_thorough:
-                        wordlist = get_default_subdomains()
-                    else:
-                        wordlist = get_default_subdomains()[:40]
-                    return STRATEGIES[strategy_name](target, wordlist)
-                elif strategy_name == 'ip_neighbors':
-                    return STRATEGIES[strategy_name](target, self.args.neighbor_range)
-                else:
-                    return STRATEGIES[strategy_name](target)
+                return STRATEGIES[strategy_name](target, *self.strategy_params(strategy_name),
+                                                 **(inputs or {}))
         
         except Exception as e:
             # Graceful error handling - continue with other strategies
@@ -199,145 +265,355 @@ class DNSMapper:
                 traceback.print_exc()
         return []  # Return empty on error
     
+    def strategy_enabled(self, strategy_name, depth=0):
+        """False past max depth or when the user disabled the strategy (--disable flag)."""
+        if depth > self.args.depth:
+            return False
+        disable_flag = f"disable_{strategy_name}"
+        return not getattr(self.args, disable_flag, False)
+    
+    def strategy_params(self, strategy_name):
+        """
+        Extra arguments after the target for strategies that need them:
+        srv (needs services), subdomains (needs wordlist), ip_neighbors (needs range).
+        """
+        if strategy_name == 'srv':
+            services = load_wordlist(self.args.srv_services) if self.args.srv_services else get_default_srv_services()
+            return (services,)
+        elif strategy_name == 'subdomains':
+            if self.args.subdomain_wordlist:
+                wordlist = load_wordlist(self.args.subdomain_wordlist)
+            elif self.args.subdomain_quick:
+                wordlist = get_default_subdomains()[:20]
+            elif self.args.subdomain_thorough:
+                wordlist = get_default_subdomains()
+            else:
+                wordlist = get_default_subdomains()[:40]
+            return (wordlist,)
+        elif strategy_name == 'ip_neighbors':
+            return (self.args.neighbor_range,)
+        return ()
+    
     # ========================================================================
     # DOMAIN PROCESSING - Core scanning logic
     # ========================================================================
     
-    def process_domain(self, domain, depth=0):
+    # Execute all 34 strategies (organized by category)
+    DOMAIN_STRATEGIES = {
+        # Core DNS
+        'ns': 'ns', 'soa': 'soa', 'mx': 'mx', 'aaaa': 'aaaa', 'cname': 'cname', 'txt': 'txt', 'ttl': 'ttl',
+        # Email Security
+        'spf': 'spf', 'dmarc': 'dmarc', 'bimi': 'bimi', 'mta_sts': 'mta_sts', 'mail_blacklist': 'mail_blacklist',
+        # DNSSEC
+        'dnssec': 'dnssec', 'dnskey': 'dnskey', 'ds': 'ds', 'nsec': 'nsec',
+        # Certificates & Security
+        'caa': 'caa', 'tlsa': 'tlsa', 'sshfp': 'sshfp', 'cert': 'cert', 'hinfo': 'hinfo',
+        # Services
+        'srv': 'srv', 'naptr': 'naptr', 'loc': 'loc',
+        # Infrastructure
+        'anycast': 'anycast', 'loadbalancer': 'loadbalancer', 'cdn_enhanced': 'cdn_enhanced', 'domain_age': 'domain_age',
+        # Discovery
+        'subdomains': 'subdomains', 'crawl_tld': 'crawl_tld', 'axfr': 'axfr', 'wildcard': 'wildcard',
+        # Misc
+        'http_headers': 'http_headers', 'security_txt': 'security_txt',
+    }
+    
+    # Run by process_ip on every address
+    IP_STRATEGIES = ('geolocation', 'ptr', 'reverse', 'ip_neighbors')
+    
+    def domain_strategies(self, domain, depth=0):
         """
-        Process domain with all 34 strategies in parallel.
-        Deduplicates visits, handles recursion, early terminates at max results.
+        DOMAIN_STRATEGIES (and plugin strategies) that apply to domain (see STRATEGY_SCOPES).
+        Apex-only strategies are dropped when domain is not a zone apex;
+        the scan target always gets all of them.
         """
-        # Skip if exceeded depth, already visited, or hit max results
-        if depth > self.args.depth or domain in self.visited_domains or self.max_reached:
-            return
-        
-        self.visited_domains.add(domain)
+        apex = True if depth == 0 else None
+        strategies = {}
+        for key, strategy in {**self.DOMAIN_STRATEGIES, **self.plugin_strategies}.items():
+            scope = STRATEGY_SCOPES.get(strategy, 'host')
+            if scope == 'ip':
+                continue
+            if scope == 'apex' and self.strategy_enabled(strategy, depth):
+                if apex is None:
+                    apex = self.zone_cuts.is_apex(domain)  # One cached SOA lookup
+                if not apex:
+                    continue
+            strategies[key] = strategy
+        return strategies
+    
+    def enter_domain(self, domain, depth):
+        """
+        Mark domain visited and print its tree line.
+        Returns False if it exceeded depth, was already visited, or max results were hit.
+        """
+        if depth > self.args.depth or self.max_reached:
+            return False
+        if not self.visited_domains.add(domain):
+            return False  # Already visited (or another worker just took it)
         
         # Visual tree structure output (indented by depth)
         if not self.args.quiet:
             indent = "  " * depth
             self.log(f"{indent}├─ {Fore.GREEN}{Style.BRIGHT}{domain}{Style.RESET_ALL}", 'info')
+        return True
+    
+    def log_discovery(self, key, result, depth):
+        """Afficher découvertes en arbre (verbose mode)."""
+        if result and self.args.verbose > 0 and not self.args.quiet:
+            indent = "  " * (depth + 1)
+            if isinstance(result, list) and len(result) > 0:
+                item = str(result[0])
+                if len(result) > 1:
+                    self.log(f"{indent}└─> {Fore.YELLOW}{key}{Style.RESET_ALL}: {item} (+{len(result)-1} more)", 'debug')
+                else:
+                    self.log(f"{indent}└─> {Fore.YELLOW}{key}{Style.RESET_ALL}: {item}", 'debug')
+    
+    def process_domain(self, domain, depth=0):
+        """
+        Process domain with all 34 strategies in parallel.
+        Deduplicates visits, handles recursion, early terminates at max results.
+        """
+        if not self.enter_domain(domain, depth):
+            return
         
-        # Execute all 34 strategies (organized by category)
-        strategies_map = {
-            # Core DNS
-            'ns': 'ns', 'soa': 'soa', 'mx': 'mx', 'aaaa': 'aaaa', 'cname': 'cname', 'txt': 'txt', 'ttl': 'ttl',
-            # Email Security
-            'spf': 'spf', 'dmarc': 'dmarc', 'bimi': 'bimi', 'mta_sts': 'mta_sts', 'mail_blacklist': 'mail_blacklist',
-            # DNSSEC
-            'dnssec': 'dnssec', 'dnskey': 'dnskey', 'ds': 'ds', 'nsec': 'nsec',
-            # Certificates & Security
-            'caa': 'caa', 'tlsa': 'tlsa', 'sshfp': 'sshfp', 'cert': 'cert', 'hinfo': 'hinfo',
-            # Services
-            'srv': 'srv', 'naptr': 'naptr', 'loc': 'loc',
-            # Infrastructure
-            'anycast': 'anycast', 'loadbalancer': 'loadbalancer', 'cdn_enhanced': 'cdn_enhanced', 'domain_age': 'domain_age',
-            # Discovery
-            'subdomains': 'subdomains', 'crawl_tld': 'crawl_tld', 'axfr': 'axfr', 'wildcard': 'wildcard',
-            # Misc
-            'http_headers': 'http_headers', 'security_txt': 'security_txt',
-        }
+        # Every query made for this domain gives up at its deadline
+        deadline = Deadline(self.args.domain_timeout or None, parent=self.deadline)
+        with deadline_scope(deadline):
+            self._run_strategies(domain, depth, deadline)
+    
+    def _run_strategies(self, domain, depth, deadline):
+        """Strategies of one domain, stopping at max results or at deadline."""
+        # Strategies start as soon as the results they reuse are in
+        graph = StrategyGraph(self.domain_strategies(domain, depth),
+                              lambda strategy: self.strategy_enabled(strategy, depth))
         
         # Execute strategies in parallel for 10x speedup
         if self.args.parallel:
-            with ThreadPoolExecutor(max_workers=min(len(strategies_map), 8)) as executor:
-                strategy_futures = {executor.submit(self.run_strategy, strategy, domain, depth): key 
-                                   for key, strategy in strategies_map.items()}
-                
-                for future in as_completed(strategy_futures):
-                    if self.max_reached:
-                        break
-                    key = strategy_futures[future]
-                    try:
-                        result = future.result(timeout=5)
-                        if result:
-                            self._add_result(key, result, domain)
-                            # Afficher découvertes en arbre
-                            if result and self.args.verbose > 0 and not self.args.quiet:
-                                indent = "  " * (depth + 1)
-                                if isinstance(result, list) and len(result) > 0:
-                                    item = result[0] if isinstance(result[0], str) else str(result[0])
-                                    if len(result) > 1:
-                                        self.log(f"{indent}└─> {Fore.YELLOW}{key}{Style.RESET_ALL}: {item} (+{len(result)-1} more)", 'debug')
-                                    else:
-                                        self.log(f"{indent}└─> {Fore.YELLOW}{key}{Style.RESET_ALL}: {item}", 'debug')
-                    except Exception as e:
-                        if self.args.verbose > 1:
-                            self.log(f"Strategy {key} error: {e}", 'debug')
+            bulkheads = get_bulkheads()
+            strategy_futures = {}
+            
+            def launch(nodes):
+                futures = set()
+                for node in nodes:
+                    strategy = graph.strategies[node]
+                    future = bulkheads.submit(strategy, self.run_strategy, strategy,
+                                              domain, depth, graph.inputs(node))
+                    strategy_futures[future] = node
+                    futures.add(future)
+                return futures
+            
+            def finish(future):
+                """Record one finished strategy; returns the futures it unblocked."""
+                key = strategy_futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = None
+                    if self.args.verbose > 1:
+                        self.log(f"Strategy {key} error: {e}", 'debug')
+                if result and not graph.is_shared(key):
+                    self._add_result(key, result, domain, depth)
+                    self.log_discovery(key, result, depth)
+                return launch(graph.done(key, result))
+            
+            pending = launch(graph.ready())
+            while pending and not self.max_reached and not deadline.expired():
+                if all(bulkheads.lane(graph.strategies[strategy_futures[f]]) for f in pending):
+                    # Only slow-lane strategies left: they finish in the background
+                    # and this domain's slot goes to the next target
+                    for future in pending:
+                        self._detach(future, finish, deadline)
+                    return
+                done, pending = wait(pending, timeout=deadline.timeout(),
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending |= finish(future)
+            self._settle(strategy_futures, deadline.timeout())
         else:
-            for key, strategy in strategies_map.items():
-                if self.max_reached:
-                    break
-                result = self.run_strategy(strategy, domain, depth)
-                if result:
-                    self._add_result(key, result, domain)
-    
-    def _add_result(self, key, result, domain):
-        """Add result with early termination check."""
-        if key not in self.results:
-            self.results[key] = []
-        
-        if isinstance(result, dict):
-            self.results[key].append({domain: result})
-            self.result_count += len(result.get('domains', [])[:20]) + len(result.get('ips', [])[:10])
-            for d in result.get('domains', [])[:20]:
-                self.all_domains.add(d)
-            for ip in result.get('ips', [])[:10]:
-                self.all_ips.add(ip)
-        elif isinstance(result, list):
-            limited = result[:self.args.max_per_strategy]
-            self.results[key].extend(limited)
-            self.result_count += len(limited)
-            for item in limited:
-                if isinstance(item, str) and '.' in item:
-                    if not item.replace('.', '').replace(':', '').isalnum():
-                        self.all_domains.add(item)
-        
-        if self.result_count >= self.args.max_results:
+            nodes = graph.ready()
+            while nodes and not self.max_reached and not deadline.expired():
+                key = nodes.pop(0)
+                result = self.run_strategy(graph.strategies[key], domain, depth, graph.inputs(key))
+                if result and not graph.is_shared(key):
+                    self._add_result(key, result, domain, depth)
+                nodes.extend(graph.done(key, result))
+    
+    def _add_result(self, key, result, domain, depth=0):
+        """Add result with early termination check; new targets join the frontier at depth + 1."""
+        if isinstance(result, Finding):
+            stored = [result]
+            weight = len(result.hosts[:20]) + len(result.ips[:10])
+        else:
+            stored = result[:self.args.max_per_strategy]
+            weight = len(stored)
+        count = self.results.add(key, stored, weight)
+        # Only typed Host / IP values are crawled (see packages/records.py)
+        for target in discoveries(stored):
+            if isinstance(target, Host):
+                self._discover('domain', target.name, depth + 1, key)
+            else:
+                self._discover('ip', target.address, depth + 1, key)
+        
+        if count >= self.args.max_results:
             self.max_reached = True
+            self.deadline.cancel()  # Abandon in-flight queries right away
     
     def process_ip(self, ip, depth=0):
         """Process an IP address with visual connection."""
-        if depth > self.args.depth or ip in self.visited_ips:
+        if depth > self.args.depth or not self.visited_ips.add(ip):
             return
         
-        self.visited_ips.add(ip)
         self.log(f"Checking IP {Fore.BLUE}{Style.BRIGHT}{ip}{Style.RESET_ALL}", 'debug')
         
         # Geolocation lookup (DNS-based)
         geo_result = self.run_strategy('geolocation', ip, depth)
         if geo_result:
-            if 'geolocation' not in self.results:
-                self.results['geolocation'] = []
-            self.results['geolocation'].append(geo_result)
+            self.results.add('geolocation', [geo_result], 0)
         
         # PTR records (reverse DNS)
         ptr_results = self.run_strategy('ptr', ip, depth)
         if ptr_results:
-            if 'ptr' not in self.results:
-                self.results['ptr'] = []
-            self.results['ptr'].extend(ptr_results)
-            for domain in ptr_results:
-                self.all_domains.add(domain)
+            self.results.add('ptr', ptr_results, 0)
+            for record in ptr_results:
+                self._discover('domain', record.value.name, depth + 1, 'ptr')
         
         # Reverse DNS (legacy)
-        if not self.args.disable_reverse_dns:
+        if not getattr(self.args, 'disable_reverse_dns', False):
             reverse_results = self.run_strategy('reverse', ip, depth)
             if reverse_results:
-                if 'reverse_dns' not in self.results:
-                    self.results['reverse_dns'] = []
-                self.results['reverse_dns'].extend(reverse_results)
-                for domain in reverse_results:
-                    self.all_domains.add(domain)
+                self.results.add('reverse_dns', reverse_results, 0)
+                for host in reverse_results:
+                    self._discover('domain', host.name, depth + 1, 'reverse_dns')
         
         # IP neighbors
-        if not self.args.disable_neighbors:
+        if not getattr(self.args, 'disable_neighbors', False):
             neighbors = self.run_strategy('ip_neighbors', ip, depth)
             if neighbors:
-                if 'ip_neighbors' not in self.results:
-                    self.results['ip_neighbors'] = []
-                self.results['ip_neighbors'].extend(neighbors)
+                self.results.add('ip_neighbors', neighbors, 0)
+    
+    def _detach(self, future, finish, deadline):
+        """Hand a strategy future to its completion callback; crawl() waits for these too."""
+        with self._frontier_lock:
+            self._detached += 1
+        
+        def done(future):
+            try:
+                if not self.max_reached and not deadline.expired():
+                    with deadline_scope(deadline):
+                        for unblocked in finish(future):
+                            self._detach(unblocked, finish, deadline)
+            finally:
+                with self._frontier_lock:
+                    self._detached -= 1
+                    if not self._detached and not self._frontier_signal.done():
+                        self._frontier_signal.set_result(None)
+        
+        future.add_done_callback(done)
+    
+    @staticmethod
+    def _settle(futures, timeout=None):
+        """
+        After an early stop: drop tasks that have not started, wait for the rest
+        (at most timeout seconds; past a deadline they are abandoned).
+        """
+        for future in futures:
+            future.cancel()
+        wait(futures, timeout=timeout)
+    
+    # ========================================================================
+    # FRONTIER - Streaming work queue fed by every discovery
+    # ========================================================================
+    
+    # Frontier score of the strategy that found a target: delegation and mail
+    # infrastructure first, generic reverse-DNS names last
+    SOURCE_SCORES = {
+        'ns': 0, 'mx': 0, 'cname': 0, 'axfr': 0,
+        'soa': 1, 'srv': 1, 'subdomains': 1,
+        'ptr': 3, 'reverse_dns': 3, 'ip_neighbors': 3,
+    }
+    
+    def _score(self, kind, target, depth, source):
+        """Frontier score (lower is expanded first): depth + source, out-of-scope names last."""
+        score = depth + self.SOURCE_SCORES.get(source, 2)
+        if kind == 'domain':
+            name = target.rstrip('.').lower()
+            if name != self.domain and not name.endswith('.' + self.domain):
+                score += 3
+        return score
+    
+    def _discover(self, kind, target, depth, source=None):
+        """Record a newly found domain or IP and queue it for processing at depth."""
+        seen = self.all_domains if kind == 'domain' else self.all_ips
+        if not seen.add(target) or depth > self.args.depth:
+            return
+        score = self._score(kind, target, depth, source)
+        with self._frontier_lock:
+            heapq.heappush(self.frontier, (score, next(self._frontier_order), kind, target, depth))
+            if not self._frontier_signal.done():
+                self._frontier_signal.set_result(None)
+    
+    def _take_frontier(self, limit):
+        """
+        Up to limit best-scored targets, and a future completed by the next discovery.
+        At most max_per_strategy targets of each kind are taken per depth level.
+        """
+        items = []
+        with self._frontier_lock:
+            while self.frontier and len(items) < limit:
+                _, _, kind, target, depth = heapq.heappop(self.frontier)
+                if self._scheduled[kind, depth] >= self.args.max_per_strategy:
+                    continue
+                self._scheduled[kind, depth] += 1
+                items.append((kind, target, depth))
+            self._frontier_signal = Future()
+            return items, self._frontier_signal
+    
+    def _seed_frontier(self):
+        """Queue the target domain (already in all_domains) as the first item."""
+        with self._frontier_lock:
+            heapq.heappush(self.frontier, (0, next(self._frontier_order), 'domain', self.domain, 0))
+    
+    def _stop_log(self):
+        if self.max_reached:
+            self.log(f"[!] Max results reached - stopping scan ({len(self.frontier)} queued targets left)", 'info')
+        elif self.deadline.expired():
+            self.log(f"[!] Scan timeout reached - stopping scan ({len(self.frontier)} queued targets left)", 'info')
+    
+    def crawl(self):
+        """
+        Thread engine: the best queued targets are submitted to the shared
+        executor as soon as a slot frees up, whatever their depth; no level
+        waits for the previous one to finish.
+        """
+        with deadline_scope(self.deadline):
+            self._crawl()
+    
+    def _crawl(self):
+        self._seed_frontier()
+        executor = get_executor()
+        pending = set()
+        
+        while not self.max_reached and not self.deadline.expired():
+            items, signal = self._take_frontier(self.targets_in_flight - len(pending))
+            for kind, target, depth in items:
+                work = self.process_domain if kind == 'domain' else self.process_ip
+                if self.args.parallel:
+                    pending.add(executor.submit(work, target, depth))
+                elif not self.max_reached:
+                    work(target, depth)
+            if not pending:
+                if signal.done() or self.frontier:
+                    continue  # Tasks run by their caller queued more targets
+                if not self._detached:
+                    break
+                # Only detached slow strategies left: wait for what they discover
+            # Wake up for a finished target or for a new discovery
+            _, pending = wait(pending | {signal}, timeout=self.deadline.timeout(),
+                              return_when=FIRST_COMPLETED)
+            pending.discard(signal)
+        
+        self._stop_log()
+        self._settle(pending, self.deadline.timeout())
     
     def run(self):
         """Main execution logic with beautiful UI."""
@@ -356,47 +632,15 @@ class DNSMapper:
             print(f"{Fore.CYAN}{'-' * 60}{Style.RESET_ALL}\n")
         
         start_time = datetime.now()
+        self.deadline = Deadline(self.args.scan_timeout or None)
         
-        # Process initial domain
-        self.process_domain(self.domain, depth=0)
-        
-        # Recursive processing with early termination
-        for current_depth in range(1, self.args.depth + 1):
-            if self.max_reached:
-                self.log("[!] Max results reached - stopping scan", 'info')
-                break
-                
-            # Process discovered domains
-            domains_to_process = [d for d in self.all_domains if d not in self.visited_domains]
-            
-            if self.args.parallel:
-                with ThreadPoolExecutor(max_workers=self.args.threads) as executor:
-                    futures = [executor.submit(self.process_domain, d, current_depth) 
-                              for d in domains_to_process[:self.args.max_per_strategy]]
-                    for future in as_completed(futures):
-                        if self.max_reached:
-                            break
-            else:
-                for domain in domains_to_process[:self.args.max_per_strategy]:
-                    if self.max_reached:
-                        break
-                    self.process_domain(domain, current_depth)
-            
-            if self.max_reached:
-                break
-            
-            # Process discovered IPs (limit batch)
-            ips_to_process = [ip for ip in self.all_ips if ip not in self.visited_ips][:self.args.max_per_strategy]
-            
-            if self.args.parallel:
-                with ThreadPoolExecutor(max_workers=self.args.threads) as executor:
-                    futures = [executor.submit(self.process_ip, ip, current_depth) 
-                              for ip in ips_to_process[:self.args.max_per_strategy]]
-                    for future in as_completed(futures):
-                        pass
-            else:
-                for ip in ips_to_process[:self.args.max_per_strategy]:
-                    self.process_ip(ip, current_depth)
+        if self.args.engine == 'async':
+            # One event loop; --threads bounds strategy calls in flight
+            engine = AsyncScanEngine(self, self.args.threads)
+            engine.run()
+        else:
+            engine = None
+            self.crawl()
         
         # Filter hidden providers
         if self.args.hide_providers:
@@ -408,6 +652,53 @@ class DNSMapper:
         print(f"\n{Fore.CYAN}{Style.BRIGHT}{'-' * 60}{Style.RESET_ALL}")
         self.log(f"Scan completed in {Fore.YELLOW}{Style.BRIGHT}{elapsed:.2f}s{Style.RESET_ALL}", 'success')
         self.log(f"Found {Fore.GREEN}{Style.BRIGHT}{len(self.all_domains)}{Style.RESET_ALL} domains | {Fore.BLUE}{Style.BRIGHT}{len(self.all_ips)}{Style.RESET_ALL} IPs", 'success')
+        stats = get_broker().stats
+        self.log(f"DNS queries: {stats['queries']} requested • {stats['sent']} sent • "
+                 f"{stats['coalesced']} coalesced • {stats['cache_hits']} cached • "
+                 f"{stats['negative_hits']} negative", 'info')
+        if self.args.verbose > 0:
+            pool_stats = get_executor().stats
+            self.log(f"Workers: {pool_stats['peak_in_flight']} peak in flight of {get_executor().max_workers} • "
+                     f"{pool_stats['submitted']} tasks • {pool_stats['caller_runs']} run by their caller", 'info')
+        if self.args.verbose > 0:
+            for lane in get_bulkheads().lanes.values():
+                self.log(f"Lane {lane.name}: {lane.stats['submitted']} calls • "
+                         f"{lane.stats['peak_queued']} peak queued on {lane.workers} workers", 'info')
+        if engine is not None and self.args.verbose > 0:
+            self.log(f"Async engine: {engine.stats['coroutines']} coroutine strategy calls • "
+                     f"{engine.stats['shimmed']} through the sync shim", 'info')
+        if self.args.verbose > 0:
+            cuts = self.zone_cuts.stats
+            self.log(f"Zone cuts: {cuts['apexes']} apexes • {cuts['hosts']} hosts without apex-only "
+                     f"strategies • {cuts['unknown']} unknown", 'info')
+        memo = get_memo().summary()
+        if memo:
+            self.log("Memoized analyses: " + ' • '.join(
+                f"{kind} {counts['hits'] + counts['coalesced']} hits / {counts['misses']} computed"
+                for kind, counts in memo.items()), 'info')
+        limiter = get_broker().zone_limiter
+        if limiter is not None:
+            throttled = sum(z['wait_seconds'] for z in limiter.summary())
+            self.log(f"Zone rate limit: {len(limiter.summary())} zones • {throttled:.1f}s thread time spent waiting", 'info')
+        latency = get_broker().pool.latency_report()
+        if latency['hedges'] or self.args.verbose > 0:
+            self.log(f"Hedged queries: {latency['hedges']} fired • {latency['hedge_wins']} won • "
+                     f"p99 {latency['p99_ms']} ms ({latency['p99_unhedged_ms']} ms without hedging)", 'info')
+        upstreams = get_broker().pool.summary()
+        if len(upstreams) > 1 or self.args.verbose > 0:
+            # Stream transports (tcp/tls/https) time out on the TCP estimator; --iterative is UDP
+            estimator = 'udp' if self.args.iterative or self.args.transport == 'udp' else 'tcp'
+            for up in upstreams:
+                state = f"{Fore.RED}ejected{Style.RESET_ALL}" if up['ejected'] else f"{Fore.GREEN}healthy{Style.RESET_ALL}"
+                self.log(f"  {up['upstream']}: {up['sent']} sent • {up['failures']} failed • "
+                         f"{up['latency_ms']} ms srtt • {up['timeout_ms'][estimator]} ms timeout • "
+                         f"{up['throttled_s']}s throttled • {state}", 'info')
+        for up in upstreams:
+            limit = up.get('concurrency')
+            if limit:
+                history = ' → '.join(f"{t}s:{n}" for t, n in limit['history'])
+                self.log(f"Concurrency {up['upstream']}: {limit['limit']} in flight allowed "
+                         f"(peak {limit['peak_limit']}, {limit['decreases']} cuts) • {history}", 'info')
         print(f"{Fore.CYAN}{Style.BRIGHT}{'-' * 60}{Style.RESET_ALL}\n")
         
         return self.build_output()
@@ -415,26 +706,25 @@ class DNSMapper:
     def filter_results(self):
         """Filter out hidden providers."""
         for provider in self.args.hide_providers:
-            for key in list(self.results.keys()):
-                if isinstance(self.results[key], list):
-                    self.results[key] = [
-                        r for r in self.results[key] 
-                        if provider.lower() not in str(r).lower()
-                    ]
+            self.results.filter(lambda r: provider.lower() not in str(plain(r)).lower())
     
     def build_output(self):
         """Build final output data structure."""
+        results = plain(self.results.snapshot())  # Abandoned strategies may still be reporting
         return {
             'domain': self.domain,
             'scan_date': datetime.now().isoformat(),
             'depth': self.args.depth,
             'max_results': self.args.max_results,
             'total_results': len(self.all_domains) + len(self.all_ips),
-            'results': self.results,
+            'results': results,
             'summary': {
                 'domains_found': len(self.all_domains),
                 'ips_found': len(self.all_ips),
-                'strategies_used': list(self.results.keys())
+                'strategies_used': list(results.keys()),
+                'dns_queries': dict(get_broker().stats),
+                'upstreams': get_broker().pool.summary(),
+                'resolver': get_broker().pool.latency_report()
             }
         }
     
@@ -703,10 +993,50 @@ class DNSMapper:
             print(f"\n{Fore.MAGENTA}{Style.BRIGHT}{'='*60}{Style.RESET_ALL}\n")
 
 
+def plan_scan(args):
+    """Estimate the scan args describe and fit it into --time-budget / --query-budget."""
+    enabled = [name for name in [*DNSMapper.DOMAIN_STRATEGIES.values(), *STRATEGIES.discover(),
+                                 *DNSMapper.IP_STRATEGIES]
+               if not getattr(args, f'disable_{name}', False)]
+    services = load_wordlist(args.srv_services) if args.srv_services else get_default_srv_services()
+    planner = ScanPlanner(enabled, args.depth, args.max_results, args.threads,
+                          fanout={'service': len(services)})
+    return planner.plan(args.time_budget or None, args.query_budget or None)
+
+
+def print_plan(plan):
+    """--dry-run output: planned queries and duration per strategy."""
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}{'=' * 60}")
+    print(f"{'SCAN PLAN (dry run, nothing sent)':^60}")
+    print(f"{'=' * 60}{Style.RESET_ALL}")
+    print(f"Depth {plan.depth} • ~{plan.targets['domains']} domains "
+          f"({plan.targets['apexes']} apexes) • ~{plan.targets['ips']} IPs\n")
+    print(f"{Style.BRIGHT}{'Strategy':<18}{'Lane':<10}{'Calls':>7}{'Queries':>10}{'Seconds':>11}{Style.RESET_ALL}")
+    for row in sorted(plan.rows, key=lambda row: -row['seconds']):
+        print(f"{row['strategy']:<18}{row['lane']:<10}{row['calls']:>7}{row['queries']:>10}"
+              f"{row['seconds']:>11.1f}")
+    print(f"{Fore.CYAN}{'-' * 56}{Style.RESET_ALL}")
+    print(f"{Style.BRIGHT}{'Total':<35}{plan.queries:>10}{Style.RESET_ALL} queries (uncached)")
+    print(f"{Style.BRIGHT}Expected duration: ~{plan.duration:.1f}s{Style.RESET_ALL}")
+    if plan.dropped:
+        print(f"{Fore.YELLOW}Dropped to fit the budget: {', '.join(plan.dropped)}{Style.RESET_ALL}")
+    print()
+
+
 def main():
     """Main entry point."""
     try:
         args = STRATEGIES["args"]()
+        if args.dry_run or args.time_budget or args.query_budget:
+            plan = plan_scan(args)
+            if args.dry_run:
+                print_plan(plan)
+                return
+            plan.apply(args)
+        configure_broker(args)
+        # Domains, strategies and per-name lookups all share --threads workers
+        set_executor(BoundedExecutor(args.threads))
+        set_bulkheads(Bulkheads.for_threads(args.threads))
         mapper = DNSMapper(args)
         data = mapper.run()
         mapper.export_results(data)
@@ -1,95 +1,116 @@
-from .argparse_args import argparse_args
-from .classify_providers import classify_providers
-from .crawl_to_tld import crawl_to_tld
-from .neighbors_ip_scan import neighbors_ip_scan
-from .reverse_dns import reverse_dns
-from .scan_axfr import scan_axfr
-from .scan_caa import scan_caa
-from .scan_cname import scan_cname
-from .scan_dmarc import scan_dmarc
-from .scan_ns import scan_ns
-from .scan_reverse_ipv6 import scan_reverse_ipv6
-from .scan_soa import scan_soa
-from .scan_spf import scan_spf
-from .scan_mx import scan_mx
-from .scan_aaaa import scan_aaaa
-from .scan_ptr import scan_ptr
-from .scan_dnssec import scan_dnssec
-from .srv_scan import srv_scan
-from .subdomains_enumeration import subdomains_enumeration
-from .txt_parse import txt_parse
-from .export_excel import export_excel
-from .export_html import export_html
-from .export_json import export_json
-from .wordlist_utils import load_wordlist, get_default_subdomains, get_default_srv_services
-from .scan_http_headers import scan_http_headers
-from .scan_wildcard import scan_wildcard
-from .scan_ttl import scan_ttl
-from .scan_common_ports import scan_common_ports
-from .scan_security_txt import scan_security_txt
-from .scan_bimi import scan_bimi
-from .scan_mta_sts import scan_mta_sts
-from .scan_geolocation import scan_geolocation
-from .scan_tlsa import scan_tlsa
-from .scan_sshfp import scan_sshfp
-from .scan_cert import scan_cert
-from .scan_hinfo import scan_hinfo
-from .scan_loc import scan_loc
-from .scan_naptr import scan_naptr
-from .scan_ds import scan_ds
-from .scan_dnskey import scan_dnskey
-from .scan_nsec import scan_nsec
-from .scan_anycast import scan_anycast
-from .scan_loadbalancer import scan_loadbalancer
-from .scan_cdn_enhanced import scan_cdn_enhanced
-from .scan_mail_blacklist import scan_mail_blacklist
-from .scan_domain_age import scan_domain_age
+"""
+Scanning strategies and exporters, imported lazily (see registry.py).
 
-STRATEGIES = {
-    "args": argparse_args,
-    "ns": scan_ns,
-    "soa": scan_soa,
-    "mx": scan_mx,
-    "aaaa": scan_aaaa,
-    "ptr": scan_ptr,
-    "dnssec": scan_dnssec,
-    "srv": srv_scan,
-    "spf": scan_spf,
-    "dmarc": scan_dmarc,
-    "txt": txt_parse,
-    "caa": scan_caa,
-    "cname": scan_cname,
-    "reverse": reverse_dns,
-    "reverse_ipv6": scan_reverse_ipv6,
-    "ip_neighbors": neighbors_ip_scan,
-    "crawl_tld": crawl_to_tld,
-    "http_headers": scan_http_headers,
-    "wildcard": scan_wildcard,
-    "ttl": scan_ttl,
-    "security_txt": scan_security_txt,
-    "bimi": scan_bimi,
-    "mta_sts": scan_mta_sts,
-    "geolocation": scan_geolocation,
-    "tlsa": scan_tlsa,
-    "sshfp": scan_sshfp,
-    "cert": scan_cert,
-    "hinfo": scan_hinfo,
-    "loc": scan_loc,
-    "naptr": scan_naptr,
-    "ds": scan_ds,
-    "dnskey": scan_dnskey,
-    "nsec": scan_nsec,
-    "anycast": scan_anycast,
-    "loadbalancer": scan_loadbalancer,
-    "cdn_enhanced": scan_cdn_enhanced,
-    "mail_blacklist": scan_mail_blacklist,
-    "domain_age": scan_domain_age,
-}
+Each strategy is declared here with its metadata; the tables the engines
+read (STRATEGY_INPUTS, STRATEGY_SCOPES, STRATEGY_LANES, STRATEGY_LIMITS)
+are built from it, for plugins found through entry points as well.
+"""
 
-EXPORTERS = {
-    "excel": export_excel,
-    "html": export_html,
-    "json": export_json,
-}
+from .registry import ENTRY_POINT_GROUPS, LazyRegistry, Plugin
 
-__all__ = ["STRATEGIES", "EXPORTERS"]
+# Strategy graph: results a strategy takes from other strategies of the same
+# domain, as {strategy: {keyword argument: producer}}. Producers run first
+# and their results are passed down instead of being fetched again.
+STRATEGY_INPUTS = {}
+
+# Where a strategy applies: "apex" strategies only run on zone apexes (and
+# the scan target), "ip" strategies on addresses; the rest ("host") on
+# every name. Subdomain brute force (subdomains_enumeration) and AXFR
+# (scan_axfr) are scoped here but not registered below, so nothing runs them.
+STRATEGY_SCOPES = {"subdomains": "apex", "axfr": "apex"}
+
+# Slow strategies get their own worker lanes (bulkheads) so they cannot hold
+# the workers of the fast record lookups; STRATEGY_LIMITS caps one
+# strategy's calls at once within its lane
+STRATEGY_LANES = {}
+STRATEGY_LIMITS = {}
+
+
+def _index(plugin):
+    """File a strategy's metadata into the engine tables."""
+    STRATEGY_SCOPES[plugin.name] = plugin.scope
+    if plugin.inputs:
+        STRATEGY_INPUTS[plugin.name] = plugin.inputs
+    if plugin.cost != 'fast':
+        STRATEGY_LANES[plugin.name] = plugin.cost
+    if plugin.limit:
+        STRATEGY_LIMITS[plugin.name] = plugin.limit
+
+
+# queries / per / delay feed the scan planner's cost model (see planner.py):
+# rough counts of what one call sends before the cache helps; value ranks
+# strategies when a budget cannot fit them all
+_STRATEGIES = [
+    Plugin("args", ".argparse_args:argparse_args", queries=0),
+    Plugin("ns", ".scan_ns:scan_ns", ("NS", "A", "AAAA"), scope="apex",
+           queries=9, value=3),  # NS, then A + AAAA per name server
+    Plugin("soa", ".scan_soa:scan_soa", ("SOA",), scope="apex", value=3,
+           async_target=".scan_soa:scan_soa_async"),
+    Plugin("mx", ".scan_mx:scan_mx", ("MX", "A"), queries=3, value=3,
+           async_target=".scan_mx:scan_mx_async"),
+    Plugin("aaaa", ".scan_aaaa:scan_aaaa", ("AAAA",), value=2,
+           async_target=".scan_aaaa:scan_aaaa_async"),
+    Plugin("ptr", ".scan_ptr:scan_ptr", ("PTR",), scope="ip", value=3,
+           async_target=".scan_ptr:scan_ptr_async"),
+    Plugin("dnssec", ".scan_dnssec:scan_dnssec", ("DNSKEY", "DS"), scope="apex", value=2,
+           inputs={"dnskey": "dnskey", "ds": "ds"}),
+    Plugin("srv", ".srv_scan:srv_scan", ("SRV",), per="service", value=3),
+    Plugin("spf", ".scan_spf:scan_spf", ("TXT",), value=3),
+    Plugin("dmarc", ".scan_dmarc:scan_dmarc", ("TXT",), scope="apex", value=2),
+    Plugin("txt", ".txt_parse:txt_parse", ("TXT",), value=3),
+    Plugin("caa", ".scan_caa:scan_caa", ("CAA",), value=2,
+           async_target=".scan_caa:scan_caa_async"),
+    Plugin("cname", ".scan_cname:scan_cname", ("CNAME", "A"), value=3),
+    Plugin("reverse", ".reverse_dns:reverse_dns", ("PTR",), scope="ip", value=2),
+    Plugin("reverse_ipv6", ".scan_reverse_ipv6:scan_reverse_ipv6", ("PTR",), scope="ip"),
+    Plugin("ip_neighbors", ".neighbors_ip_scan:neighbors_ip_scan", scope="ip", queries=0),
+    Plugin("crawl_tld", ".crawl_to_tld:crawl_to_tld", queries=0, value=3),
+    Plugin("http_headers", ".scan_http_headers:scan_http_headers", cost="probe", limit=4,
+           delay=1.0),  # Two HTTP requests
+    Plugin("wildcard", ".scan_wildcard:scan_wildcard", ("A",), scope="apex", queries=3, value=2),
+    Plugin("ttl", ".scan_ttl:scan_ttl", ("A", "AAAA", "MX", "NS", "TXT", "SOA", "CNAME")),
+    Plugin("security_txt", ".scan_security_txt:scan_security_txt", ("TXT",), queries=2),
+    Plugin("bimi", ".scan_bimi:scan_bimi", ("TXT",), scope="apex"),
+    Plugin("mta_sts", ".scan_mta_sts:scan_mta_sts", ("TXT",), scope="apex", value=2),
+    Plugin("geolocation", ".scan_geolocation:scan_geolocation", ("PTR",), scope="ip"),
+    Plugin("tlsa", ".scan_tlsa:scan_tlsa", ("TLSA",), queries=6),  # Six mail/web ports
+    Plugin("sshfp", ".scan_sshfp:scan_sshfp", ("SSHFP",)),
+    Plugin("cert", ".scan_cert:scan_cert", ("CERT",)),
+    Plugin("hinfo", ".scan_hinfo:scan_hinfo", ("HINFO",)),
+    Plugin("loc", ".scan_loc:scan_loc", ("LOC",)),
+    Plugin("naptr", ".scan_naptr:scan_naptr", ("NAPTR",)),
+    Plugin("ds", ".scan_ds:scan_ds", ("DS",), scope="apex", value=2),
+    Plugin("dnskey", ".scan_dnskey:scan_dnskey", ("DNSKEY",), scope="apex", value=2),
+    Plugin("nsec", ".scan_nsec:scan_nsec", ("NSEC", "NSEC3", "NSEC3PARAM"), scope="apex"),
+    Plugin("anycast", ".scan_anycast:scan_anycast", ("A", "TXT"), queries=0, value=2,
+           inputs={"addresses": "addresses"}),
+    Plugin("loadbalancer", ".scan_loadbalancer:scan_loadbalancer", ("A", "PTR"),
+           cost="slow_dns", limit=2, queries=11, delay=0.9),  # 10 uncached A, 0.1s apart
+    Plugin("cdn_enhanced", ".scan_cdn_enhanced:scan_cdn_enhanced", ("CNAME", "NS", "TXT"),
+           queries=1, value=2, inputs={"cname": "cname", "ns": "ns", "addresses": "addresses"}),
+    Plugin("mail_blacklist", ".scan_mail_blacklist:scan_mail_blacklist", ("MX", "A", "TXT"),
+           cost="slow_dns", limit=2, inputs={"mx": "mx"},
+           queries=18, per="mail_ip"),  # A + TXT on 9 DNSBLs
+    Plugin("domain_age", ".scan_domain_age:scan_domain_age", ("SOA",), scope="apex"),
+]
+
+STRATEGIES = LazyRegistry(_STRATEGIES, ENTRY_POINT_GROUPS['strategies'], on_register=_index)
+
+# Strategies already ported to coroutines (async engine); the others run
+# through its sync shim until they are
+ASYNC_STRATEGIES = LazyRegistry(_STRATEGIES, attribute='load_async')
+
+# Intermediate results shared by several strategies: computed once per
+# domain when a strategy needs them, never reported on their own
+SHARED_INPUTS = LazyRegistry([
+    Plugin("addresses", ".team_cymru:domain_addresses", ("A", "TXT"),
+           queries=5),  # A, then origin + AS name TXT per address
+])
+
+EXPORTERS = LazyRegistry([
+    Plugin("excel", ".export_excel:export_excel"),
+    Plugin("html", ".export_html:export_html"),
+    Plugin("json", ".export_json:export_json"),
+], ENTRY_POINT_GROUPS['exporters'])
+
+__all__ = ["STRATEGIES", "STRATEGY_INPUTS", "SHARED_INPUTS", "STRATEGY_SCOPES", "STRATEGY_LANES", "STRATEGY_LIMITS", "ASYNC_STRATEGIES", "EXPORTERS", "Plugin"]
@@ -0,0 +1,142 @@
+"""
+Adaptive per-upstream concurrency (AIMD).
+
+A fixed --threads is right for one network only: a local resolver farm
+answers far more queries in flight, a resolver behind a VPN starts timing
+out long before. Each upstream instead gets a limit on its queries in
+flight that follows TCP congestion control:
+
+- slow start: +1 per answered query (doubling every round trip) until the
+  first sign of overload;
+- then additive increase: +1 per limit's worth of answers, as long as
+  answers keep coming back without inflated latency (RTT under
+  LATENCY_TOLERANCE x the best RTT seen);
+- multiplicative decrease: timeouts, SERVFAIL and REFUSED halve the limit,
+  at most once per round trip so one burst of losses counts once.
+
+--threads stays the ceiling; the limit settles where the upstream starts
+to push back. The limit's history is kept for the scan summary.
+"""
+
+import collections
+import threading
+import time
+
+
+class AimdLimit:
+    """
+    Concurrency limit of one upstream.
+
+    Args:
+        ceiling (int): Highest limit (--threads)
+        initial (int): Starting limit (default: min(ceiling, 4))
+        floor (int): Lowest limit
+        backoff (float): Factor applied on overload
+    """
+
+    LATENCY_TOLERANCE = 2.0
+    HISTORY = 512
+
+    def __init__(self, ceiling, initial=None, floor=1, backoff=0.5):
+        self.ceiling = max(1, ceiling)
+        self.floor = max(1, min(floor, self.ceiling))
+        self.backoff = backoff
+        self.limit = float(min(self.ceiling, initial or 4))
+        self.in_flight = 0
+        self.slow_start = True
+        self.min_rtt = None
+        self.srtt = None
+        self._last_cut = 0.0
+        self._cond = threading.Condition()
+        self._start = time.monotonic()
+        self.history = collections.deque([(0.0, int(self.limit))], maxlen=self.HISTORY)
+        self.stats = {'increases': 0, 'decreases': 0, 'waits': 0, 'peak_limit': int(self.limit),
+                      'peak_in_flight': 0}
+
+    # ------------------------------------------------------------------
+    # Slots
+    # ------------------------------------------------------------------
+
+    def available(self):
+        """True if a query could be sent right now."""
+        return self.in_flight < int(self.limit)
+
+    def try_acquire(self):
+        """Take a slot if one is free, without waiting."""
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                return False
+            self._take()
+            return True
+
+    def acquire(self, timeout=None):
+        """
+        Wait for a free slot.
+
+        Returns:
+            bool: False if none freed up within timeout
+        """
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                self.stats['waits'] += 1
+                if not self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                    return False
+            self._take()
+            return True
+
+    def _take(self):
+        self.in_flight += 1
+        self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.in_flight)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    # ------------------------------------------------------------------
+    # Feedback
+    # ------------------------------------------------------------------
+
+    def succeeded(self, rtt=None):
+        """An answer came back (rtt: its round trip in seconds, if measured)."""
+        with self._cond:
+            if rtt is not None:
+                self.min_rtt = rtt if self.min_rtt is None else min(self.min_rtt, rtt)
+                self.srtt = rtt if self.srtt is None else 0.875 * self.srtt + 0.125 * rtt
+                if rtt > self.LATENCY_TOLERANCE * self.min_rtt:
+                    return  # Queueing somewhere: hold
+            if self.limit >= self.ceiling:
+                return
+            self.limit = min(self.ceiling, self.limit + (1 if self.slow_start else 1 / self.limit))
+            self.stats['increases'] += 1
+            self._changed()
+            self._cond.notify_all()
+
+    def overloaded(self):
+        """A timeout, SERVFAIL or REFUSED from this upstream."""
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_cut < (self.srtt or 0.1):
+                return  # Same burst of losses
+            self._last_cut = now
+            self.slow_start = False
+            self.limit = max(self.floor, self.limit * self.backoff)
+            self.stats['decreases'] += 1
+            self._changed()
+
+    def _changed(self):
+        limit = int(self.limit)
+        if limit != self.history[-1][1]:
+            self.history.append((time.monotonic() - self._start, limit))
+            self.stats['peak_limit'] = max(self.stats['peak_limit'], limit)
+
+    def summary(self, points=8):
+        """Current limit, counters and up to points entries of the history."""
+        with self._cond:
+            history = list(self.history)
+            summary = {'limit': int(self.limit), 'in_flight': self.in_flight, **self.stats}
+        if len(history) > points:
+            step = (len(history) - 1) / (points - 1)
+            history = [history[round(i * step)] for i in range(points)]
+        summary['history'] = [(round(t, 2), limit) for t, limit in history]
+        return summary
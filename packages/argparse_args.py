@@ -1,6 +1,19 @@
 import argparse
 
 
+def duration(value):
+    """Seconds from '30', '30s', '2m' or '1h'."""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    number, unit = (value[:-1], value[-1]) if value[-1:] in units else (value, 's')
+    try:
+        seconds = float(number) * units[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid duration: {value!r} (e.g. 30s, 2m)")
+    if seconds < 0:
+        raise argparse.ArgumentTypeError(f"invalid duration: {value!r}")
+    return seconds
+
+
 def argparse_args():
     parser = argparse.ArgumentParser(
         prog='dns_mapper',
@@ -10,6 +23,7 @@ def argparse_args():
                '  %(prog)s example.com -o report.html     # HTML output\n'
                '  %(prog)s example.com --fast             # Quick mode\n'
                '  %(prog)s example.com --thorough         # Deep analysis\n'
+               '  %(prog)s example.com --time-budget 30s  # Best scan that fits 30s\n'
                '  %(prog)s example.com --enable-only A,MX # Only A and MX records\n'
                '  %(prog)s example.com --disable mx,srv   # Skip MX and SRV',
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -45,15 +59,50 @@ def argparse_args():
                            help='Fast mode: depth=1, max=50, skip slow strategies')
     mode_group.add_argument('--thorough', action='store_true',
                            help='Thorough mode: depth=3, max=500, all strategies, 50 threads')
+    mode_group.add_argument('--time-budget', type=duration, default=0,
+                           help='Plan depth and strategies to finish in this time (e.g. 30s, 2m); '
+                                'also the scan timeout')
+    mode_group.add_argument('--query-budget', type=int, default=0,
+                           help='Plan depth and strategies to send at most about this many DNS queries')
+    mode_group.add_argument('--dry-run', action='store_true',
+                           help='Print the planned queries and duration per strategy, then exit')
     
     # Advanced options (rarely needed)
     adv_group = parser.add_argument_group('Advanced options')
     adv_group.add_argument('--threads', type=int, default=30, 
                           help='Thread count (default: 30)')
-    adv_group.add_argument('--timeout', type=int, default=2,
-                          help='DNS timeout in seconds (default: 2)')
+    adv_group.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                          help='Scan engine: nested thread pools, or one asyncio event loop with '
+                               '--threads strategy calls in flight (default: threads)')
+    adv_group.add_argument('--timeout', type=float, default=2,
+                          help='Max DNS timeout per upstream attempt in seconds; actual timeouts adapt to measured RTT (default: 2)')
+    adv_group.add_argument('--scan-timeout', type=float, default=0,
+                          help='Hard wall-clock limit for the whole scan in seconds; in-flight queries are '
+                               'abandoned and queued work dropped when it runs out, 0 = unlimited (default: 0)')
+    adv_group.add_argument('--domain-timeout', type=float, default=0,
+                          help='Time limit for the strategies of one domain in seconds, 0 = unlimited (default: 0)')
     adv_group.add_argument('--nameserver', 
-                          help='Custom DNS server IP')
+                          help='DNS server(s): comma-separated IP[:port] list or a file (one per line)')
+    adv_group.add_argument('--cache-file',
+                          help='Persistent DNS cache file (default: ~/.cache/dns_mapper/answers.cache)')
+    adv_group.add_argument('--no-cache', dest='cache', action='store_false',
+                          help='Disable the persistent DNS cache (in-memory only)')
+    adv_group.add_argument('--transport', choices=['udp', 'tcp', 'tls', 'https'], default='udp',
+                          help='DNS transport: udp (TCP after truncation), pipelined tcp, DNS over TLS on port 853, '
+                               'or DNS over HTTPS with --nameserver URLs (default: udp)')
+    adv_group.add_argument('--iterative', action='store_true',
+                          help='Resolve iteratively from the root servers instead of using a recursive resolver')
+    adv_group.add_argument('--root-hints',
+                          help='Root servers for --iterative: comma-separated IPs or a named.root file')
+    adv_group.add_argument('--upstream-qps', type=float, default=200,
+                          help='Max queries per second to each DNS server, 0 = unlimited (default: 200)')
+    adv_group.add_argument('--zone-qps', type=float, default=0,
+                          help='Max queries per second per target zone (its NS set), 0 = unlimited (default: 0)')
+    adv_group.add_argument('--no-hedge', dest='hedge', action='store_false',
+                          help='Do not race a second upstream when a DNS answer is slow')
+    adv_group.add_argument('--no-adaptive', dest='adaptive', action='store_false',
+                          help='Do not adapt queries in flight per upstream (AIMD, up to --threads) '
+                               'to timeouts, SERVFAIL and REFUSED')
     adv_group.add_argument('--subdomain-wordlist', 
                           help='Custom subdomain wordlist file')
     adv_group.add_argument('--srv-services', 
@@ -79,6 +128,10 @@ def argparse_args():
         args.max_results = 500
         args.threads = 50
     
+    # The planner picks what fits a time budget; the scan timeout enforces it
+    if args.time_budget and not args.scan_timeout:
+        args.scan_timeout = args.time_budget
+    
     # Parse strategy filters
     if args.enable_only:
         enabled = [s.strip().lower() for s in args.enable_only.split(',')]
@@ -124,7 +177,6 @@ def argparse_args():
     args.subdomain_thorough = False
     args.srv_common_only = False
     args.show_progress = True
-    args.cache = True
     args.no_color = False
     args.log_file = None
     
@@ -133,6 +185,8 @@ def argparse_args():
         parser.error("--quiet and --verbose are mutually exclusive")
     if args.fast and args.thorough:
         parser.error("--fast and --thorough are mutually exclusive")
+    if args.query_budget < 0:
+        parser.error("--query-budget must be positive")
     
     return args
 
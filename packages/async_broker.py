@@ -0,0 +1,128 @@
+"""
+Asyncio counterpart of the query broker, for coroutine strategies.
+
+Shares the answer cache, negative cache, zone rate limit and statistics of
+the process-wide QueryBroker, so sync and async strategies see the same
+answers. Identical concurrent lookups are coalesced on asyncio futures.
+Wire queries go through the same resolver pool as the sync broker (per
+upstream QPS, adaptive concurrency and timeouts, hedging, failover and the
+shared UDP sockets), on a worker of the shared executor: the pool blocks
+its thread while the UDP receiver thread waits for the answer.
+"""
+
+import asyncio
+
+import dns.resolver
+
+from .deadline import current_deadline
+from .executor import get_executor
+from .memo import note_expiration
+from .query_broker import QueryBroker, get_broker
+
+
+class AsyncQueryBroker:
+    """
+    ``await broker.resolve(...)`` for coroutine strategies.
+
+    Args:
+        broker (QueryBroker, optional): Broker whose pool, caches and stats are shared
+            (default: the process-wide broker)
+    """
+
+    def __init__(self, broker=None):
+        self.broker = broker if broker is not None else get_broker()
+        self._inflight = {}  # key -> asyncio.Future
+
+    def _count(self, *stats):
+        with self.broker._lock:
+            for stat in stats:
+                self.broker.stats[stat] += 1
+
+    async def resolve(self, qname, rdtype='A', rdclass='IN', tcp=False, lifetime=None,
+                      use_cache=True):
+        """
+        Resolve a query; same arguments, result and errors as QueryBroker.resolve.
+        """
+        broker = self.broker
+        key = QueryBroker._key(qname, rdtype, rdclass)
+
+        if use_cache and broker.cache is not None:
+            answer = broker.cache.get(key)
+            if answer is not None:
+                self._count('queries', 'cache_hits')
+                note_expiration(answer.expiration)
+                return answer
+
+        if use_cache and broker.negative_cache is not None:
+            try:
+                broker.negative_cache.check(key)
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                self._count('queries', 'negative_hits')
+                raise
+
+        deadline = current_deadline()
+        if deadline is not None:
+            lifetime = deadline.clamp(broker.pool.lifetime if lifetime is None else lifetime)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._count('queries', 'coalesced')
+            # shield: one waiter being cancelled must not cancel the query
+            try:
+                answer = await asyncio.wait_for(asyncio.shield(pending),
+                                                deadline.timeout() if deadline is not None else None)
+            except asyncio.TimeoutError:
+                raise dns.resolver.LifetimeTimeout(timeout=lifetime, errors=[]) from None
+            note_expiration(answer.expiration)
+            return answer
+
+        self._count('queries')
+        pending = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            # Zone pacing and the pool query block: keep them off the event loop
+            answer = await asyncio.wrap_future(get_executor().submit(self._query, key, tcp, lifetime))
+            if broker.cache is not None:
+                broker.cache.put(key, answer)
+            pending.set_result(answer)
+        except asyncio.CancelledError:
+            # The owner's domain was cancelled, not the query: waiters from
+            # other domains see a timeout (which strategies handle), never
+            # the owner's cancellation
+            pending.set_exception(dns.resolver.LifetimeTimeout(
+                timeout=broker.pool.lifetime if lifetime is None else lifetime, errors=[]))
+            pending.exception()  # Retrieved here, so no warning if nobody waits
+            raise
+        except Exception as e:
+            if broker.negative_cache is not None:
+                broker.negative_cache.add(key, e)
+            pending.set_exception(e)
+        finally:
+            del self._inflight[key]
+            self._count('sent')
+        answer = await pending
+        note_expiration(answer.expiration)  # Bounds memoized verdicts built on it
+        return answer
+
+    def _query(self, key, tcp, lifetime):
+        """One wire query for key, after the zone's rate limit allows it (on a worker thread)."""
+        broker = self.broker
+        if broker.zone_limiter is not None:
+            budget = broker.pool.lifetime if lifetime is None else lifetime
+            if not broker.zone_limiter.acquire(key[0], key[1], broker, budget):
+                raise dns.resolver.LifetimeTimeout(timeout=budget, errors=[])
+        response, upstream = broker.pool.query(key[0], key[1], key[2], tcp=tcp, lifetime=lifetime)
+        return QueryBroker._answer(key, response, upstream)
+
+
+# ============================================================================
+# SHARED INSTANCE - Coroutine strategies call get_async_broker()
+# ============================================================================
+_async_broker = None
+
+
+def get_async_broker():
+    """Return the async broker of the current process-wide broker."""
+    global _async_broker
+    if _async_broker is None or _async_broker.broker is not get_broker():
+        _async_broker = AsyncQueryBroker(get_broker())
+    return _async_broker
@@ -0,0 +1,178 @@
+"""
+Asyncio scan engine (--engine async).
+
+The thread engine ties up an OS thread for every domain and strategy call
+in flight, most of them just waiting on DNS answers. Here the whole crawl
+runs on one event loop: every strategy call is a task, and a single
+semaphore of --threads slots bounds how many run at once. Strategies listed in ASYNC_STRATEGIES are awaited directly and make
+their DNS queries through the async broker; the others go through a sync
+shim, the shared worker pool, until they are ported. Slow strategies with
+a bulkhead lane (STRATEGY_LANES) run on that lane and take no slot.
+
+Results, visited sets and logging stay on DNSMapper, so both engines
+produce the same output.
+"""
+
+import asyncio
+
+from . import ASYNC_STRATEGIES
+from .bulkhead import get_bulkheads
+from .deadline import Deadline, deadline_scope
+from .executor import get_executor
+from .strategy_graph import StrategyGraph
+
+
+class AsyncScanEngine:
+    """
+    Runs a DNSMapper crawl on an event loop.
+
+    Args:
+        mapper (DNSMapper): Holds the arguments, results and visited sets
+        concurrency (int): Strategy calls in flight at once (--threads)
+    """
+
+    def __init__(self, mapper, concurrency):
+        self.mapper = mapper
+        self.args = mapper.args
+        self.concurrency = max(1, concurrency)
+        self._limit = None
+        self._background = set()
+        self.stats = {'coroutines': 0, 'shimmed': 0}
+
+    def run(self):
+        """Crawl from the mapper's domain down to --depth."""
+        asyncio.run(self._run())
+
+    async def _run(self):
+        self._limit = asyncio.Semaphore(self.concurrency)
+        # Tasks copy the context they are created in: all of them see the deadline
+        with deadline_scope(self.mapper.deadline):
+            await self.crawl()
+
+    async def run_sync(self, func, *args):
+        """
+        Sync shim: run a blocking function on the shared worker pool.
+
+        The pool never runs work submitted from the loop thread inline: when
+        its budget is full the call waits for a worker, and the loop keeps
+        serving the other coroutines.
+        """
+        return await asyncio.wrap_future(get_executor().submit(func, *args))
+
+    # ------------------------------------------------------------------
+    # Strategies
+    # ------------------------------------------------------------------
+
+    async def run_strategy(self, strategy_name, target, depth=0, inputs=None):
+        """Async DNSMapper.run_strategy(): a coroutine if ported, the shim otherwise."""
+        mapper = self.mapper
+        strategy = ASYNC_STRATEGIES.get(strategy_name)
+        bulkheads = get_bulkheads()
+        if bulkheads.lane(strategy_name) is not None:
+            # Slow strategies wait on their own lane, not on loop slots
+            self.stats['shimmed'] += 1
+            return await asyncio.wrap_future(bulkheads.submit(
+                strategy_name, mapper.run_strategy, strategy_name, target, depth, inputs))
+        async with self._limit:
+            if strategy is None:
+                self.stats['shimmed'] += 1
+                return await self.run_sync(mapper.run_strategy, strategy_name, target, depth, inputs)
+            if not mapper.strategy_enabled(strategy_name, depth):
+                return []
+            self.stats['coroutines'] += 1
+            try:
+                mapper.log(f"Running {strategy_name} on {target}", 'debug')
+                return await strategy(target, *mapper.strategy_params(strategy_name), **(inputs or {}))
+            except Exception as e:
+                # Same as the thread engine: one failing strategy does not stop the scan
+                mapper.log(f"Error in {strategy_name}: {e}", 'error')
+                return []
+
+    # ------------------------------------------------------------------
+    # Crawl
+    # ------------------------------------------------------------------
+
+    async def process_domain(self, domain, depth=0):
+        """Async DNSMapper.process_domain(): every strategy of one domain as a task."""
+        mapper = self.mapper
+        if not mapper.enter_domain(domain, depth):
+            return
+
+        # Every query made for this domain gives up at its deadline
+        deadline = Deadline(self.args.domain_timeout or None, parent=mapper.deadline)
+        with deadline_scope(deadline):
+            # May wait on the zone cut lookup: off the loop thread
+            strategies = await self.run_sync(mapper.domain_strategies, domain, depth)
+            graph = StrategyGraph(strategies,
+                                  lambda strategy: mapper.strategy_enabled(strategy, depth))
+
+            async def keyed(key):
+                return key, await self.run_strategy(graph.strategies[key], domain, depth,
+                                                    graph.inputs(key))
+
+            def launch(nodes):
+                return {asyncio.ensure_future(keyed(node)): node for node in nodes}
+
+            await self._drain(graph, launch(graph.ready()), launch, domain, depth,
+                              deadline, detach=True)
+
+    async def _drain(self, graph, tasks, launch, domain, depth, deadline, detach=False):
+        """Collect strategy results of one domain as they finish (tasks: {task: node})."""
+        mapper = self.mapper
+        bulkheads = get_bulkheads()
+        try:
+            while tasks and not mapper.max_reached and not deadline.expired():
+                if detach and all(bulkheads.lane(graph.strategies[node]) for node in tasks.values()):
+                    # Only slow-lane strategies left: finish them in the background
+                    # and give this domain's slot to the next target
+                    self._background.add(asyncio.ensure_future(
+                        self._drain(graph, tasks, launch, domain, depth, deadline)))
+                    tasks = {}
+                    return
+                done, _ = await asyncio.wait(tasks, timeout=deadline.timeout(),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del tasks[task]
+                    key, result = task.result()
+                    if result and not graph.is_shared(key):
+                        mapper._add_result(key, result, domain, depth)
+                        mapper.log_discovery(key, result, depth)
+                    tasks.update(launch(graph.done(key, result)))
+        finally:
+            # Early termination or deadline: cancel strategies that have not finished
+            for task in tasks:
+                task.cancel()
+
+    async def crawl(self):
+        """Async DNSMapper.crawl(): best targets first, a task each as soon as a slot frees up."""
+        mapper = self.mapper
+        mapper._seed_frontier()
+        tasks = set()
+        self._background = set()  # Detached slow-lane strategies (see _drain)
+
+        while not mapper.max_reached and not mapper.deadline.expired():
+            items, signal = mapper._take_frontier(mapper.targets_in_flight - len(tasks))
+            for kind, target, depth in items:
+                work = self.process_domain if kind == 'domain' else self._process_ip
+                tasks.add(asyncio.ensure_future(work(target, depth)))
+            if not tasks:
+                if signal.done() or mapper.frontier:
+                    continue
+                if not self._background:
+                    break
+            # IP workers discover from other threads: the signal wakes us up for them too
+            waker = asyncio.wrap_future(signal)
+            done, _ = await asyncio.wait(tasks | self._background | {waker},
+                                         timeout=mapper.deadline.timeout(),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            tasks -= done
+            self._background -= done
+
+        mapper._stop_log()
+        for task in tasks | self._background:
+            task.cancel()
+        await asyncio.gather(*tasks, *self._background, return_exceptions=True)
+
+    async def _process_ip(self, ip, depth):
+        async with self._limit:
+            await self.run_sync(self.mapper.process_ip, ip, depth)
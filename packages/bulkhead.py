@@ -0,0 +1,164 @@
+"""
+Bulkheads: separate worker lanes for slow strategies.
+
+Most strategies are a few cached DNS lookups, but some are slow by design:
+loadbalancer paces 10 sequential queries, mail_blacklist asks every DNSBL
+for every mail server, http_headers makes blocking HTTP requests. In the
+shared pool they held workers that the millisecond lookups of every other
+domain were waiting for.
+
+Strategies listed in STRATEGY_LANES now run on their lane's own workers,
+queued in FIFO order, and STRATEGY_LIMITS caps how many calls of one
+strategy a lane runs at once so a single module cannot fill its lane
+either. Everything else stays on the shared executor (the fast lane).
+"""
+
+import collections
+import contextvars
+import threading
+from concurrent.futures import Future
+
+from . import STRATEGY_LANES, STRATEGY_LIMITS
+from .executor import get_executor
+
+
+class Lane:
+    """
+    Worker threads dedicated to a group of strategies.
+
+    Args:
+        name (str): Lane name, for thread names and the summary
+        workers (int): Calls running at once in this lane
+        limits (dict, optional): {strategy: calls at once} within the lane
+    """
+
+    def __init__(self, name, workers, limits=None):
+        self.name = name
+        self.workers = max(1, workers)
+        self.limits = limits or {}
+        self._cond = threading.Condition()
+        self._queue = collections.deque()  # (strategy, future, fn, args)
+        self._running = collections.Counter()
+        self._threads = []
+        self._shutdown = False
+        self.stats = {'submitted': 0, 'peak_queued': 0}
+
+    def submit(self, strategy, fn, *args):
+        """Queue fn(*args) as a call of strategy; returns its Future."""
+        future = Future()
+        # Run in the submitter's context (current deadline)
+        run = contextvars.copy_context().run
+        with self._cond:
+            self._queue.append((strategy, future, run, (fn,) + args))
+            self.stats['submitted'] += 1
+            self.stats['peak_queued'] = max(self.stats['peak_queued'], len(self._queue))
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f'dns-{self.name}-{len(self._threads)}')
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        return future
+
+    def _next(self):
+        """Oldest queued call whose strategy is under its limit (lock held)."""
+        for task in self._queue:
+            strategy = task[0]
+            if self._running[strategy] < self.limits.get(strategy, self.workers):
+                self._queue.remove(task)
+                return task
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                task = self._next()
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    task = self._next()
+                strategy, future, fn, args = task
+                self._running[strategy] += 1
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except Exception as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running[strategy] -= 1
+                    # A call under its limit may have been waiting on this one
+                    self._cond.notify_all()
+
+    def shutdown(self):
+        """Let the workers exit once the queue is empty."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+
+
+class Bulkheads:
+    """
+    Routes strategy calls to their lane, or to the shared executor.
+
+    Args:
+        lanes (dict): {lane name: Lane}
+    """
+
+    def __init__(self, lanes):
+        self.lanes = lanes
+
+    @staticmethod
+    def lane_workers(threads):
+        """Workers of each lane for --threads: a quarter of them, at least 2."""
+        return max(2, threads // 4)
+
+    @classmethod
+    def for_threads(cls, threads):
+        """One lane per name in STRATEGY_LANES, each with lane_workers(threads) workers."""
+        workers = cls.lane_workers(threads)
+        return cls({name: Lane(name, workers, STRATEGY_LIMITS)
+                    for name in sorted(set(STRATEGY_LANES.values()))})
+
+    def lane(self, strategy):
+        """Lane of strategy, or None for the fast lane."""
+        return self.lanes.get(STRATEGY_LANES.get(strategy))
+
+    def submit(self, strategy, fn, *args):
+        """Run fn(*args) as a call of strategy on the lane it belongs to."""
+        lane = self.lane(strategy)
+        if lane is None:
+            return get_executor().submit(fn, *args)
+        return lane.submit(strategy, fn, *args)
+
+    def shutdown(self):
+        for lane in self.lanes.values():
+            lane.shutdown()
+
+
+# ============================================================================
+# SHARED INSTANCE - Engines call get_bulkheads(), main.py sizes the lanes
+# ============================================================================
+_bulkheads = None
+_bulkheads_lock = threading.Lock()
+
+
+def get_bulkheads():
+    """Return the process-wide lanes, creating default ones on first use."""
+    global _bulkheads
+    if _bulkheads is None:
+        with _bulkheads_lock:
+            if _bulkheads is None:
+                _bulkheads = Bulkheads.for_threads(get_executor().max_workers)
+    return _bulkheads
+
+
+def set_bulkheads(bulkheads):
+    """Install the lanes strategy calls will use from now on."""
+    global _bulkheads
+    with _bulkheads_lock:
+        previous, _bulkheads = _bulkheads, bulkheads
+    if previous is not None and previous is not bulkheads:
+        previous.shutdown()
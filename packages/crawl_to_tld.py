@@ -1,5 +1,7 @@
 """Crawl domain hierarchy up to TLD."""
 
+from .records import Host
+
 
 def crawl_to_tld(domain):
     """Extract parent domains up to the TLD.
@@ -8,7 +10,7 @@ def crawl_to_tld(domain):
         domain (str): Domain name to crawl
     
     Returns:
-        list: Parent domains excluding TLD
+        list: Parent domains excluding TLD (Host)
     """
     # Common TLDs (add more as needed)
     tlds = ['com', 'org', 'net', 'edu', 'gov', 'fr', 'gouv.fr', 'co.uk']
@@ -19,8 +21,9 @@ def crawl_to_tld(domain):
     # Build parent domains
     for i in range(1, len(parts)):
         parent = '.'.join(parts[i:])
-        # Don't include TLDs
-        if parent not in tlds:
-            parents.append(parent)
+        # Don't include TLDs (nor any single label)
+        host = Host.parse(parent)
+        if host and parent not in tlds:
+            parents.append(host)
     
     return parents
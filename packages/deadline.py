@@ -0,0 +1,128 @@
+"""
+Deadlines shared by a scan, its domains and every DNS query they make.
+
+A Deadline is installed for the current context with deadline_scope().
+Worker pools copy the context of the code that submits to them and asyncio
+tasks inherit it, so strategies never take a deadline argument: the query
+brokers read current_deadline() and clamp each query's lifetime to the
+time left, failing with LifetimeTimeout once it is spent. Cancelling a
+deadline (max results reached, scan interrupted) expires it, and with it
+every deadline derived from it, right away: threads blocked in wait(), or
+on an event registered with watch(), are woken instead of sleeping out
+their timeout.
+"""
+
+import contextlib
+import contextvars
+import math
+import threading
+import time
+
+import dns.resolver
+
+_current = contextvars.ContextVar('dns_recon_deadline', default=None)
+
+
+class Deadline:
+    """
+    Point in time after which work should be abandoned.
+
+    Args:
+        seconds (float, optional): Time from now (default: no limit of its own)
+        parent (Deadline, optional): Enclosing deadline, which also bounds this one
+    """
+
+    def __init__(self, seconds=None, parent=None):
+        self.expires = math.inf if seconds is None else time.monotonic() + seconds
+        self.parent = parent
+        self._lock = threading.Lock()
+        self._watchers = set()  # Events set by cancel()
+
+    def remaining(self):
+        """Seconds left (math.inf without a limit), never below 0."""
+        left = self.expires - time.monotonic()
+        if self.parent is not None:
+            left = min(left, self.parent.remaining())
+        return max(0.0, left)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def cancel(self):
+        """Expire now; derived deadlines expire with it and their waiters wake up."""
+        self.expires = -math.inf
+        with self._lock:
+            watchers = list(self._watchers)
+        for event in watchers:
+            event.set()
+
+    @contextlib.contextmanager
+    def watch(self, event):
+        """
+        Set event if this deadline (or one it derives from) is cancelled
+        while the block runs. The holder of event must then check expired().
+        """
+        deadlines = []
+        deadline = self
+        while deadline is not None:
+            with deadline._lock:
+                deadline._watchers.add(event)
+            deadlines.append(deadline)
+            deadline = deadline.parent
+        try:
+            if self.expired():
+                event.set()  # Already over before the watch began
+            yield event
+        finally:
+            for deadline in deadlines:
+                with deadline._lock:
+                    deadline._watchers.discard(event)
+
+    def wait(self, event):
+        """
+        Wait for event, no longer than the deadline allows.
+
+        Args:
+            event (threading.Event): Set by whoever the caller waits on; also set on cancel
+
+        Returns:
+            bool: True if event was set before the deadline passed or was cancelled
+        """
+        with self.watch(event):
+            event.wait(self.timeout())
+        return event.is_set() and not self.expired()
+
+    def timeout(self):
+        """remaining() as a timeout argument: None without a limit."""
+        left = self.remaining()
+        return None if left == math.inf else left
+
+    def clamp(self, lifetime):
+        """
+        Lifetime for a query started now.
+
+        Args:
+            lifetime (float): Lifetime the query would get without a deadline
+
+        Raises:
+            dns.resolver.LifetimeTimeout: The deadline has already passed
+        """
+        left = self.remaining()
+        if left <= 0:
+            raise dns.resolver.LifetimeTimeout(timeout=0.0, errors=[])
+        return min(lifetime, left)
+
+
+def current_deadline():
+    """Deadline of the current context, or None."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline):
+    """Make deadline the current one for the duration of the block."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -0,0 +1,237 @@
+"""
+Persistent, memory-mapped DNS answer cache shared across runs and processes.
+
+Answers are stored as wire-format DNS responses in a fixed-size hash table
+file. Readers probe slot headers directly in the shared mapping and only
+copy out the one payload they parse; writers serialize through an exclusive
+file lock, so several main.py processes can use the same cache file at once.
+Entries expire with the record TTL.
+
+Speaks the same get(key)/put(key, answer) protocol as dns.resolver.LRUCache,
+so it plugs into the query broker in its place. get_negative/put_negative
+keep NXDOMAIN and NODATA responses for the negative cache in the same file,
+under keys of their own: a re-scan then skips the names and types that
+were missing last time too.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+
+import dns.message
+import dns.resolver
+
+try:
+    import fcntl  # Cross-process write lock (POSIX)
+except ImportError:
+    fcntl = None  # Windows: fall back to in-process locking only
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'dns_mapper', 'answers.cache')
+
+MAGIC = b'DNSMAPC1'
+# Header: magic, slot count, slot size
+HEADER = struct.Struct('<8sII')
+HEADER_SIZE = 64
+# Slot: seqlock counter, key hash, expiry, payload length
+SLOT = struct.Struct('<IQdI')
+PROBES = 4
+
+
+class DiskCache:
+    """
+    Memory-mapped answer cache keyed by (qname, qtype, class).
+
+    Each slot is guarded by a sequence counter (odd while being written):
+    readers check it before and after parsing and drop the entry if it
+    changed underneath them.
+
+    Args:
+        path (str): Cache file location (created if missing)
+        slots (int): Number of hash table slots for a new file
+        slot_size (int): Bytes per slot; larger responses are not cached
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, slots=8192, slot_size=2048):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+
+        with self._write_lock():
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            header = os.read(self._fd, HEADER.size)
+            if len(header) == HEADER.size and header[:8] == MAGIC:
+                # Reuse the geometry of the existing file
+                _, slots, slot_size = HEADER.unpack(header)
+            else:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, HEADER_SIZE + slots * slot_size)
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.write(self._fd, HEADER.pack(MAGIC, slots, slot_size))
+
+        self.slots = slots
+        self.slot_size = slot_size
+        self._mm = mmap.mmap(self._fd, HEADER_SIZE + slots * slot_size)
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _write_lock(self):
+        return _FileLock(self._fd, self._lock)
+
+    @staticmethod
+    def _hash(key, negative=False):
+        qname, rdtype, rdclass = key
+        text = f"{'-' if negative else ''}{qname.to_text().lower()}|{int(rdtype)}|{int(rdclass)}"
+        return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little')
+
+    def _offset(self, key_hash, probe):
+        return HEADER_SIZE + ((key_hash + probe) % self.slots) * self.slot_size
+
+    # ------------------------------------------------------------------
+    # dns.resolver cache protocol
+    # ------------------------------------------------------------------
+
+    def get(self, key):
+        """Return a cached dns.resolver.Answer for key, or None."""
+        entry = self._lookup(self._hash(key), key[0])
+        if entry is not None:
+            try:
+                answer = dns.resolver.Answer(key[0], key[1], key[2], entry[0])
+            except Exception:
+                answer = None
+            if answer is not None:
+                self.stats['hits'] += 1
+                return answer
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key, answer):
+        """Store answer's wire response until its TTL runs out."""
+        self._store(self._hash(key), answer.response, answer.expiration)
+
+    def get_negative(self, key):
+        """(response, expiration) of a negative answer stored for key, or None."""
+        return self._lookup(self._hash(key, negative=True))
+
+    def put_negative(self, key, response, expires):
+        """Store a negative (NXDOMAIN/NODATA) response for key until expires."""
+        self._store(self._hash(key, negative=True), response, expires)
+
+    # ------------------------------------------------------------------
+    # Slots
+    # ------------------------------------------------------------------
+
+    def _lookup(self, key_hash, qname=None):
+        """(response, expiration) stored under key_hash, or None; qname must match its question."""
+        now = time.time()
+
+        for probe in range(PROBES):
+            offset = self._offset(key_hash, probe)
+            seq, slot_hash, expires, length = SLOT.unpack_from(self._mm, offset)
+            if seq % 2 or slot_hash != key_hash or expires <= now:
+                continue
+
+            # Copy the payload out: parsed rdata must not alias the shared mapping
+            start = offset + SLOT.size
+            wire = self._mm[start:start + length]
+            try:
+                response = dns.message.from_wire(wire)
+            except Exception:
+                continue
+            # Entry rewritten while we were parsing it: treat as a miss
+            if SLOT.unpack_from(self._mm, offset)[0] != seq:
+                continue
+            if qname is not None and (not response.question or response.question[0].name != qname):
+                continue
+
+            # Hand out the remaining TTL, not the one stored on disk
+            remaining = max(int(expires - now), 0)
+            for rrset in response.answer + response.authority:
+                rrset.ttl = min(rrset.ttl, remaining)
+            return response, expires
+        return None
+
+    def _store(self, key_hash, response, expires):
+        """Write response's wire form under key_hash, valid until expires."""
+        now = time.time()
+        if expires <= now:
+            return
+        wire = response.to_wire()
+        if len(wire) > self.slot_size - SLOT.size:
+            return
+
+        with self._write_lock():
+            # Prefer the key's own slot, then a free/expired one, then the oldest
+            target = None
+            oldest = None
+            for probe in range(PROBES):
+                offset = self._offset(key_hash, probe)
+                _, slot_hash, slot_expires, _ = SLOT.unpack_from(self._mm, offset)
+                if slot_hash == key_hash:
+                    target = offset
+                    break
+                if target is None and slot_expires <= now:
+                    target = offset
+                if oldest is None or slot_expires < oldest[0]:
+                    oldest = (slot_expires, offset)
+            if target is None:
+                target = oldest[1]
+
+            seq = SLOT.unpack_from(self._mm, target)[0]
+            # Odd counter: readers skip the slot until we finish
+            struct.pack_into('<I', self._mm, target, (seq + 1) | 1)
+            start = target + SLOT.size
+            self._mm[start:start + len(wire)] = wire
+            SLOT.pack_into(self._mm, target, ((seq + 1) | 1) + 1, key_hash,
+                           expires, len(wire))
+            self.stats['stores'] += 1
+
+    def flush(self, key=None):
+        """Drop one entry (or the whole cache when key is None)."""
+        with self._write_lock():
+            if key is None:
+                for slot in range(self.slots):
+                    offset = HEADER_SIZE + slot * self.slot_size
+                    seq = SLOT.unpack_from(self._mm, offset)[0]
+                    SLOT.pack_into(self._mm, offset, (seq | 1) + 1, 0, 0.0, 0)
+                return
+            for key_hash in (self._hash(key), self._hash(key, negative=True)):
+                for probe in range(PROBES):
+                    offset = self._offset(key_hash, probe)
+                    seq, slot_hash, _, _ = SLOT.unpack_from(self._mm, offset)
+                    if slot_hash == key_hash:
+                        SLOT.pack_into(self._mm, offset, (seq | 1) + 1, 0, 0.0, 0)
+
+    def close(self):
+        """Unmap and close the cache file."""
+        self._mm.close()
+        os.close(self._fd)
+
+
+class _FileLock:
+    """Thread lock + exclusive flock on the cache file, as a context manager."""
+
+    def __init__(self, fd, thread_lock):
+        self.fd = fd
+        self.thread_lock = thread_lock
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.thread_lock.release()
+        return False
@@ -0,0 +1,114 @@
+"""
+DNS over HTTPS (RFC 8484) for networks that only allow HTTPS egress.
+
+Queries are POSTed as application/dns-message to the resolver's URL over a
+single HTTP/2 connection per server; concurrent queries become concurrent
+streams on that connection instead of separate requests and handshakes.
+Plugs into ResolverPool in place of the TCP/TLS stream transport.
+
+Requires httpx with HTTP/2 support: pip install 'httpx[http2]'
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+import dns.exception
+import dns.message
+
+from .udp_transport import matches_request
+
+# httpx (with certifi and ssl) is imported by the first DohTransport, not by this module
+httpx = None
+
+DNS_MESSAGE = 'application/dns-message'
+
+
+class DohTransport:
+    """
+    HTTP/2 DNS-over-HTTPS client shared by every query of the pool.
+
+    The HTTP/2 connection is driven by an asyncio loop on one background
+    thread; calling threads hand it their query and wait for the answer,
+    so the connection state is never touched by two threads at once.
+
+    Args:
+        verify (bool | str | ssl.SSLContext): Certificate verification, as for httpx
+        http2 (bool): Multiplex queries as HTTP/2 streams (falls back to HTTP/1.1 if refused)
+    """
+
+    def __init__(self, verify=True, http2=True):
+        global httpx
+        if httpx is None:
+            try:
+                import httpx
+            except ImportError:
+                raise ImportError("httpx package not installed. Install with: pip install 'httpx[http2]'") from None
+        self.http2 = http2
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='dns-doh', daemon=True)
+        self._thread.start()
+        # One client, so one connection per server carries every stream
+        self._client = self._call(self._make_client(verify, http2))
+        self._lock = threading.Lock()
+        self.stats = {'queries': 0, 'http2': 0, 'errors': 0}
+
+    @staticmethod
+    async def _make_client(verify, http2):
+        return httpx.AsyncClient(http2=http2, verify=verify, headers={'accept': DNS_MESSAGE})
+
+    def _call(self, coroutine, timeout=None):
+        """Run coroutine on the I/O loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    async def _post(self, url, wire, timeout):
+        return await self._client.post(url, content=wire,
+                                       headers={'content-type': DNS_MESSAGE}, timeout=timeout)
+
+    def query(self, request, url, port, timeout):
+        """
+        POST request to url and return the DNS response.
+
+        Args:
+            request (dns.message.Message): Query
+            url (str): DoH endpoint, e.g. https://1.1.1.1/dns-query
+            port (int): Unused; the port is part of the URL
+            timeout (float): Seconds to wait for the answer
+
+        Raises:
+            dns.exception.Timeout: No answer in time
+            ConnectionError: HTTP failure or a non-DNS reply
+        """
+        # RFC 8484 section 4.1: ID 0 keeps identical queries HTTP-cacheable
+        request.id = 0
+        future = asyncio.run_coroutine_threadsafe(self._post(url, request.to_wire(), timeout),
+                                                  self._loop)
+        try:
+            reply = future.result(timeout + 1)
+        except (httpx.TimeoutException, concurrent.futures.TimeoutError):
+            future.cancel()
+            self._count('errors')
+            raise dns.exception.Timeout(timeout=timeout)
+        except httpx.HTTPError as e:
+            self._count('errors')
+            raise ConnectionError(f"DoH request to {url} failed: {e}") from e
+
+        self._count('queries')
+        if reply.http_version == 'HTTP/2':
+            self._count('http2')
+        if reply.status_code != 200 or not reply.headers.get('content-type', '').startswith(DNS_MESSAGE):
+            raise ConnectionError(f"DoH server {url} answered HTTP {reply.status_code}")
+        response = dns.message.from_wire(reply.content)
+        if not matches_request(request, response):
+            raise dns.exception.FormError("DoH response does not match the query")
+        return response
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def close(self):
+        """Close the HTTP connection(s) and stop the I/O thread."""
+        self._call(self._client.aclose(), timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
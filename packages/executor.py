@@ -0,0 +1,116 @@
+"""
+One process-wide worker pool with a single in-flight budget.
+
+The scan fans out at several levels (domains per depth, strategies per
+domain, names inside subdomains/srv). With an executor per level, the real
+concurrency was the product of their sizes and threads were created and
+torn down for every domain. Every level now submits to the same executor,
+sized by --threads.
+
+When all workers are busy, submit() runs the task in the calling thread
+instead of queueing it (caller-runs). Nested fan-out therefore never waits
+on a queue that its own caller is blocking, and a busy scan slows its
+producers down instead of piling up work. The one exception is a thread
+running an event loop (the async engine's): running a blocking task there
+would stall every coroutine, so its tasks wait for a worker instead.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+DEFAULT_WORKERS = 30  # Same as the --threads default
+
+
+class BoundedExecutor(Executor):
+    """
+    Thread pool that runs at most ``max_workers`` tasks at once, running
+    anything beyond that in the submitting thread (queued instead when that
+    thread runs an event loop).
+
+    Returns ordinary futures, so as_completed()/wait() work as usual.
+
+    Args:
+        max_workers (int): In-flight task budget (and worker thread count)
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix='dns-worker')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = {'submitted': 0, 'caller_runs': 0, 'peak_in_flight': 0}
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._lock:
+            self.stats['submitted'] += 1
+            inline = self._in_flight >= self.max_workers and not _in_event_loop()
+            if inline:
+                self.stats['caller_runs'] += 1
+            else:
+                self._in_flight += 1
+                self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self._in_flight)
+
+        if inline:
+            future = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            return future
+
+        try:
+            # Workers run in the submitter's context (current deadline)
+            future = self._pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def _in_event_loop():
+    """True if the current thread is running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+# ============================================================================
+# SHARED INSTANCE - Fan-out code calls get_executor(), main.py sizes it
+# ============================================================================
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide executor, creating a default one on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BoundedExecutor()
+    return _executor
+
+
+def set_executor(executor):
+    """Install the executor all fan-out will share from now on."""
+    global _executor
+    with _executor_lock:
+        previous, _executor = _executor, executor
+    if previous is not None and previous is not executor:
+        previous.shutdown(wait=False)
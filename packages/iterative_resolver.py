@@ -0,0 +1,325 @@
+"""
+Iterative resolution from root hints, without an upstream recursive resolver.
+
+Queries start at the root servers and follow referrals down to the
+authoritative servers of the target zone. Every delegation (zone cut, NS
+set and glue addresses) is cached until its NS TTL runs out, so once a zone
+has been reached, further lookups in it go straight to its authoritative
+servers. Each zone's servers form their own ResolverPool (failover and
+hedging within the zone); a server hosting several zones is one Upstream
+shared by their pools, with a single QPS budget, RTT estimate and
+concurrency limit.
+
+Offers the same query()/summary()/latency_report() interface as
+ResolverPool, so the query broker can use either.
+"""
+
+import collections
+import os
+import threading
+import time
+
+import dns.exception
+import dns.flags
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+
+from .resolver_pool import ResolverPool, SharedUpstreams
+from .stream_transport import StreamTransport
+from .udp_transport import UdpTransport
+
+# IANA root servers (a..m.root-servers.net), IPv4
+ROOT_HINTS = [
+    '198.41.0.4', '170.247.170.2', '192.33.4.12', '199.7.91.13', '192.203.230.10',
+    '192.5.5.241', '192.112.36.4', '198.97.190.53', '192.36.148.17', '192.58.128.30',
+    '193.0.14.129', '199.7.83.42', '202.12.27.33',
+]
+
+MAX_REFERRALS = 16   # Delegation hops for one name
+MAX_CNAMES = 8       # CNAME hops for one query
+MAX_NS_DEPTH = 3     # Nested lookups of glueless NS addresses
+
+
+class _Zone:
+    """A cached zone cut: its name, authoritative servers and expiry."""
+
+    __slots__ = ('name', 'pool', 'expires')
+
+    def __init__(self, name, pool, expires):
+        self.name = name
+        self.pool = pool
+        self.expires = expires
+
+
+class IterativeResolver:
+    """
+    Walks from the root hints to the authoritative servers for every query.
+
+    Args:
+        root_hints (list, optional): Root server addresses (default: IANA roots)
+        timeout (float): Longest wait for one server, as in ResolverPool
+        lifetime (float, optional): Total seconds per query including referrals (default: 4 x timeout)
+        qps (float, optional): Query ceiling per authoritative server
+        ipv6 (bool): Also use IPv6 glue addresses
+        min_ttl (int): Shortest time a delegation is cached
+        max_ttl (int): Longest time a delegation is cached
+        hedge (bool): Hedge slow queries across a zone's servers
+        concurrency (int, optional): Ceiling of the adaptive limit on queries in
+            flight per authoritative server (default: no limit)
+    """
+
+    def __init__(self, root_hints=None, timeout=2, lifetime=None, qps=None, ipv6=False,
+                 min_ttl=60, max_ttl=86400, hedge=True, concurrency=None):
+        self.timeout = timeout
+        self.lifetime = lifetime if lifetime is not None else timeout * 4
+        self.ipv6 = ipv6
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+
+        # Every zone pool shares the same sockets, connections and per-server state
+        self._pool_options = {'timeout': timeout, 'qps': qps, 'hedge': hedge,
+                              'concurrency': concurrency, 'shared': SharedUpstreams(),
+                              'udp': UdpTransport(), 'stream': StreamTransport()}
+        root = self._new_pool(root_hints or ROOT_HINTS)
+        self._lock = threading.Lock()
+        self._zones = {dns.name.root: _Zone(dns.name.root, root, float('inf'))}
+        self._latencies = collections.deque(maxlen=ResolverPool.LATENCY_WINDOW)
+        self.stats = {'queries': 0, 'referrals': 0, 'zone_cache_hits': 0, 'glueless': 0,
+                      'cnames': 0}
+
+    @staticmethod
+    def load_root_hints(spec):
+        """
+        Expand a --root-hints value into a list of addresses.
+
+        Args:
+            spec (str): Comma-separated addresses, a file with one per line, or a
+                named.root style zone file (its A/AAAA records are used)
+
+        Returns:
+            list: Root server address strings
+        """
+        if not os.path.isfile(spec):
+            return ResolverPool.load_nameservers(spec)
+        addresses = []
+        with open(spec, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.split(';')[0].split('#')[0].split()
+                if len(fields) == 1:
+                    addresses.append(fields[0])
+                elif len(fields) >= 3 and fields[-2].upper() in ('A', 'AAAA'):
+                    addresses.append(fields[-1])
+        return addresses
+
+    def _new_pool(self, addresses):
+        return ResolverPool(addresses, **self._pool_options)
+
+    # ------------------------------------------------------------------
+    # Delegation cache
+    # ------------------------------------------------------------------
+
+    def _closest_zone(self, qname):
+        """Deepest cached, unexpired zone cut at or above qname."""
+        now = time.time()
+        name = qname
+        with self._lock:
+            while True:
+                zone = self._zones.get(name)
+                if zone is not None and zone.expires > now:
+                    if name != dns.name.root:
+                        self.stats['zone_cache_hits'] += 1
+                    return zone
+                name = name.parent()
+
+    def _referral(self, response, zone, qname):
+        """The NS rrset of a referral to a zone below ``zone`` covering qname, or None."""
+        for rrset in response.authority:
+            if (rrset.rdtype == dns.rdatatype.NS and rrset.name != zone.name
+                    and rrset.name.is_subdomain(zone.name) and qname.is_subdomain(rrset.name)):
+                return rrset
+        return None
+
+    def _delegate(self, referral, response, zone, deadline, depth):
+        """Build (and cache) the zone cut a referral points to."""
+        wanted = {dns.rdatatype.A}
+        if self.ipv6:
+            wanted.add(dns.rdatatype.AAAA)
+        targets = {r.target for r in referral}
+
+        # Glue is only trusted for names inside the zone that sent it
+        addresses = [rdata.address
+                     for rrset in response.additional
+                     if rrset.rdtype in wanted and rrset.name in targets
+                     and rrset.name.is_subdomain(zone.name)
+                     for rdata in rrset]
+
+        if not addresses and depth < MAX_NS_DEPTH:
+            with self._lock:
+                self.stats['glueless'] += 1
+            for target in sorted(targets):
+                try:
+                    answer, _ = self._resolve(target, dns.rdatatype.A, dns.rdataclass.IN,
+                                              False, deadline, depth + 1)
+                except dns.exception.DNSException:
+                    continue
+                addresses.extend(rdata.address for rrset in answer.answer
+                                 if rrset.rdtype == dns.rdatatype.A for rdata in rrset)
+                if addresses:
+                    break
+        if not addresses:
+            return None
+
+        ttl = min(max(referral.ttl, self.min_ttl), self.max_ttl)
+        child = _Zone(referral.name, self._new_pool(sorted(set(addresses))), time.time() + ttl)
+        with self._lock:
+            self._zones[referral.name] = child
+            self.stats['referrals'] += 1
+        return child
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _request(qname, rdtype, rdclass):
+        """A query message, for error reporting."""
+        return dns.message.make_query(qname, rdtype, rdclass)
+
+    def _resolve(self, qname, rdtype, rdclass, tcp, deadline, depth):
+        """Follow referrals for one name; returns (response, upstream)."""
+        # DS records live on the parent side of the zone cut: ask the parent's
+        # servers, and never follow the referral to the child zone itself
+        below = qname.parent() if rdtype == dns.rdatatype.DS and qname != dns.name.root else qname
+        zone = self._closest_zone(below)
+        for _ in range(MAX_REFERRALS):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise dns.resolver.LifetimeTimeout(timeout=self.lifetime, errors=[])
+            response, upstream = zone.pool.query(qname, rdtype, rdclass, tcp=tcp,
+                                                 lifetime=remaining, rd=False)
+            if response.answer or response.rcode() == dns.rcode.NXDOMAIN:
+                return response, upstream
+            referral = self._referral(response, zone, below)
+            if referral is None:
+                return response, upstream  # NODATA (or a lame answer)
+            child = self._delegate(referral, response, zone, deadline, depth)
+            if child is None:
+                raise dns.resolver.NoNameservers(request=self._request(qname, rdtype, rdclass), errors=[
+                    (str(upstream), tcp, upstream.port,
+                     f"no usable addresses for {referral.name} servers", response)])
+            zone = child
+        raise dns.resolver.NoNameservers(request=self._request(qname, rdtype, rdclass), errors=[
+            (zone.name.to_text(), tcp, 53, "too many referrals", None)])
+
+    @staticmethod
+    def _splice(response, chased):
+        """One response: the CNAME chain so far, then the answer found for its target."""
+        merged = dns.message.QueryMessage(id=response.id)
+        merged.flags = response.flags
+        merged.set_rcode(chased.rcode())
+        for section, rrsets in ((merged.question, response.question),
+                                (merged.answer, response.answer + chased.answer),
+                                (merged.authority, chased.authority)):
+            for rrset in rrsets:
+                merged.find_rrset(section, rrset.name, rrset.rdclass, rrset.rdtype,
+                                  rrset.covers, create=True).update(rrset)
+        return merged
+
+    def query(self, qname, rdtype, rdclass, tcp=False, lifetime=None):
+        """
+        Resolve from the closest known zone cut, chasing referrals and CNAMEs.
+
+        Args:
+            qname (dns.name.Name): Name to query
+            rdtype (dns.rdatatype.RdataType): Record type
+            rdclass (dns.rdataclass.RdataClass): Record class
+            tcp (bool): Use TCP instead of UDP
+            lifetime (float, optional): Override the resolver lifetime
+
+        Returns:
+            tuple: (dns.message.Message response, Upstream that answered)
+        """
+        start = time.time()
+        deadline = start + (self.lifetime if lifetime is None else lifetime)
+        response, upstream = self._resolve(qname, rdtype, rdclass, tcp, deadline, 0)
+
+        # Authoritative servers do not chase CNAMEs into other zones: do it here
+        # and splice the chain into one response, as a recursive resolver would
+        for _ in range(MAX_CNAMES):
+            if rdtype == dns.rdatatype.CNAME or response.rcode() != dns.rcode.NOERROR:
+                break
+            try:
+                chain = response.resolve_chaining()
+            except dns.exception.DNSException:
+                break  # CNAME loop
+            if chain.answer is not None or chain.canonical_name == qname:
+                break
+            with self._lock:
+                self.stats['cnames'] += 1
+            chased, upstream = self._resolve(chain.canonical_name, rdtype, rdclass, tcp,
+                                             deadline, 0)
+            response = self._splice(response, chased)
+
+        response.flags |= dns.flags.RA
+        with self._lock:
+            self.stats['queries'] += 1
+            self._latencies.append(time.time() - start)
+        return response, upstream
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def _pools(self):
+        with self._lock:
+            return [(zone.name, zone.pool) for zone in self._zones.values()]
+
+    @property
+    def upstreams(self):
+        """Every authoritative server contacted so far (once each)."""
+        return list(dict.fromkeys(u for _, pool in self._pools() for u in pool.upstreams))
+
+    def latency_report(self):
+        """
+        Per-server latency percentiles and hedging counters summed over all
+        zones, plus the whole-query p99 (all referrals included).
+        """
+        report = {}
+        latencies, unhedged = [], []
+        for _, pool in self._pools():
+            for key, value in pool.stats.items():
+                report[key] = report.get(key, 0) + value
+            pool_latencies, pool_unhedged = pool.latency_samples()
+            latencies.extend(pool_latencies)
+            unhedged.extend(pool_unhedged)
+        with self._lock:
+            queries = list(self._latencies)
+        for name, values, pct in (('p50_ms', latencies, 50), ('p90_ms', latencies, 90),
+                                  ('p99_ms', latencies, 99), ('p99_unhedged_ms', unhedged, 99),
+                                  ('query_p99_ms', queries, 99)):
+            value = ResolverPool._percentile(values, pct)
+            report[name] = round(value * 1000, 1) if value is not None else None
+        report.update(self.stats)
+        return report
+
+    def summary(self, limit=20):
+        """Per-server statistics (busiest first) for the scan summary, with the zones each serves."""
+        now = time.time()
+        zones = {}
+        for name, pool in self._pools():
+            for upstream in pool.upstreams:
+                zones.setdefault(upstream, []).append(name.to_text())
+        rows = []
+        for upstream, names in zones.items():
+            if not upstream.sent:
+                continue
+            row = upstream.summary(now)
+            shown = ', '.join(sorted(names)[:2]) + (f" +{len(names) - 2}" if len(names) > 2 else '')
+            row['upstream'] = f"{upstream} ({shown})"
+            rows.append(row)
+        rows.sort(key=lambda row: row['sent'], reverse=True)
+        return rows[:limit]
@@ -0,0 +1,154 @@
+"""
+Memo of derived analyses, shared by every domain of a scan.
+
+Hundreds of domains often sit behind the same mail servers, name servers
+and CDN edges. The broker caches their DNS answers, but the strategies
+still rebuild the same verdicts from them for each domain ("this IP is on
+Spamhaus", "this IP is Cloudflare AS13335"). A Memo keeps each verdict
+under its true input (an IP, an ASN), computed once and shared.
+
+An entry lives as long as the answers it was built from: while a verdict
+is computed, the broker reports the expiration of every answer it returns
+(note_expiration), and the earliest one becomes the entry's expiration.
+Verdicts built on no positive answer at all (NXDOMAIN from every DNSBL)
+are kept for default_ttl. Like the broker, concurrent callers asking for
+the same entry wait for the one computing it.
+"""
+
+import contextvars
+import threading
+import time
+
+_expirations = contextvars.ContextVar('dns_recon_memo_expirations', default=None)
+
+
+def note_expiration(expires):
+    """Bound the entry being computed (if any) by an answer expiring at expires (time.time())."""
+    pending = _expirations.get()
+    if pending is not None:
+        pending.append(expires)
+
+
+class _Computing:
+    """An entry being computed that other callers can wait on."""
+
+    __slots__ = ('event', 'value', 'expires')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.expires = 0.0
+
+
+class Memo:
+    """
+    Thread-safe {(kind, key): value} store with answer-derived expiry.
+
+    Args:
+        default_ttl (int): Lifetime of entries built on no positive answer
+        max_entries (int): Expired entries are purged once this size is reached
+    """
+
+    def __init__(self, default_ttl=300, max_entries=100000):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries = {}  # (kind, key) -> (expires, value)
+        self._computing = {}
+        self.stats = {}  # kind -> {'hits', 'misses', 'coalesced', 'expired'}
+
+    def _count(self, kind, event):
+        """Caller holds the lock."""
+        counts = self.stats.get(kind)
+        if counts is None:
+            counts = self.stats[kind] = {'hits': 0, 'misses': 0, 'coalesced': 0, 'expired': 0}
+        counts[event] += 1
+
+    def _purge(self, now):
+        """Drop expired entries (caller holds the lock)."""
+        if len(self._entries) >= self.max_entries:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+
+    def get(self, kind, key, compute, keep=None):
+        """
+        Value of (kind, key), from compute() if it is not known yet.
+
+        None results and exceptions are not remembered: they mostly mean a
+        lookup failed, which is worth retrying.
+
+        Args:
+            kind (str): What is memoized ('asn', 'dnsbl', ...), for the stats
+            key (hashable): The input the value depends on (IP, ASN, host name)
+            compute (callable): Builds the value; its DNS lookups set the expiry
+            keep (callable, optional): keep(value) False hands the value to the
+                current callers without remembering it (built on failed lookups)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None:
+                if entry[0] > now:
+                    self._count(kind, 'hits')
+                    note_expiration(entry[0])
+                    return entry[1]
+                self._count(kind, 'expired')
+                del self._entries[(kind, key)]
+            pending = self._computing.get((kind, key))
+            owner = pending is None
+            if owner:
+                pending = self._computing[(kind, key)] = _Computing()
+                self._count(kind, 'misses')
+            else:
+                self._count(kind, 'coalesced')
+
+        if not owner:
+            pending.event.wait()
+            note_expiration(pending.expires)
+            return pending.value
+
+        expirations = []
+        token = _expirations.set(expirations)
+        try:
+            pending.value = compute()
+        finally:
+            _expirations.reset(token)
+            now = time.time()
+            pending.expires = min(expirations, default=now + self.default_ttl)
+            with self._lock:
+                del self._computing[(kind, key)]
+                if pending.value is not None and (keep is None or keep(pending.value)):
+                    self._purge(now)
+                    self._entries[(kind, key)] = (pending.expires, pending.value)
+            pending.event.set()
+        note_expiration(pending.expires)
+        return pending.value
+
+    def summary(self):
+        """Per kind: hits, misses (computations), coalesced waits and expired entries."""
+        with self._lock:
+            return {kind: dict(counts) for kind, counts in sorted(self.stats.items())}
+
+
+# ============================================================================
+# SHARED INSTANCE - Strategies call get_memo(), main.py may replace it
+# ============================================================================
+_memo = None
+_memo_lock = threading.Lock()
+
+
+def get_memo():
+    """Return the process-wide memo, creating it on first use."""
+    global _memo
+    if _memo is None:
+        with _memo_lock:
+            if _memo is None:
+                _memo = Memo()
+    return _memo
+
+
+def set_memo(memo):
+    """Install the memo every strategy will use from now on."""
+    global _memo
+    with _memo_lock:
+        _memo = memo
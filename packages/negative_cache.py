@@ -0,0 +1,184 @@
+"""
+Negative DNS caching (RFC 2308) with NXDOMAIN-cut pruning (RFC 8020).
+
+Remembers "this name does not exist" (NXDOMAIN) and "this name has no
+record of this type" (NODATA) answers for as long as the zone allows:
+min(SOA TTL, SOA MINIMUM) from the authority section. Responses without
+an SOA are not cached, as RFC 2308 recommends.
+
+NXDOMAIN-cut: once dev.example.com is known not to exist, nothing below
+it can exist either, so a.b.dev.example.com is answered locally.
+
+With a store (the persistent DiskCache), negative answers also outlive the
+run: entries missing from memory are looked up there and loaded back.
+"""
+
+import threading
+import time
+
+import dns.rdatatype
+import dns.resolver
+
+
+class NegativeCache:
+    """
+    Thread-safe store of NXDOMAIN and NODATA answers.
+
+    Args:
+        max_ttl (int): Upper bound on how long a negative answer is kept (RFC 2308: 3h)
+        max_entries (int): Expired entries are purged once this size is reached
+        nxdomain_cut (bool): Answer names below a known NXDOMAIN locally (RFC 8020)
+        store (DiskCache, optional): Persistent store shared with later runs
+    """
+
+    # Store keys of NXDOMAIN entries: (name, type, class) with a type that is
+    # never queried, NONE for cuts and ANY for names only proven by a CNAME
+    _CUT = dns.rdatatype.NONE
+    _NAME_ONLY = dns.rdatatype.ANY
+
+    def __init__(self, max_ttl=10800, max_entries=100000, nxdomain_cut=True, store=None):
+        self.max_ttl = max_ttl
+        self.max_entries = max_entries
+        self.nxdomain_cut = nxdomain_cut
+        self.store = store
+
+        self._lock = threading.Lock()
+        self._nxdomain = {}  # name -> (expires, response, is_cut)
+        self._nodata = {}    # (name, rdtype, rdclass) -> (expires, response)
+        self.stats = {'nxdomain_hits': 0, 'cut_hits': 0, 'nodata_hits': 0, 'stored_hits': 0}
+
+    def _negative_ttl(self, response):
+        """
+        RFC 2308 section 5 TTL for a negative response, or None if it
+        must not be cached (no SOA in the authority section).
+        """
+        if not any(rrset.rdtype == dns.rdatatype.SOA for rrset in response.authority):
+            return None
+        try:
+            chain = response.resolve_chaining()
+        except Exception:
+            return None
+        return min(chain.minimum_ttl, self.max_ttl)
+
+    def _ancestors(self, qname):
+        """qname, then the ancestors whose NXDOMAIN would cover it."""
+        name = qname
+        while True:
+            yield name
+            if not self.nxdomain_cut or len(name) <= 3:
+                # Never apply a cut from the root or a TLD
+                return
+            name = name.parent()
+
+    def _purge(self, now):
+        """Drop expired entries (caller holds the lock)."""
+        if len(self._nxdomain) + len(self._nodata) < self.max_entries:
+            return
+        self._nxdomain = {k: v for k, v in self._nxdomain.items() if v[0] > now}
+        self._nodata = {k: v for k, v in self._nodata.items() if v[0] > now}
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def check(self, key):
+        """
+        Raise the cached negative answer for key, if there is one.
+
+        Args:
+            key (tuple): (dns.name.Name, rdtype, rdclass)
+
+        Raises:
+            dns.resolver.NXDOMAIN: The name (or one of its ancestors) does not exist
+            dns.resolver.NoAnswer: The name exists but has no record of this type
+        """
+        self._check_memory(key)
+        if self.store is not None and self._load(key):
+            self._check_memory(key)
+
+    def _check_memory(self, key):
+        qname = key[0]
+        now = time.time()
+
+        with self._lock:
+            for name in self._ancestors(qname):
+                entry = self._nxdomain.get(name)
+                if entry is not None and entry[0] > now and (name == qname or entry[2]):
+                    self.stats['nxdomain_hits' if name == qname else 'cut_hits'] += 1
+                    raise dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: entry[1]})
+
+            entry = self._nodata.get(key)
+            if entry is not None and entry[0] > now:
+                self.stats['nodata_hits'] += 1
+                raise dns.resolver.NoAnswer(response=entry[1])
+
+    def _load(self, key):
+        """Copy the stored negative answers covering key into memory; True if any."""
+        qname, _, rdclass = key
+        found = {}
+        for name in self._ancestors(qname):
+            entry = self.store.get_negative((name, self._CUT, rdclass))
+            if entry is not None:
+                found[name] = (entry[1], entry[0], True)
+                break
+            if name == qname:
+                entry = self.store.get_negative((name, self._NAME_ONLY, rdclass))
+                if entry is not None:
+                    found[name] = (entry[1], entry[0], False)
+                    break
+        nodata = None if found else self.store.get_negative(key)
+        if not found and nodata is None:
+            return False
+        with self._lock:
+            self.stats['stored_hits'] += 1
+            self._nxdomain.update(found)
+            if nodata is not None:
+                self._nodata[key] = (nodata[1], nodata[0])
+        return True
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def add(self, key, error):
+        """
+        Remember a negative answer raised by the resolver.
+
+        Args:
+            key (tuple): (dns.name.Name, rdtype, rdclass) that was queried
+            error (Exception): NXDOMAIN or NoAnswer from dns.resolver; other errors are ignored
+        """
+        if isinstance(error, dns.resolver.NXDOMAIN):
+            response = error.kwargs.get('responses', {}).get(key[0])
+            if response is None:
+                return
+            ttl = self._negative_ttl(response)
+            if ttl is None:
+                return
+            now = time.time()
+            # With a CNAME chain, only the last name is proven nonexistent
+            canonical = response.resolve_chaining().canonical_name
+            with self._lock:
+                self._purge(now)
+                expires = now + ttl
+                self._nxdomain[canonical] = (expires, response, True)
+                if canonical != key[0]:
+                    self._nxdomain[key[0]] = (expires, response, False)
+            if self.store is not None:
+                self.store.put_negative((canonical, self._CUT, key[2]), response, expires)
+                if canonical != key[0]:
+                    self.store.put_negative((key[0], self._NAME_ONLY, key[2]), response, expires)
+
+        elif isinstance(error, dns.resolver.NoAnswer):
+            response = error.kwargs.get('response')
+            if response is None:
+                return
+            ttl = self._negative_ttl(response)
+            if ttl is None:
+                return
+            now = time.time()
+            with self._lock:
+                self._purge(now)
+                self._nodata[key] = (now + ttl, response)
+            if self.store is not None:
+                self.store.put_negative(key, response, now + ttl)
@@ -2,6 +2,8 @@
 
 import ipaddress
 
+from .records import IP
+
 
 def neighbors_ip_scan(ip, range_size=2):
     """Scan neighboring IP addresses (reduced range for speed).
@@ -11,7 +13,7 @@ def neighbors_ip_scan(ip, range_size=2):
         range_size (int): Number of IPs to check on each side (default: 2)
     
     Returns:
-        list: Neighboring IP addresses
+        list: Neighboring IP addresses (IP)
     """
     try:
         ip_obj = ipaddress.ip_address(ip)
@@ -23,7 +25,7 @@ def neighbors_ip_scan(ip, range_size=2):
                 continue
             try:
                 neighbor = ip_obj + offset
-                neighbors.append(str(neighbor))
+                neighbors.append(IP(neighbor))
             except:
                 pass
         
@@ -0,0 +1,175 @@
+"""
+Scan planner: fit a scan into a time or query budget.
+
+--fast and --thorough only move the depth and result limits. With
+--time-budget / --query-budget the planner estimates a scan before it
+starts, from the cost each strategy declares (queries per call, what they
+scale with, time spent besides queries; see registry.Plugin), and keeps the
+deepest crawl and the most valuable strategies that fit. --dry-run prints
+the same estimate without sending a packet.
+
+The estimate is coarse on purpose: target counts come from a fixed fan-out
+per depth (capped by --max-results), queries are counted as if nothing
+were cached, and every query is assumed to take TYPICAL_RTT. It is good
+for ranking choices; --time-budget also becomes the scan timeout, which
+enforces it.
+"""
+
+from . import SHARED_INPUTS, STRATEGIES, STRATEGY_LANES, STRATEGY_LIMITS
+from .bulkhead import Bulkheads
+
+TYPICAL_RTT = 0.05  # Seconds per query against a recursive resolver
+NAMES_PER_DOMAIN = 4  # New names one domain leads to at the next depth
+IPS_PER_DOMAIN = 2
+APEX_SHARE = 0.3  # Names past the target that turn out to be zone apexes
+ESSENTIAL = 3  # Strategies of this value cost depth before they are dropped
+
+# Expected count of what Plugin.per counts queries per
+DEFAULT_FANOUT = {
+    'mail_ip': 2,
+    'service': 32,
+}
+
+
+class Plan:
+    """
+    Strategies and depth chosen for a scan, with their estimated cost.
+
+    Attributes:
+        depth (int): Crawl depth
+        targets (dict): Estimated 'domains', 'apexes' and 'ips' scanned
+        rows (list): Per strategy: {'strategy', 'lane', 'calls', 'queries', 'seconds'}
+        dropped (list): Enabled strategies left out to fit the budget
+        duration (float): Estimated wall-clock seconds
+    """
+
+    def __init__(self, depth, targets, rows, dropped, duration):
+        self.depth = depth
+        self.targets = targets
+        self.rows = rows
+        self.dropped = dropped
+        self.duration = duration
+
+    @property
+    def queries(self):
+        return sum(row['queries'] for row in self.rows)
+
+    def apply(self, args):
+        """Set args.depth and disable the dropped strategies."""
+        args.depth = self.depth
+        for name in self.dropped:
+            setattr(args, f'disable_{name}', True)
+
+
+class ScanPlanner:
+    """
+    Estimates scans and picks what fits a budget.
+
+    Args:
+        strategies (list): Enabled strategy names (domain and IP ones)
+        depth (int): Deepest crawl wanted (--depth)
+        max_results (int): --max-results, caps the targets estimated
+        threads (int): --threads
+        fanout (dict, optional): Overrides of DEFAULT_FANOUT (e.g. the --srv-services count)
+        rtt (float): Seconds per query
+    """
+
+    def __init__(self, strategies, depth, max_results, threads, fanout=None, rtt=TYPICAL_RTT):
+        # Names without an implementation (subdomains, axfr) never run
+        self.strategies = [name for name in strategies if name in STRATEGIES]
+        self.depth = depth
+        self.max_results = max_results
+        self.threads = threads
+        self.fanout = {**DEFAULT_FANOUT, **(fanout or {})}
+        self.rtt = rtt
+
+    # ------------------------------------------------------------------
+    # Estimates
+    # ------------------------------------------------------------------
+
+    def targets(self, depth):
+        """Domains, zone apexes and IPs a crawl to depth is expected to scan."""
+        domains, level = 1, 1
+        for _ in range(depth):
+            level *= NAMES_PER_DOMAIN
+            domains += level
+        ips = domains * IPS_PER_DOMAIN
+        if domains + ips > self.max_results:
+            scale = self.max_results / (domains + ips)
+            domains, ips = max(1, round(domains * scale)), round(ips * scale)
+        return {'domains': domains, 'apexes': 1 + round((domains - 1) * APEX_SHARE), 'ips': ips}
+
+    def row(self, name, targets, plugins=STRATEGIES):
+        """Cost of running strategy name on every target of its scope."""
+        plugin = plugins.plugin(name)
+        calls = targets[{'apex': 'apexes', 'host': 'domains', 'ip': 'ips'}[plugin.scope]]
+        queries = plugin.queries * (self.fanout.get(plugin.per, 1) if plugin.per else 1)
+        return {
+            'strategy': name,
+            'lane': STRATEGY_LANES.get(name, 'fast'),
+            'calls': calls,
+            'queries': calls * queries,
+            'seconds': calls * (queries * self.rtt + plugin.delay),
+        }
+
+    def duration(self, rows, depth):
+        """Wall-clock estimate: the busiest lane, or one call per depth level in a row."""
+        lane_workers = Bulkheads.lane_workers(self.threads)
+        busy = {}
+        longest = 0.0
+        for row in rows:
+            if row['lane'] == 'fast':
+                busy['fast'] = busy.get('fast', 0.0) + row['seconds'] / self.threads
+            else:
+                workers = min(lane_workers, STRATEGY_LIMITS.get(row['strategy'], lane_workers))
+                busy[row['lane']] = busy.get(row['lane'], 0.0) + row['seconds'] / workers
+            if row['calls']:
+                longest = max(longest, row['seconds'] / row['calls'])
+        return max([longest * (depth + 1), *busy.values()])
+
+    def estimate(self, depth, names):
+        """Plan running names to depth."""
+        targets = self.targets(depth)
+        rows = [self.row(name, targets) for name in names]
+        # Shared inputs are fetched once per domain for all the strategies using them
+        shared = {producer for name in names
+                  for producer in STRATEGIES.plugin(name).inputs.values() if producer in SHARED_INPUTS}
+        rows += [self.row(producer, targets, SHARED_INPUTS) for producer in sorted(shared)]
+        dropped = [name for name in self.strategies if name not in names]
+        return Plan(depth, targets, rows, dropped, self.duration(rows, depth))
+
+    # ------------------------------------------------------------------
+    # Budgets
+    # ------------------------------------------------------------------
+
+    def plan(self, time_budget=None, query_budget=None):
+        """
+        Deepest, most valuable plan within the budgets.
+
+        Strategies are added by value, cheapest first within a value, while
+        the plan still fits. A depth is kept only if every ESSENTIAL
+        strategy fits at it; depth 0 takes whatever fits.
+
+        Args:
+            time_budget (float, optional): Seconds
+            query_budget (int, optional): DNS queries
+        """
+        def fits(plan):
+            return ((not time_budget or plan.duration <= time_budget)
+                    and (not query_budget or plan.queries <= query_budget))
+
+        full = self.estimate(self.depth, self.strategies)
+        if fits(full):
+            return full
+
+        targets = self.targets(0)
+        ranked = sorted(self.strategies, key=lambda name: (-STRATEGIES.plugin(name).value,
+                                                           self.row(name, targets)['seconds']))
+        essential = {name for name in ranked if STRATEGIES.plugin(name).value >= ESSENTIAL}
+        for depth in range(self.depth, -1, -1):
+            chosen = []
+            for name in ranked:
+                if fits(self.estimate(depth, chosen + [name])):
+                    chosen.append(name)
+            if essential <= set(chosen) or depth == 0:
+                return self.estimate(depth, [name for name in self.strategies if name in chosen])
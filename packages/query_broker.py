@@ -0,0 +1,216 @@
+"""
+Shared DNS query broker with in-flight request coalescing.
+
+Every scanning module sends its lookups through one broker instead of
+building its own resolver. When several strategies ask for the same
+(qname, qtype, class) at the same time (e.g. apex TXT for spf, txt,
+security_txt and cdn_enhanced), only the first one goes on the wire and
+the others wait for its answer. NXDOMAIN/NODATA answers are remembered
+by the negative cache, so absent data is only asked for once. Wire queries
+go out through the resolver pool (one or many upstreams), paced by an
+optional per-zone rate limit.
+"""
+
+import threading
+
+import dns.name
+import dns.rdataclass
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+
+from .deadline import current_deadline
+from .memo import note_expiration
+from .negative_cache import NegativeCache
+from .resolver_pool import ResolverPool
+
+
+class _InFlight:
+    """A wire query that other callers can wait on."""
+
+    __slots__ = ('event', 'answer', 'error', '_waiters', '_lock')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.answer = None
+        self.error = None
+        self._waiters = []
+        self._lock = threading.Lock()
+
+    def waiter(self):
+        """Event of its own for one waiter (its deadline may set it too), set when the query is done."""
+        woken = threading.Event()
+        with self._lock:
+            if self.event.is_set():
+                woken.set()
+            else:
+                self._waiters.append(woken)
+        return woken
+
+    def finish(self):
+        with self._lock:
+            self.event.set()
+            waiters, self._waiters = self._waiters, []
+        for woken in waiters:
+            woken.set()
+
+
+class QueryBroker:
+    """
+    Single entry point for DNS lookups made by the strategies.
+
+    Offers the same ``resolve()`` call as ``dns.resolver.Resolver`` so it can
+    be passed anywhere a ``resolver_obj`` is accepted.
+
+    Args:
+        pool (ResolverPool, optional): Upstreams used for wire queries (default: system resolvers)
+        cache (dns.resolver.LRUCache, optional): Answer cache shared by all callers
+        negative_cache (NegativeCache, optional): NXDOMAIN/NODATA cache
+        zone_limiter (ZoneRateLimiter, optional): QPS ceiling per target zone
+    """
+
+    def __init__(self, pool=None, cache=None, negative_cache=None, zone_limiter=None):
+        if pool is None:
+            pool = ResolverPool.from_system()
+        self.pool = pool
+        self.cache = cache
+        self.negative_cache = negative_cache
+        self.zone_limiter = zone_limiter
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.stats = {'queries': 0, 'sent': 0, 'coalesced': 0, 'cache_hits': 0,
+                      'negative_hits': 0}
+
+    @staticmethod
+    def _key(qname, rdtype, rdclass):
+        """Normalize a lookup into a hashable (name, type, class) key."""
+        if isinstance(qname, str):
+            qname = dns.name.from_text(qname)
+        return (qname, dns.rdatatype.RdataType.make(rdtype),
+                dns.rdataclass.RdataClass.make(rdclass))
+
+    def resolve(self, qname, rdtype='A', rdclass='IN', tcp=False, lifetime=None,
+                use_cache=True):
+        """
+        Resolve a query, sharing the answer with identical concurrent lookups.
+
+        Args:
+            qname (str | dns.name.Name): Name to look up
+            rdtype (str | int): Record type (default: A)
+            rdclass (str | int): Record class (default: IN)
+            tcp (bool): Force TCP for the wire query
+            lifetime (float, optional): Override the pool lifetime (always
+                clamped to the current deadline, see deadline.py)
+            use_cache (bool): Set False to skip cached answers (e.g. round-robin checks)
+
+        Returns:
+            dns.resolver.Answer: The answer to the query
+
+        Raises:
+            dns.exception.DNSException: Same errors as dns.resolver.Resolver.resolve
+                (NXDOMAIN, NoAnswer, LifetimeTimeout, NoNameservers)
+        """
+        key = self._key(qname, rdtype, rdclass)
+
+        if use_cache and self.cache is not None:
+            answer = self.cache.get(key)
+            if answer is not None:
+                with self._lock:
+                    self.stats['queries'] += 1
+                    self.stats['cache_hits'] += 1
+                note_expiration(answer.expiration)
+                return answer
+
+        if use_cache:
+            if self.negative_cache is not None:
+                try:
+                    self.negative_cache.check(key)
+                except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                    with self._lock:
+                        self.stats['queries'] += 1
+                        self.stats['negative_hits'] += 1
+                    raise
+
+        # The scan/domain deadline bounds the wire query and the wait for it
+        deadline = current_deadline()
+        if deadline is not None:
+            lifetime = deadline.clamp(self.pool.lifetime if lifetime is None else lifetime)
+
+        with self._lock:
+            self.stats['queries'] += 1
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = _InFlight()
+                self._inflight[key] = pending
+            else:
+                self.stats['coalesced'] += 1
+
+        if owner:
+            try:
+                if self.zone_limiter is not None:
+                    budget = self.pool.lifetime if lifetime is None else lifetime
+                    if not self.zone_limiter.acquire(key[0], key[1], self, budget):
+                        raise dns.resolver.LifetimeTimeout(timeout=budget, errors=[])
+                response, upstream = self.pool.query(key[0], key[1], key[2],
+                                                     tcp=tcp, lifetime=lifetime)
+                pending.answer = self._answer(key, response, upstream)
+                if self.cache is not None:
+                    self.cache.put(key, pending.answer)
+            except Exception as e:
+                pending.error = e
+                if self.negative_cache is not None:
+                    self.negative_cache.add(key, e)
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                    self.stats['sent'] += 1
+                pending.finish()
+        elif deadline is None:
+            pending.event.wait()
+        elif not deadline.wait(pending.waiter()) and not pending.event.is_set():
+            # Deadline passed or cancelled: stop waiting for the owner
+            raise dns.resolver.LifetimeTimeout(timeout=lifetime, errors=[])
+
+        if pending.error is not None:
+            raise pending.error
+        note_expiration(pending.answer.expiration)  # Bounds memoized verdicts built on it
+        return pending.answer
+
+    @staticmethod
+    def _answer(key, response, upstream):
+        """Turn a wire response into an Answer, or the matching resolver error."""
+        qname, rdtype, rdclass = key
+        if response.rcode() == dns.rcode.NXDOMAIN:
+            raise dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: response})
+        answer = dns.resolver.Answer(qname, rdtype, rdclass, response,
+                                     upstream.address, upstream.port)
+        if answer.rrset is None:
+            raise dns.resolver.NoAnswer(response=response)
+        return answer
+
+
+# ============================================================================
+# SHARED INSTANCE - Strategies call get_broker(), main.py may replace it
+# ============================================================================
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker, creating a default one on first use."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = QueryBroker(cache=dns.resolver.LRUCache(),
+                                      negative_cache=NegativeCache())
+    return _broker
+
+
+def set_broker(broker):
+    """Install the broker every strategy will use from now on."""
+    global _broker
+    with _broker_lock:
+        _broker = broker
@@ -0,0 +1,227 @@
+"""
+Query rate limiting with token buckets.
+
+Resolvers (and the authoritative servers behind them) answer bursts with
+SERVFAIL or silence once a client goes over their limit, which a scan then
+reads as "no record". Pacing queries just under the limit gets more usable
+answers per second than bursting and collecting errors.
+
+Two ceilings are enforced:
+- per upstream resolver (ResolverPool, --upstream-qps)
+- per target zone, keyed by the zone's NS set (QueryBroker, --zone-qps),
+  so zones served by the same nameservers share one budget
+"""
+
+import threading
+import time
+
+import dns.exception
+import dns.name
+import dns.rdatatype
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Callers that find the bucket empty reserve a future token and sleep until
+    it is due, so waiting threads are served in arrival order at the target rate.
+
+    Args:
+        rate (float): Tokens added per second (queries per second)
+        burst (float, optional): Bucket size (default: rate / 10, at least 1)
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst) if burst else max(1.0, self.rate / 10)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'waits': 0, 'wait_seconds': 0.0}
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take a token if one is available right now, without waiting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.stats['acquired'] += 1
+            return True
+
+    def acquire(self, timeout=None):
+        """
+        Take a token, sleeping until one is due.
+
+        Args:
+            timeout (float, optional): Give up (without consuming) if the wait would be longer
+
+        Returns:
+            bool: True once a token was taken, False if it would exceed timeout
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            if timeout is not None and wait > timeout:
+                return False
+            self.tokens -= 1  # May go negative: a reservation for a later token
+            self.stats['acquired'] += 1
+            if wait:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds'] += wait
+        if wait:
+            time.sleep(wait)
+        return True
+
+    def charge(self, tokens):
+        """Take tokens already spent (queries sent without one); later callers wait for them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            self.stats['acquired'] += tokens
+
+
+class ZoneRateLimiter:
+    """
+    Per-zone query budgets, one token bucket per distinct NS set.
+
+    The zone of a name is found with ZoneCuts (the SOA owner in the answer
+    or authority section is the zone apex), and the NS set of each new apex
+    with an NS query on it. Both lookups go through the query broker: the
+    apex check every scanned name gets already made the same SOA query, so
+    most of them are cache hits, identical lookups from other threads are
+    coalesced, and the ones that do reach the wire are charged to the
+    zone's bucket once it is known. The result is kept for the name and
+    every name between it and its apex, which the SOA response proves to be
+    in the same zone. A name is never mapped to an ancestor apex without
+    that proof: below com. (learned from any NXDOMAIN) sit thousands of
+    zones with their own nameservers.
+
+    SOA and NS queries of names whose zone is not known yet are what
+    discovery itself asks (or what it waits on through coalescing), so they
+    are let through without a token instead of waiting on themselves.
+
+    Args:
+        qps (float): Queries per second allowed per NS set
+        burst (float, optional): Bucket size (default: qps / 10, at least 1)
+    """
+
+    def __init__(self, qps, burst=None):
+        self.qps = qps
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._apexes = {}   # apex name -> NS set key
+        self._zones = {}    # name -> NS set key of the zone it is in
+        self._buckets = {}  # NS set key -> TokenBucket
+        self._cuts = None   # ZoneCuts over the broker, made by the first discovery
+        self._local = threading.local()  # Wire queries of the discovery running on this thread
+
+    def _known_zone(self, qname):
+        """NS set key of qname's zone if it was learned already, or None."""
+        with self._lock:
+            return self._zones.get(qname)
+
+    def _bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.qps, self.burst)
+            return bucket
+
+    def _find_apex(self, qname, broker):
+        """Zone apex of qname, from the SOA record of the (cached) SOA lookup."""
+        if self._cuts is None:
+            # zone_cuts imports the broker, which imports this module
+            from .zone_cuts import ZoneCuts
+            self._cuts = ZoneCuts(resolver_obj=broker)
+        apex = self._cuts.apex(qname.to_text())
+        if apex is not None:
+            return dns.name.from_text(apex)
+        # Unknown: assume the parent zone is the one in charge
+        return qname.parent() if len(qname) > 2 else qname
+
+    def _discover(self, qname, broker):
+        """Learn the apex and NS set of qname's zone."""
+        apex = self._find_apex(qname, broker)
+        with self._lock:
+            key = self._apexes.get(apex)
+        if key is None:
+            key = frozenset([apex.to_text().lower()])
+            try:
+                answer = broker.resolve(apex, 'NS')
+                if answer.rrset.name == apex:
+                    key = frozenset(r.target.to_text().lower() for r in answer)
+            except dns.exception.DNSException:
+                pass
+        with self._lock:
+            self._apexes[apex] = key
+            # Names from qname up to the apex have no zone cut between them
+            name = qname
+            while name != apex and name.is_subdomain(apex) and name != dns.name.root:
+                self._zones[name] = key
+                name = name.parent()
+            self._zones[apex] = key
+        return key
+
+    def zone_key(self, qname, broker):
+        """
+        Key identifying the nameservers responsible for qname.
+
+        Args:
+            qname (dns.name.Name): Name being queried
+            broker (QueryBroker): Used for the SOA/NS discovery lookups
+
+        Returns:
+            frozenset: NS hostnames of the zone (or the apex name if NS is unknown)
+        """
+        key = self._known_zone(qname)
+        if key is not None:
+            return key
+
+        self._local.discovering, self._local.sent = True, 0
+        try:
+            key = self._discover(qname, broker)
+        finally:
+            self._local.discovering = False
+        if self._local.sent:
+            # Discovery queries count against the zone they were about
+            self._bucket(key).charge(self._local.sent)
+        return key
+
+    def acquire(self, qname, rdtype, broker, timeout=None):
+        """
+        Wait for the budget of qname's zone.
+
+        Args:
+            qname (dns.name.Name): Name about to be queried
+            rdtype (int): Its type
+            broker (QueryBroker): Used for the SOA/NS discovery lookups
+            timeout (float, optional): Longest wait
+
+        Returns:
+            bool: False if the wait would exceed timeout
+        """
+        if getattr(self._local, 'discovering', False):
+            # A discovery lookup of this thread: charged once its zone is known
+            self._local.sent += 1
+            return True
+        key = self._known_zone(qname)
+        if key is None:
+            if rdtype in (dns.rdatatype.SOA, dns.rdatatype.NS):
+                return True
+            key = self.zone_key(qname, broker)
+        return self._bucket(key).acquire(timeout)
+
+    def summary(self):
+        """Per NS-set statistics for the scan summary."""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return [
+            {'nameservers': sorted(key), **bucket.stats}
+            for key, bucket in buckets.items()
+        ]
@@ -0,0 +1,219 @@
+"""
+Typed results emitted by the strategies.
+
+Strategies used to return whatever suited them (lists of strings, lists of
+dicts, {domain: {...}} wrappers, plain dicts), and the mapper guessed which
+strings were domains to crawl. That guess missed names with no hyphen,
+never looked inside NS and MX results, and crawled CAA and TXT fragments
+as if they were domains. Every strategy now returns:
+
+- a list of Record (one per resource record: owner, type, value, TTL),
+  Host or IP;
+- or a Finding: a strategy's verdict on one subject (a dict, as before)
+  plus the hosts and IPs it points at;
+- or None (an empty list for list strategies) when it found nothing.
+
+Host and IP values are what gets crawled; nothing is guessed from text.
+All four classes use __slots__ and intern their names, so the thousands of
+records a large run keeps share one copy of each name and carry no
+per-object dict. plain() turns them back into the JSON-like structures the
+report and the exporters print.
+"""
+
+import ipaddress
+import re
+import sys
+
+# RFC 1123 labels (plus '_' for service names such as _spf or _dmarc)
+_LABEL = re.compile(r'^(?!-)[a-z0-9_-]{1,63}(?<!-)$')
+
+
+class Host:
+    """
+    A host name, normalized (lower case, no trailing dot) and interned.
+
+    Args:
+        name (str): Host name
+        ips (iterable, optional): IP addresses it resolved to
+    """
+
+    __slots__ = ('name', 'ips')
+
+    def __init__(self, name, ips=()):
+        self.name = sys.intern(str(name).rstrip('.').lower())
+        self.ips = tuple(ip if isinstance(ip, IP) else IP(ip) for ip in ips)
+
+    @classmethod
+    def parse(cls, text, ips=()):
+        """Host for text if it is a valid multi-label host name, else None."""
+        name = str(text).strip().rstrip('.').lower()
+        labels = name.split('.')
+        if (len(labels) < 2 or len(name) > 253 or labels[-1].isdigit()
+                or not all(_LABEL.match(label) for label in labels)):
+            return None
+        return cls(name, ips)
+
+    def __eq__(self, other):
+        return isinstance(other, Host) and other.name == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"Host({self.name!r})"
+
+    def plain(self):
+        if not self.ips:
+            return self.name
+        return {'host': self.name, 'ips': [ip.address for ip in self.ips]}
+
+
+class IP:
+    """
+    An IPv4 or IPv6 address in canonical form, interned.
+
+    Raises:
+        ValueError: address is not an IP address
+    """
+
+    __slots__ = ('address', 'version')
+
+    def __init__(self, address):
+        parsed = ipaddress.ip_address(str(address).strip())
+        self.address = sys.intern(parsed.compressed)
+        self.version = parsed.version
+
+    @classmethod
+    def parse(cls, text):
+        """IP for text, or None if it is not an address."""
+        try:
+            return cls(text)
+        except ValueError:
+            return None
+
+    def __eq__(self, other):
+        return isinstance(other, IP) and other.address == self.address
+
+    def __hash__(self):
+        return hash(self.address)
+
+    def __str__(self):
+        return self.address
+
+    def __repr__(self):
+        return f"IP({self.address!r})"
+
+    def plain(self):
+        return self.address
+
+
+class Record:
+    """
+    One resource record and what the strategy derived from it.
+
+    Args:
+        name (str): Owner name
+        rtype (str): Record type ('MX', 'CAA', ...)
+        value (Host | IP | str): Target host, address, or the record text
+        ttl (int, optional): TTL of the RRset
+        **attrs: Extra fields (priority, provider, ...); stored only when given
+    """
+
+    __slots__ = ('name', 'rtype', 'value', 'ttl', 'attrs')
+
+    def __init__(self, name, rtype, value, ttl=None, **attrs):
+        self.name = sys.intern(str(name).rstrip('.').lower())
+        self.rtype = sys.intern(rtype)
+        self.value = value
+        self.ttl = ttl
+        self.attrs = attrs or None
+
+    def get(self, key, default=None):
+        """Extra field key (default if the strategy did not set it)."""
+        return self.attrs.get(key, default) if self.attrs else default
+
+    def __str__(self):
+        return f"{self.rtype} {self.value}"
+
+    def __repr__(self):
+        return f"Record({self.name!r}, {self.rtype!r}, {self.value!r})"
+
+    def plain(self):
+        # The value stays a string (a column in the exporters); a host's IPs go beside it
+        record = {'type': self.rtype, 'value': str(self.value)}
+        if isinstance(self.value, Host) and self.value.ips:
+            record['ips'] = [ip.address for ip in self.value.ips]
+        if self.ttl is not None:
+            record['ttl'] = self.ttl
+        if self.attrs:
+            record.update(plain(self.attrs))
+        return record
+
+
+class Finding:
+    """
+    A strategy's verdict on one subject (domain or IP).
+
+    Args:
+        subject (str): Domain or IP the verdict is about
+        data (dict): The verdict itself
+        hosts (iterable, optional): Host objects (or names) it points at, to crawl
+        ips (iterable, optional): IP objects (or addresses) it points at, to crawl
+
+    A Finding with no data and nothing to crawl is false.
+    """
+
+    __slots__ = ('subject', 'data', 'hosts', 'ips')
+
+    def __init__(self, subject, data, hosts=(), ips=()):
+        self.subject = sys.intern(str(subject).rstrip('.').lower())
+        self.data = data
+        self.hosts = tuple(h for h in (h if isinstance(h, Host) else Host.parse(h) for h in hosts) if h)
+        self.ips = tuple(i for i in (i if isinstance(i, IP) else IP.parse(i) for i in ips) if i)
+
+    def __bool__(self):
+        return bool(self.data or self.hosts or self.ips)
+
+    def __str__(self):
+        return f"{self.subject}: {self.data}"
+
+    def __repr__(self):
+        return f"Finding({self.subject!r}, {self.data!r})"
+
+    def plain(self):
+        return {self.subject: plain(self.data)}
+
+
+def plain(value):
+    """value with every typed result replaced by plain dicts, lists and strings."""
+    if isinstance(value, (Host, IP, Record, Finding)):
+        return value.plain()
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value
+
+
+def discoveries(result):
+    """Host and IP objects a strategy result points at, in order, without duplicates."""
+    found = {}
+    items = result if isinstance(result, list) else [result]
+    for item in items:
+        if isinstance(item, Finding):
+            targets = [*item.hosts, *item.ips]
+        elif isinstance(item, Record):
+            targets = [item.value] if isinstance(item.value, (Host, IP)) else []
+        else:
+            targets = [item]
+        for target in targets:
+            if isinstance(target, Host):
+                found.setdefault(target, None)
+                for ip in target.ips:
+                    found.setdefault(ip, None)
+            elif isinstance(target, IP):
+                found.setdefault(target, None)
+    return list(found)
@@ -0,0 +1,182 @@
+"""
+Strategy and exporter registry with lazy imports.
+
+Building STRATEGIES used to import every scanning module, plus openpyxl and
+tqdm, on each start, even for a scan that runs one strategy. Here each
+strategy is a Plugin: its name, import target and metadata (record types,
+cost class, applicability), and its module is imported the first time the
+strategy is looked up.
+
+Other packages can add strategies and exporters through the entry point
+groups in ENTRY_POINT_GROUPS, e.g. in their pyproject.toml:
+
+    [project.entry-points."dns_recon.strategies"]
+    my_check = "my_package.plugins:MY_CHECK"
+
+The entry point should name a Plugin (cheap to import, its own target stays
+lazy); a plain function is also accepted and gets default metadata.
+Entry points are only read when a name is not built in, or when the whole
+registry is listed.
+"""
+
+import importlib
+import threading
+import warnings
+from collections.abc import Mapping
+
+ENTRY_POINT_GROUPS = {
+    'strategies': 'dns_recon.strategies',
+    'exporters': 'dns_recon.exporters',
+}
+
+COST_CLASSES = ('fast', 'slow_dns', 'probe')
+SCOPES = ('apex', 'host', 'ip')
+
+
+class Plugin:
+    """
+    A strategy or exporter, described without importing it.
+
+    Args:
+        name (str): Registry name (also the result key and --disable name)
+        target (str | callable): 'module:attribute' (module relative to this package
+            when it starts with '.'), or the object itself
+        record_types (tuple): DNS record types it queries
+        cost (str): 'fast' (shared executor), 'slow_dns' or 'probe' (own bulkhead lane)
+        scope (str): Where it applies: 'apex' (zone apexes), 'host' (any name) or 'ip'
+        limit (int, optional): Calls at once within its bulkhead lane
+        inputs (dict, optional): {keyword argument: producer} results it reuses
+        async_target (str, optional): Coroutine version for the async engine
+        queries (int, optional): DNS queries per call, for the scan planner
+            (default: one per record type)
+        per (str, optional): What queries is counted per ('mail_ip', 'service'), if not per call
+        delay (float): Seconds a call spends besides its queries (sleeps, HTTP)
+        value (int): Worth to the planner: 3 = drives discovery, 2 = common analysis, 1 = niche
+    """
+
+    def __init__(self, name, target, record_types=(), cost='fast', scope='host', limit=None,
+                 inputs=None, async_target=None, queries=None, per=None, delay=0.0, value=1):
+        if cost not in COST_CLASSES:
+            raise ValueError(f"unknown cost class for {name}: {cost!r}")
+        if scope not in SCOPES:
+            raise ValueError(f"unknown scope for {name}: {scope!r}")
+        self.name = name
+        self.target = target
+        self.record_types = tuple(record_types)
+        self.cost = cost
+        self.scope = scope
+        self.limit = limit
+        self.inputs = dict(inputs or {})
+        self.async_target = async_target
+        self.queries = len(self.record_types) if queries is None else queries
+        self.per = per
+        self.delay = delay
+        self.value = value
+
+    def __repr__(self):
+        return f"Plugin({self.name!r}, {self.target!r})"
+
+    @staticmethod
+    def _import(target):
+        if not isinstance(target, str):
+            return target
+        module, _, attribute = target.partition(':')
+        return getattr(importlib.import_module(module, __package__), attribute)
+
+    def load(self):
+        """The strategy or exporter itself (imported on first call)."""
+        if isinstance(self.target, str):
+            self.target = self._import(self.target)
+        return self.target
+
+    def load_async(self):
+        """Coroutine version, or None if there is none."""
+        if isinstance(self.async_target, str):
+            self.async_target = self._import(self.async_target)
+        return self.async_target
+
+
+class LazyRegistry(Mapping):
+    """
+    {name: callable} mapping that imports each entry on first lookup.
+
+    Membership tests and listing never import an entry.
+
+    Args:
+        plugins (iterable): Built-in Plugin entries
+        group (str, optional): Entry point group with more entries
+        on_register (callable, optional): Called with every Plugin added,
+            built-in or discovered (to index its metadata)
+        attribute (str): 'load' for the entries, 'load_async' for their coroutines
+    """
+
+    def __init__(self, plugins, group=None, on_register=None, attribute='load'):
+        self.group = group
+        self.on_register = on_register
+        self.attribute = attribute
+        self._plugins = {}
+        self._discovered = None  # Names found through entry points, once read
+        self._lock = threading.Lock()
+        for plugin in plugins:
+            self.register(plugin)
+
+    def register(self, plugin):
+        """Add (or replace) an entry."""
+        self._plugins[plugin.name] = plugin
+        if self.on_register is not None:
+            self.on_register(plugin)
+
+    def plugin(self, name):
+        """Metadata of name (KeyError if unknown)."""
+        if name not in self._plugins:
+            self.discover()
+        return self._plugins[name]
+
+    def discover(self):
+        """Read the entry point group once; returns the names it added."""
+        if self._discovered is not None or self.group is None:
+            return self._discovered or []
+        with self._lock:
+            if self._discovered is not None:
+                return self._discovered
+            from importlib import metadata  # Only paid when plugins are looked for
+
+            try:
+                entries = metadata.entry_points(group=self.group)
+            except TypeError:  # Python < 3.10: {group: [entries]}
+                entries = metadata.entry_points().get(self.group, [])
+            names = []
+            for entry in entries:
+                if entry.name in self._plugins:
+                    continue  # Built-ins win
+                try:
+                    found = entry.load()
+                except Exception as e:
+                    warnings.warn(f"{self.group} plugin {entry.name!r} failed to load: {e}")
+                    continue
+                plugin = found if isinstance(found, Plugin) else Plugin(entry.name, found)
+                self.register(plugin)
+                names.append(plugin.name)
+            self._discovered = names
+            return names
+
+    def __getitem__(self, name):
+        value = getattr(self.plugin(name), self.attribute)()
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        if name not in self._plugins:
+            self.discover()
+        plugin = self._plugins.get(name)
+        if plugin is None:
+            return False
+        return self.attribute == 'load' or plugin.async_target is not None
+
+    def __iter__(self):
+        self.discover()
+        return iter([name for name in list(self._plugins) if name in self])
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,690 @@
+"""
+Multi-upstream resolver pool.
+
+Spreads queries across one or many recursive resolvers (--nameserver),
+preferring healthy, low-latency servers. An upstream that keeps timing out
+or answering SERVFAIL is ejected for a while and retried later.
+The query broker sends every wire query through this pool.
+
+Per-attempt timeouts are not fixed: each upstream keeps a smoothed RTT and
+RTT variance (TCP retransmission timer style, RFC 6298) for UDP and TCP
+separately, and waits SRTT + 4 * RTTVAR before giving up on a packet.
+
+Slow UDP queries are hedged: once a query has waited longer than the recent
+p90 latency, the same question goes to a second upstream and whichever
+usable answer comes first wins. UDP queries share a few long-lived
+sockets (udp_transport) instead of opening one per query; TCP and DNS over
+TLS reuse pipelined connections (stream_transport), DNS over HTTPS one
+HTTP/2 connection (doh_transport).
+"""
+
+import collections
+import contextlib
+import ipaddress
+import os
+import random
+import threading
+import time
+
+import dns.exception
+import dns.flags
+import dns.inet
+import dns.message
+import dns.rcode
+import dns.resolver
+
+from .aimd import AimdLimit
+from .deadline import current_deadline
+from .rate_limit import TokenBucket
+from .stream_transport import StreamTransport
+from .udp_transport import UdpTransport
+
+
+class _OverBudget(Exception):
+    """The upstream's QPS or concurrency budget cannot be met before the query expires."""
+
+
+class RttEstimator:
+    """
+    Smoothed round-trip time and retransmission timeout (RFC 6298).
+
+    Args:
+        min_timeout (float): Lower bound on the derived timeout (seconds)
+        max_timeout (float): Upper bound, also used before any sample exists
+    """
+
+    ALPHA = 1 / 8  # SRTT gain
+    BETA = 1 / 4   # RTTVAR gain
+
+    def __init__(self, min_timeout, max_timeout):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt = None
+        self.rttvar = None
+        self.backoff = 1  # Doubled on each timeout, reset by the next sample
+
+    def observe(self, rtt):
+        """Feed one measured round trip (seconds)."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.backoff = 1
+
+    def timed_out(self):
+        """Exponential backoff after a lost packet (Karn)."""
+        self.backoff = min(self.backoff * 2, 64)
+
+    def timeout(self):
+        """Seconds to wait for the next answer from this upstream."""
+        if self.srtt is None:
+            return self.max_timeout
+        rto = (self.srtt + 4 * self.rttvar) * self.backoff
+        return min(max(rto, self.min_timeout), self.max_timeout)
+
+
+class Upstream:
+    """One recursive resolver with its health and RTT statistics."""
+
+    def __init__(self, address, port=53, min_timeout=0.1, max_timeout=2, qps=None,
+                 concurrency=None):
+        self.address = address
+        self.port = port
+        self.bucket = TokenBucket(qps) if qps else None
+        self.limit = AimdLimit(concurrency) if concurrency else None  # Adaptive queries in flight
+
+        self.sent = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        # Separate estimates: TCP pays a handshake, UDP does not
+        self.rtt = {
+            'udp': RttEstimator(min_timeout, max_timeout),
+            'tcp': RttEstimator(min_timeout, max_timeout),
+        }
+
+    @property
+    def latency(self):
+        """Smoothed RTT in seconds (UDP, else TCP), None until measured."""
+        return self.rtt['udp'].srtt if self.rtt['udp'].srtt is not None else self.rtt['tcp'].srtt
+
+    def __str__(self):
+        if self.port == 53 or self.address.startswith('https://'):
+            return self.address
+        host = f"[{self.address}]" if ':' in self.address else self.address
+        return f"{host}:{self.port}"
+
+    def healthy(self, now):
+        return now >= self.ejected_until
+
+    def summary(self, now):
+        """Statistics row for the scan summary."""
+        return {
+            'upstream': str(self),
+            'sent': self.sent,
+            'failures': self.failures,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'timeout_ms': {t: round(est.timeout() * 1000) for t, est in self.rtt.items()},
+            'ejected': not self.healthy(now),
+            'throttled_s': round(self.bucket.stats['wait_seconds'], 2) if self.bucket else 0.0,
+            'concurrency': self.limit.summary() if self.limit else None,
+        }
+
+
+class SharedUpstreams:
+    """
+    Upstream objects shared by several pools, with the lock that guards them.
+
+    A server reached through several pools (an authoritative server hosting
+    many zones, under --iterative) then keeps one QPS budget, one RTT
+    estimate, one ejection state and one concurrency limit.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._upstreams = {}  # (address, port) -> Upstream
+
+    def get(self, address, port, create):
+        """The shared Upstream for address and port, from create() the first time."""
+        with self.lock:
+            upstream = self._upstreams.get((address, port))
+            if upstream is None:
+                upstream = self._upstreams[address, port] = create()
+            return upstream
+
+
+class ResolverPool:
+    """
+    Load-balanced set of upstream resolvers.
+
+    Healthy upstreams are picked at random, weighted by inverse latency, so
+    load spreads over every node while slow ones get less of it.
+
+    Args:
+        nameservers (list): Upstream addresses ('1.1.1.1', '10.0.0.2:5353', '[2001:db8::1]:53')
+        timeout (float): Longest wait for one attempt; the adaptive timeout never exceeds it
+        lifetime (float, optional): Total seconds per query across retries (default: 2 x timeout)
+        eject_after (int): Consecutive failures before an upstream is ejected
+        eject_seconds (float): How long an ejected upstream sits out
+        min_timeout (float): Shortest adaptive per-attempt timeout
+        hedge (bool): Race a second upstream when an answer is slower than usual
+        hedge_percentile (float): Latency percentile after which a query is hedged
+        qps (float, optional): Query ceiling per upstream (default: unlimited)
+        concurrency (int, optional): Ceiling of the adaptive (AIMD) limit on queries in
+            flight per upstream (default: no limit)
+        udp (UdpTransport, optional): Shared UDP sockets (default: a new transport)
+        transport (str): Primary transport: 'udp' (TCP after truncation), 'tcp', 'tls'
+            or 'https' (DoH; nameservers may be URLs, bare IPs become https://IP/dns-query)
+        stream (StreamTransport | DohTransport, optional): Pooled TCP/TLS connections or
+            DoH client (default: matches transport)
+        shared (SharedUpstreams, optional): Upstreams (and lock) shared with other pools
+    """
+
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_WINDOW = 512
+    LATENCY_WINDOW = 4096  # Queries the latency percentiles are computed over
+
+    def __init__(self, nameservers, timeout=2, lifetime=None, eject_after=3, eject_seconds=30,
+                 min_timeout=0.1, hedge=True, hedge_percentile=90, qps=None,
+                 udp=None, transport='udp', stream=None, concurrency=None, shared=None):
+        if not nameservers:
+            raise ValueError("resolver pool needs at least one nameserver")
+        if transport not in ('udp', 'tcp', 'tls', 'https'):
+            raise ValueError(f"unknown DNS transport: {transport!r}")
+        self.transport = transport
+        self.default_port = {'tls': 853, 'https': 443}.get(transport, 53)
+        self.timeout = timeout
+        self.min_timeout = min(min_timeout, timeout)
+        self.qps = qps
+        self.concurrency = concurrency
+        self.shared = shared
+        self.upstreams = [self._parse(ns) for ns in nameservers]
+        self.lifetime = lifetime if lifetime is not None else timeout * 2
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.hedge = hedge
+        self.udp = udp if udp is not None else UdpTransport()
+        if stream is None and transport == 'https':
+            # httpx is only loaded for DoH; importing it costs every other run startup time
+            from .doh_transport import DohTransport
+            stream = DohTransport()
+        elif stream is None:
+            stream = StreamTransport(tls=transport == 'tls')
+        self.stream = stream
+        self.hedge_percentile = hedge_percentile
+        # Pools sharing upstreams update them under the same lock
+        self._lock = shared.lock if shared is not None else threading.Lock()
+
+        self._rtt_samples = collections.deque(maxlen=self.HEDGE_WINDOW)
+        # Whole-query latency of the last answered queries, and the same with hedge
+        # wins replaced by when the primary really answered; bounded so long scans
+        # keep flat memory
+        self._latencies = collections.deque(maxlen=self.LATENCY_WINDOW)
+        self._unhedged_latencies = collections.deque(maxlen=self.LATENCY_WINDOW)
+        # Primaries that lost to a hedge, still awaited for their answer time:
+        # (ticket, upstream, sent_at, expiration, query start)
+        self._stragglers = []
+        self.stats = {'hedges': 0, 'hedge_wins': 0, 'timeouts': 0, 'servfail': 0,
+                      'refused': 0, 'truncated': 0}
+
+    # ------------------------------------------------------------------
+    # Construction helpers
+    # ------------------------------------------------------------------
+
+    def _parse(self, spec):
+        """Parse 'ip', 'ip:port', '[ipv6]:port' or a DoH URL into an Upstream."""
+        spec = spec.strip()
+        if spec.startswith('https://'):
+            if self.transport != 'https':
+                raise ValueError(f"DoH URL {spec!r} needs the https transport")
+            return self._upstream(spec, 443)
+        port = self.default_port
+        if spec.startswith('['):
+            host, _, rest = spec[1:].partition(']')
+            if rest.startswith(':'):
+                port = int(rest[1:])
+        elif spec.count(':') == 1:
+            host, port = spec.split(':')
+            port = int(port)
+        else:
+            host = spec
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            raise ValueError(f"invalid nameserver address: {spec!r}")
+        if self.transport == 'https':
+            # Public resolvers also serve DoH on their IP (1.1.1.1, 8.8.8.8, 9.9.9.9)
+            authority = f"[{host}]" if ':' in host else host
+            if port != 443:
+                authority = f"{authority}:{port}"
+            return self._upstream(f"https://{authority}/dns-query", 443)
+        return self._upstream(host, port)
+
+    def _upstream(self, address, port):
+        """A new Upstream, or the shared one for that server."""
+        def create():
+            return Upstream(address, port, self.min_timeout, self.timeout, self.qps, self.concurrency)
+        if self.shared is None:
+            return create()
+        return self.shared.get(address, port, create)
+
+    @staticmethod
+    def load_nameservers(spec):
+        """
+        Expand a --nameserver value into a list of addresses.
+
+        Args:
+            spec (str): Comma-separated addresses, or a file with one per line ('#' comments)
+
+        Returns:
+            list: Nameserver address strings
+        """
+        if os.path.isfile(spec):
+            with open(spec, 'r', encoding='utf-8') as f:
+                entries = [line.split('#')[0].strip() for line in f]
+        else:
+            entries = [s.strip() for s in spec.split(',')]
+        return [e for e in entries if e]
+
+    @classmethod
+    def from_system(cls, **kwargs):
+        """Build a pool from the system resolver configuration (/etc/resolv.conf)."""
+        return cls(dns.resolver.Resolver().nameservers, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Selection and health
+    # ------------------------------------------------------------------
+
+    def pick(self, exclude=()):
+        """Choose the upstream for the next attempt (never returns None)."""
+        now = time.time()
+        with self._lock:
+            candidates = [u for u in self.upstreams if u not in exclude] or list(self.upstreams)
+            healthy = [u for u in candidates if u.healthy(now)]
+            if not healthy:
+                # Everybody is ejected: try whoever comes back first
+                return min(candidates, key=lambda u: u.ejected_until)
+            # Skip upstreams at their concurrency limit while others have room
+            healthy = [u for u in healthy if u.limit is None or u.limit.available()] or healthy
+            if len(healthy) == 1:
+                return healthy[0]
+            # Unmeasured upstreams count as the fastest so they get probed
+            measured = [u.latency for u in healthy if u.latency is not None]
+            default = min(measured) if measured else 0.001
+            weights = [1.0 / max(u.latency if u.latency is not None else default, 0.0005)
+                       for u in healthy]
+            return random.choices(healthy, weights)[0]
+
+    def _record_success(self, upstream, rtt=None):
+        with self._lock:
+            upstream.sent += 1
+            upstream.consecutive_failures = 0
+            upstream.ejected_until = 0.0
+        if upstream.limit is not None:
+            upstream.limit.succeeded(rtt)
+
+    def _record_failure(self, upstream, eject=True, overload=True):
+        """overload: timeouts, SERVFAIL and REFUSED cut the upstream's concurrency limit."""
+        if overload and upstream.limit is not None:
+            upstream.limit.overloaded()
+        with self._lock:
+            upstream.sent += 1
+            upstream.failures += 1
+            if not eject:
+                return
+            upstream.consecutive_failures += 1
+            if upstream.consecutive_failures >= self.eject_after:
+                upstream.ejected_until = time.time() + self.eject_seconds
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def _observe(self, upstream, transport, rtt):
+        """Feed an RTT sample to the upstream estimator and the hedging window."""
+        with self._lock:
+            upstream.rtt[transport].observe(rtt)
+            if transport == 'udp':
+                self._rtt_samples.append(rtt)
+
+    def hedge_delay(self):
+        """
+        How long to wait for a UDP answer before hedging to a second upstream:
+        the recent p90 (hedge_percentile) RTT, or None while there is too
+        little data, hedging is off, or only one upstream is configured.
+        """
+        if not self.hedge or len(self.upstreams) < 2:
+            return None
+        with self._lock:
+            if len(self._rtt_samples) < self.HEDGE_MIN_SAMPLES:
+                return None
+            samples = sorted(self._rtt_samples)
+        return samples[min(int(len(samples) * self.hedge_percentile / 100), len(samples) - 1)]
+
+    def _accept(self, upstream, response, tcp, errors, unusable, rtt=None):
+        """
+        Retry policy for an answer that arrived: NOERROR/NXDOMAIN are final.
+        SERVFAIL means the upstream is struggling (counts toward ejection);
+        REFUSED and other rcodes are policy answers for this name, so the
+        query fails over without holding it against the upstream.
+        """
+        rcode = response.rcode()
+        if rcode in (dns.rcode.NOERROR, dns.rcode.NXDOMAIN):
+            self._record_success(upstream, rtt)
+            return True
+        errors.append((str(upstream), tcp, upstream.port, dns.rcode.to_text(rcode), response))
+        unusable.add(upstream)
+        with self._lock:
+            if rcode == dns.rcode.SERVFAIL:
+                self.stats['servfail'] += 1
+            elif rcode == dns.rcode.REFUSED:
+                self.stats['refused'] += 1
+        self._record_failure(upstream, eject=rcode == dns.rcode.SERVFAIL,
+                             overload=rcode in (dns.rcode.SERVFAIL, dns.rcode.REFUSED))
+        return False
+
+    @staticmethod
+    def _throttle(upstream, remaining):
+        """
+        Wait for the upstream's QPS budget and a concurrency slot, no longer
+        than the query may take. The slot is given back with _release().
+        """
+        started = time.time()
+        if upstream.bucket is not None and not upstream.bucket.acquire(remaining):
+            raise _OverBudget()
+        if upstream.limit is not None:
+            if not upstream.limit.acquire(max(remaining - (time.time() - started), 0)):
+                raise _OverBudget()
+
+    @staticmethod
+    def _release(upstream):
+        if upstream.limit is not None:
+            upstream.limit.release()
+
+    def _tcp_attempt(self, request, upstream, remaining, errors, unusable):
+        """One exchange over the stream transport (TCP, TLS or DoH); returns the usable response or None."""
+        self._throttle(upstream, remaining)
+        estimator = upstream.rtt['tcp']
+        with self._lock:
+            timeout = min(estimator.timeout(), remaining)
+        sent_at = time.time()
+        try:
+            response = self.stream.query(request, upstream.address, upstream.port, timeout)
+        except dns.exception.Timeout as e:
+            self._release(upstream)
+            with self._lock:
+                estimator.timed_out()
+                self.stats['timeouts'] += 1
+            errors.append((str(upstream), True, upstream.port, e, None))
+            self._record_failure(upstream)
+            return None
+        except (dns.exception.DNSException, OSError, EOFError) as e:
+            self._release(upstream)
+            errors.append((str(upstream), True, upstream.port, e, None))
+            unusable.add(upstream)
+            self._record_failure(upstream, overload=False)
+            return None
+        self._release(upstream)
+        rtt = time.time() - sent_at
+        self._observe(upstream, 'tcp', rtt)
+        return response if self._accept(upstream, response, True, errors, unusable, rtt) else None
+
+    def _udp_attempt(self, request, upstream, deadline, tried, errors, unusable):
+        """
+        Send over UDP and, if no answer comes within hedge_delay(), send the
+        same query to a second upstream; the first usable answer wins.
+
+        A truncated answer is retried over TCP on the upstream that sent it.
+
+        When the hedge wins, the primary's ticket is handed back instead of
+        cancelled, so its real answer time can be recorded (_settle_stragglers).
+
+        Returns:
+            tuple: (response or None, Upstream that answered,
+                    (ticket, upstream, sent_at, expiration) of the outpaced primary or None)
+        """
+        event = threading.Event()  # Shared by every ticket of this attempt
+        pending = {}  # UdpTicket -> (upstream, sent_at, expiration)
+
+        def send(target):
+            if target is primary:
+                self._throttle(target, deadline - time.time())
+            elif target.bucket is not None and not target.bucket.try_acquire():
+                return  # Never wait for a hedge: it is optional traffic
+            elif target.limit is not None and not target.limit.try_acquire():
+                return
+            with self._lock:
+                timeout = target.rtt['udp'].timeout()
+            af = dns.inet.af_for_address(target.address)
+            destination = dns.inet.low_level_address_tuple((target.address, target.port), af)
+            sent_at = time.time()
+            try:
+                ticket = self.udp.send(request, destination, af, event)
+            except OSError as e:
+                self._release(target)
+                errors.append((str(target), False, target.port, e, None))
+                unusable.add(target)
+                self._record_failure(target, overload=False)
+                return
+            pending[ticket] = (target, sent_at, min(sent_at + timeout, deadline))
+
+        def drop(ticket):
+            self.udp.cancel(ticket)
+            entry = pending.pop(ticket)
+            self._release(entry[0])
+            return entry
+
+        delay = self.hedge_delay()
+        hedge_at = time.time() + delay if delay is not None else None
+        primary = upstream
+        # A cancelled scan/domain deadline wakes the wait below
+        cancel = current_deadline()
+        watching = contextlib.ExitStack()
+        if cancel is not None:
+            watching.enter_context(cancel.watch(event))
+        try:
+            send(primary)
+            while pending:
+                if cancel is not None and cancel.expired():
+                    break
+                now = time.time()
+                if hedge_at is not None and now >= hedge_at:
+                    # Primary is slower than p90: race a second upstream
+                    hedge_at = None
+                    second = self.pick(exclude=tried | {primary})
+                    if second is not primary and second not in tried:
+                        send(second)
+                        if any(entry[0] is second for entry in pending.values()):
+                            tried.add(second)
+                            with self._lock:
+                                self.stats['hedges'] += 1
+                    continue
+
+                for ticket, (target, _, expiration) in list(pending.items()):
+                    if now >= expiration and not ticket.done:
+                        drop(ticket)
+                        with self._lock:
+                            target.rtt['udp'].timed_out()
+                            self.stats['timeouts'] += 1
+                        errors.append((str(target), False, target.port,
+                                       dns.exception.Timeout(timeout=expiration - now), None))
+                        self._record_failure(target)
+                if not pending:
+                    break
+
+                wake = min(entry[2] for entry in pending.values())
+                if hedge_at is not None:
+                    wake = min(wake, hedge_at)
+                event.wait(max(wake - now, 0))
+                event.clear()
+
+                for ticket in [t for t in pending if t.done]:
+                    target, sent_at, _ = drop(ticket)
+                    if isinstance(ticket.error, dns.message.Truncated):
+                        self._observe(target, 'udp', ticket.received_at - sent_at)
+                        with self._lock:
+                            self.stats['truncated'] += 1
+                        response = self._tcp_attempt(request, target,
+                                                     max(deadline - time.time(), 0.001),
+                                                     errors, unusable)
+                        if response is not None:
+                            return response, target, None
+                        continue
+
+                    response = ticket.response
+                    rtt = ticket.received_at - sent_at
+                    self._observe(target, 'udp', rtt)
+                    if not self._accept(target, response, False, errors, unusable, rtt):
+                        continue
+
+                    straggler = None
+                    if target is not primary:
+                        with self._lock:
+                            self.stats['hedge_wins'] += 1
+                        for other_ticket, (other, other_sent, expiration) in list(pending.items()):
+                            if other is primary:
+                                # Keep listening: without the hedge, the query
+                                # would have taken as long as the primary does
+                                del pending[other_ticket]
+                                straggler = (other_ticket, other, other_sent, expiration)
+                    with self._lock:
+                        for other, _, _ in pending.values():
+                            other.sent += 1  # Lost the race, not a failure
+                    return response, target, straggler
+            return None, primary, None
+        finally:
+            watching.close()
+            for ticket in list(pending):
+                drop(ticket)
+
+    def query(self, qname, rdtype, rdclass, tcp=False, lifetime=None, rd=True):
+        """
+        Send one query, failing over between upstreams until lifetime runs out.
+
+        Args:
+            qname (dns.name.Name): Name to query
+            rdtype (dns.rdatatype.RdataType): Record type
+            rdclass (dns.rdataclass.RdataClass): Record class
+            tcp (bool): Use TCP instead of UDP
+            lifetime (float, optional): Override the pool lifetime
+            rd (bool): Ask for recursion (clear it when talking to authoritative servers)
+
+        Returns:
+            tuple: (dns.message.Message response, Upstream that answered)
+
+        Raises:
+            dns.resolver.LifetimeTimeout: No usable answer before the lifetime expired
+                (or the current deadline was cancelled)
+            dns.resolver.NoNameservers: Every upstream failed
+        """
+        request = dns.message.make_query(qname, rdtype, rdclass)
+        if not rd:
+            request.flags &= ~dns.flags.RD
+        lifetime = self.lifetime if lifetime is None else lifetime
+        start = time.time()
+        errors = []
+        tried = set()
+        unusable = set()  # Upstreams that failed without timing out (SERVFAIL, unreachable)
+        straggler = None
+        deadline = current_deadline()
+
+        while True:
+            remaining = lifetime - (time.time() - start)
+            if remaining <= 0 or (deadline is not None and deadline.expired()):
+                raise dns.resolver.LifetimeTimeout(timeout=time.time() - start, errors=errors)
+            if len(unusable) == len(self.upstreams):
+                raise dns.resolver.NoNameservers(request=request, errors=errors)
+            if len(tried) == len(self.upstreams):
+                # New round: lost packets deserve another try
+                tried = set(unusable)
+
+            upstream = self.pick(exclude=tried)
+            tried.add(upstream)
+            try:
+                if tcp or self.transport != 'udp':
+                    # Stream transports (TCP, TLS, HTTPS) never truncate
+                    response = self._tcp_attempt(request, upstream, remaining, errors, unusable)
+                else:
+                    response, upstream, straggler = self._udp_attempt(
+                        request, upstream, start + lifetime, tried, errors, unusable)
+            except _OverBudget:
+                # The rate limit would hold this query past its lifetime
+                raise dns.resolver.LifetimeTimeout(timeout=time.time() - start, errors=errors)
+
+            if response is not None:
+                elapsed = time.time() - start
+                with self._lock:
+                    self._latencies.append(elapsed)
+                    if straggler is None:
+                        self._unhedged_latencies.append(elapsed)
+                    else:
+                        self._stragglers.append((*straggler, start))
+                self._settle_stragglers()
+                return response, upstream
+
+    def _settle_stragglers(self):
+        """
+        Record the unhedged latency of hedge-won queries whose primary has
+        answered since, or expired: an expired (or truncated) primary only
+        gives a lower bound, so the unhedged p99 never overstates the gain.
+        """
+        now = time.time()
+        with self._lock:
+            settled, waiting = [], []
+            for straggler in self._stragglers:
+                (settled if straggler[0].done or now >= straggler[3] else waiting).append(straggler)
+            self._stragglers = waiting
+        for ticket, upstream, sent_at, expiration, start in settled:
+            self.udp.cancel(ticket)
+            self._release(upstream)
+            if ticket.done and ticket.response is not None:
+                self._observe(upstream, 'udp', ticket.received_at - sent_at)
+            finished = ticket.received_at if ticket.done and ticket.received_at else expiration
+            with self._lock:
+                upstream.sent += 1
+                self._unhedged_latencies.append(min(finished, expiration) - start)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _percentile(values, pct):
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+    def latency_samples(self):
+        """(latencies, unhedged latencies) in seconds of the last LATENCY_WINDOW answers."""
+        self._settle_stragglers()
+        now = time.time()
+        with self._lock:
+            latencies = list(self._latencies)
+            # Primaries still out have taken at least this long
+            unhedged = list(self._unhedged_latencies) + [min(now, expiration) - start for
+                                                         _, _, _, expiration, start in self._stragglers]
+        return latencies, unhedged
+
+    def latency_report(self):
+        """
+        Query latency percentiles (ms) over the last LATENCY_WINDOW answers, with the
+        p99 measured without hedging: hedge-won queries count with the time their
+        primary actually answered (at least its timeout if it never did).
+        """
+        latencies, unhedged = self.latency_samples()
+        with self._lock:
+            report = dict(self.stats)
+        for name, values, pct in (('p50_ms', latencies, 50), ('p90_ms', latencies, 90),
+                                  ('p99_ms', latencies, 99),
+                                  ('p99_unhedged_ms', unhedged, 99)):
+            value = self._percentile(values, pct)
+            report[name] = round(value * 1000, 1) if value is not None else None
+        return report
+
+    def summary(self):
+        """Per-upstream statistics for the scan summary."""
+        now = time.time()
+        return [u.summary(now) for u in self.upstreams]
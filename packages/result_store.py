@@ -0,0 +1,120 @@
+"""
+Thread-safe containers for what a scan finds.
+
+Strategies report from many worker threads (and lane threads, and
+abandoned strategies finishing after a deadline) while the crawl reads the
+same data. Plain dicts and sets lost updates under that load (check-then-add
+races, += on a shared counter) and iterating them while a worker added to
+them raised "set changed size during iteration".
+
+Both containers are split into shards with a lock each, so threads adding
+to different strategies or names rarely wait on each other. Iteration
+never takes a lock: every shard also keeps its items in an append-only
+list, and a snapshot reads each list up to its length at that moment.
+"""
+
+import threading
+
+DEFAULT_SHARDS = 16
+
+
+class ShardedSet:
+    """
+    Set with an atomic add-if-absent, sharded by item hash.
+
+    Args:
+        items (iterable, optional): Initial items
+        shards (int): Number of shards (each with its own lock)
+    """
+
+    def __init__(self, items=(), shards=DEFAULT_SHARDS):
+        self._shards = [(threading.Lock(), set(), []) for _ in range(max(1, shards))]
+        for item in items:
+            self.add(item)
+
+    def _shard(self, item):
+        return self._shards[hash(item) % len(self._shards)]
+
+    def add(self, item):
+        """Add item; True if it was not there yet (only one caller wins a race)."""
+        lock, members, order = self._shard(item)
+        with lock:
+            if item in members:
+                return False
+            members.add(item)
+            order.append(item)
+        return True
+
+    def __contains__(self, item):
+        return item in self._shard(item)[1]
+
+    def __len__(self):
+        return sum(len(order) for _, _, order in self._shards)
+
+    def __iter__(self):
+        """Snapshot iteration: items added meanwhile may or may not be seen, never an error."""
+        for _, _, order in self._shards:
+            yield from order[:len(order)]
+
+
+class ResultStore:
+    """
+    Results per strategy key, sharded by key, with an atomic result counter.
+
+    Args:
+        shards (int): Number of shards (each with its own lock)
+    """
+
+    def __init__(self, shards=DEFAULT_SHARDS):
+        self._shards = [(threading.Lock(), {}) for _ in range(max(1, shards))]
+        self._count_lock = threading.Lock()
+        self._count = 0
+        self._keys = []  # Append-only, in first-seen order
+
+    def _shard(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def add(self, key, items, weight=None):
+        """
+        Append items to key's results and count them.
+
+        Args:
+            key (str): Strategy result key
+            items (list): Results to append
+            weight (int, optional): Amount added to the result count (default: len(items))
+
+        Returns:
+            int: Result count after this addition
+        """
+        lock, results = self._shard(key)
+        with lock:
+            if key not in results:
+                results[key] = []
+                self._keys.append(key)
+            results[key].extend(items)
+        with self._count_lock:
+            self._count += len(items) if weight is None else weight
+            return self._count
+
+    @property
+    def count(self):
+        return self._count
+
+    def keys(self):
+        """Strategy keys with results, in the order they first reported."""
+        return self._keys[:len(self._keys)]
+
+    def filter(self, keep):
+        """Drop the results for which keep(result) is false."""
+        for lock, results in self._shards:
+            with lock:
+                for key, items in results.items():
+                    results[key] = [r for r in items if keep(r)]
+
+    def snapshot(self):
+        """{key: list of results} copy, consistent per key."""
+        snapshot = {}
+        for key in self.keys():
+            items = self._shard(key)[1][key]
+            snapshot[key] = items[:len(items)]
+        return snapshot
@@ -1,8 +1,10 @@
 """Perform reverse DNS lookups."""
 
-import dns.resolver
 import dns.reversename
 
+from .query_broker import get_broker
+from .records import Host
+
 
 def reverse_dns(ip):
     """Perform reverse DNS lookup on IP address.
@@ -11,11 +13,11 @@ def reverse_dns(ip):
         ip (str): IP address to lookup
     
     Returns:
-        list: Reverse DNS hostnames
+        list: Reverse DNS host names (Host)
     """
     try:
         rev_name = dns.reversename.from_address(ip)
-        answers = dns.resolver.resolve(rev_name, 'PTR')
-        return [str(rdata) for rdata in answers]
+        answers = get_broker().resolve(rev_name, 'PTR')
+        return [Host(rdata) for rdata in answers]
     except Exception:
         return []
@@ -3,6 +3,8 @@
 import dns.zone
 import dns.query
 
+from .records import Host
+
 
 def scan_axfr(domain, nameserver=None):
     """Attempt AXFR zone transfer.
@@ -12,12 +14,12 @@ def scan_axfr(domain, nameserver=None):
         nameserver (str, optional): Nameserver to query
     
     Returns:
-        list: Zone transfer results if successful
+        list: Names of the zone (Host) if the transfer succeeded
     """
     try:
         if nameserver:
             zone = dns.zone.from_xfr(dns.query.xfr(nameserver, domain))
-            return [name.to_text() for name in zone.nodes.keys()]
+            return [Host(name.derelativize(zone.origin)) for name in zone.nodes.keys()]
     except Exception:
         pass
     return []
@@ -1,6 +1,7 @@
 """Check for BIMI (Brand Indicators for Message Identification) records."""
 
-import dns.resolver
+from .query_broker import get_broker
+from .records import Finding
 
 def scan_bimi(domain):
     """Query BIMI records for brand logo verification.
@@ -9,11 +10,11 @@ def scan_bimi(domain):
         domain (str): Domain name
     
     Returns:
-        dict: BIMI configuration with logo URL and VMC certificate
+        Finding: BIMI configuration with logo URL and VMC certificate, or None
     """
     try:
         bimi_domain = f"default._bimi.{domain}"
-        answers = dns.resolver.resolve(bimi_domain, 'TXT')
+        answers = get_broker().resolve(bimi_domain, 'TXT')
         
         for rdata in answers:
             txt = str(rdata).strip('"')
@@ -35,8 +36,8 @@ def scan_bimi(domain):
                         result['vmc_certificate'] = vmc_url
                         result['verified'] = True
                 
-                return result
+                return Finding(domain, result)
         
-        return {}
+        return None
     except:
-        return {}
+        return None
@@ -1,12 +1,23 @@
 """Scan CAA (Certificate Authority Authorization) records."""
 
-import dns.resolver
+from .async_broker import get_async_broker
+from .query_broker import get_broker
+from .records import Record
 
 
 def scan_caa(domain):
-    """Query CAA records for domain."""
+    """Query CAA records for domain (list of CAA Records)."""
     try:
-        answers = dns.resolver.resolve(domain, 'CAA')
-        return [str(rdata) for rdata in answers]
+        answers = get_broker().resolve(domain, 'CAA')
+        return [Record(domain, 'CAA', str(rdata), answers.rrset.ttl) for rdata in answers]
+    except Exception:
+        return []
+
+
+async def scan_caa_async(domain):
+    """Coroutine version of scan_caa()."""
+    try:
+        answers = await get_async_broker().resolve(domain, 'CAA')
+        return [Record(domain, 'CAA', str(rdata), answers.rrset.ttl) for rdata in answers]
     except Exception:
         return []
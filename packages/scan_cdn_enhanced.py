@@ -1,8 +1,29 @@
 """Enhanced CDN detection beyond CNAME analysis."""
 
-import dns.resolver
+from .memo import get_memo
+from .query_broker import get_broker
+from .records import Finding
+from .team_cymru import domain_addresses, ip_asn
 
-def scan_cdn_enhanced(domain, resolver_obj=None):
+def _ip_verdict(ip, info, cdn_patterns, cdn_asns):
+    """[(indicator, provider)] for an IP from its ip_asn() info, memoized per IP by the caller."""
+    verdict = []
+    if not info:
+        return verdict
+    asn = info['asn']
+    if asn in cdn_asns:
+        provider = cdn_asns[asn]
+        verdict.append((f'IP {ip} belongs to {provider} (ASN {asn})', provider))
+    
+    # Check if ASN name matches known CDN
+    if info.get('asn_name'):
+        asn_name = info['asn_name'].upper()
+        for provider, patterns in cdn_patterns.items():
+            if any(pattern.upper().replace('.', '') in asn_name for pattern in patterns):
+                verdict.append((f'ASN name matches {provider}: {asn_name}', provider))
+    return verdict
+
+def scan_cdn_enhanced(domain, resolver_obj=None, cname=None, ns=None, addresses=None):
     """
     Enhanced CDN detection using multiple signals:
     - CNAME patterns
@@ -10,9 +31,13 @@ def scan_cdn_enhanced(domain, resolver_obj=None):
     - NS record patterns
     - TXT record hints
     - IP range analysis
+    
+    Args:
+        cname, ns (optional): scan_cname() / scan_ns() results from the strategy graph
+        addresses (dict, optional): domain_addresses() result from the strategy graph
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     results = {
         'cdn_detected': False,
@@ -54,82 +79,57 @@ def scan_cdn_enhanced(domain, resolver_obj=None):
     detected_providers = []
     
     # 1. CNAME analysis
-    try:
-        cname_answers = resolver_obj.resolve(domain, 'CNAME')
-        for rdata in cname_answers:
-            cname = str(rdata).lower().rstrip('.')
-            for provider, patterns in cdn_patterns.items():
-                if any(pattern in cname for pattern in patterns):
-                    indicators.append(f'CNAME points to {provider}: {cname}')
-                    detected_providers.append(provider)
-                    results['cdn_detected'] = True
-    except:
-        pass
+    if cname:
+        cnames = cname.data['chain'][1:2]  # The domain's own CNAME
+    else:
+        try:
+            cnames = [str(rdata) for rdata in resolver_obj.resolve(domain, 'CNAME')]
+        except:
+            cnames = []
+    for target in cnames:
+        target = target.lower().rstrip('.')
+        for provider, patterns in cdn_patterns.items():
+            if any(pattern in target for pattern in patterns):
+                indicators.append(f'CNAME points to {provider}: {target}')
+                detected_providers.append(provider)
+                results['cdn_detected'] = True
     
     # 2. NS record analysis
-    try:
-        ns_answers = resolver_obj.resolve(domain, 'NS')
-        for rdata in ns_answers:
-            ns = str(rdata).lower().rstrip('.')
-            for provider, patterns in cdn_patterns.items():
-                if any(pattern in ns for pattern in patterns):
-                    indicators.append(f'NS hosted by {provider}: {ns}')
-                    detected_providers.append(provider)
-                    results['cdn_detected'] = True
-    except:
-        pass
+    if ns:
+        nameservers = [record.value.name for record in ns]
+    else:
+        try:
+            nameservers = [str(rdata) for rdata in resolver_obj.resolve(domain, 'NS')]
+        except:
+            nameservers = []
+    for nameserver in nameservers:
+        nameserver = nameserver.lower().rstrip('.')
+        for provider, patterns in cdn_patterns.items():
+            if any(pattern in nameserver for pattern in patterns):
+                indicators.append(f'NS hosted by {provider}: {nameserver}')
+                detected_providers.append(provider)
+                results['cdn_detected'] = True
     
     # 3. A record IP analysis
-    try:
-        a_answers = resolver_obj.resolve(domain, 'A')
-        ips = [str(rdata) for rdata in a_answers]
+    if not addresses:
+        addresses = domain_addresses(domain, resolver_obj)
+    if addresses:
+        ips = addresses['ips']
         
         # Multiple IPs suggest CDN
         if len(ips) > 2:
             indicators.append(f'Multiple IPs ({len(ips)}) suggest CDN distribution')
         
-        # Check ASN for each IP
+        # Check ASN for each IP (same verdict for every domain on this edge)
         for ip in ips[:3]:  # Check first 3 IPs
-            try:
-                reversed_ip = '.'.join(reversed(ip.split('.')))
-                query_name = f"{reversed_ip}.origin.asn.cymru.com"
-                answer = resolver_obj.resolve(query_name, 'TXT')
-                
-                for txt_rdata in answer:
-                    txt = txt_rdata.to_text().strip('"')
-                    parts = [p.strip() for p in txt.split('|')]
-                    if len(parts) >= 1:
-                        asn = parts[0]
-                        
-                        if asn in cdn_asns:
-                            provider = cdn_asns[asn]
-                            indicators.append(f'IP {ip} belongs to {provider} (ASN {asn})')
-                            detected_providers.append(provider)
-                            results['cdn_detected'] = True
-                        
-                        # Get ASN name
-                        try:
-                            asn_query = f"AS{asn}.asn.cymru.com"
-                            asn_answer = resolver_obj.resolve(asn_query, 'TXT')
-                            for asn_rdata in asn_answer:
-                                asn_txt = asn_rdata.to_text().strip('"')
-                                asn_parts = [p.strip() for p in asn_txt.split('|')]
-                                if len(asn_parts) >= 5:
-                                    asn_name = asn_parts[4].upper()
-                                    # Check if ASN name matches known CDN
-                                    for provider, patterns in cdn_patterns.items():
-                                        if any(pattern.upper().replace('.', '') in asn_name for pattern in patterns):
-                                            indicators.append(f'ASN name matches {provider}: {asn_name}')
-                                            detected_providers.append(provider)
-                                            results['cdn_detected'] = True
-                                    break
-                        except:
-                            pass
-                        break
-            except:
+            if not addresses['asn'].get(ip):
                 continue
-    except:
-        pass
+            verdict = get_memo().get('cdn_ip', ip, lambda: _ip_verdict(
+                ip, ip_asn(ip, resolver_obj), cdn_patterns, cdn_asns))
+            for indicator, provider in verdict:
+                indicators.append(indicator)
+                detected_providers.append(provider)
+                results['cdn_detected'] = True
     
     # 4. TXT record hints
     try:
@@ -145,13 +145,10 @@ def scan_cdn_enhanced(domain, resolver_obj=None):
         pass
     
     # 5. TTL analysis (CDNs often use low TTL)
-    try:
-        a_answers = resolver_obj.resolve(domain, 'A')
-        ttl = a_answers.rrset.ttl
+    if addresses:
+        ttl = addresses['ttl']
         if ttl < 300:
             indicators.append(f'Low TTL ({ttl}s) typical of CDN')
-    except:
-        pass
     
     # Determine primary provider and confidence
     if detected_providers:
@@ -165,11 +162,11 @@ def scan_cdn_enhanced(domain, resolver_obj=None):
         results['detection_methods'] = indicators
         results['all_detected_providers'] = list(set(detected_providers))
         
-        return {domain: results}
+        return Finding(domain, results)
     
     if indicators:
         results['detection_methods'] = indicators
         results['confidence'] = 'LOW'
-        return {domain: results}
+        return Finding(domain, results)
     
     return None
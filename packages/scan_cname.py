@@ -1,6 +1,7 @@
 """Scan CNAME records."""
 
-import dns.resolver
+from .query_broker import get_broker
+from .records import Finding
 
 
 def scan_cname(domain):
@@ -10,11 +11,10 @@ def scan_cname(domain):
         domain (str): Domain name
     
     Returns:
-        dict: CNAME chain details with final target and IPs
+        Finding: CNAME chain details with final target and IPs (the chain's
+            names and final IPs to crawl), or None
     """
-    resolver = dns.resolver.Resolver()
-    resolver.timeout = 2
-    resolver.lifetime = 5
+    resolver = get_broker()
     
     try:
         chain = [domain]
@@ -45,13 +45,13 @@ def scan_cname(domain):
             except:
                 pass
             
-            return {
+            return Finding(domain, {
                 'chain': chain,
                 'final_target': chain[-1],
                 'chain_length': len(chain) - 1,
                 'final_ips': final_ips
-            }
+            }, hosts=chain[1:], ips=final_ips)
         
-        return {}
+        return None
     except Exception:
-        return {}
+        return None
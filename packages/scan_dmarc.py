@@ -20,9 +20,11 @@ EXAMPLE:
   = Reject 100% of failures, send reports to dmarc@example.com
 """
 
-import dns.resolver
 import re  # Regular expressions for parsing email addresses
 
+from .query_broker import get_broker
+from .records import Finding
+
 
 def scan_dmarc(domain):
     """
@@ -50,7 +52,7 @@ def scan_dmarc(domain):
     try:
         # DMARC records are published at _dmarc subdomain
         dmarc_domain = f"_dmarc.{domain}"
-        answers = dns.resolver.resolve(dmarc_domain, 'TXT')
+        answers = get_broker().resolve(dmarc_domain, 'TXT')
         
         # Find DMARC record
         for rdata in answers:
@@ -89,9 +91,9 @@ def scan_dmarc(domain):
                 if pct_match:
                     result['percentage'] = int(pct_match.group(1))
                 
-                return result
+                return Finding(domain, result)
         
-        return {}  # No DMARC record found
+        return None  # No DMARC record found
     
     except Exception:
-        return {}  # Query failed or parse error
+        return None  # Query failed or parse error
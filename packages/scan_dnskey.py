@@ -2,13 +2,16 @@
 
 import dns.resolver
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_dnskey(domain, resolver_obj=None):
     """
     Scan for DNSKEY records (DNS Public Key).
     Complete DNSSEC key information including ZSK and KSK.
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     try:
         answers = resolver_obj.resolve(domain, 'DNSKEY')
@@ -83,7 +86,7 @@ def scan_dnskey(domain, resolver_obj=None):
         if zsks:
             result['zsk_keys'] = zsks
         
-        return {domain: result} if result else None
+        return Finding(domain, result) if result else None
         
     except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
         return None
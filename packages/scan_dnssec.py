@@ -1,12 +1,20 @@
 """Check DNSSEC configuration."""
 
-import dns.resolver
+from .query_broker import get_broker
+from .records import Finding
 
-def scan_dnssec(domain):
-    """Check DNSSEC with algorithm and key details."""
-    resolver = dns.resolver.Resolver()
-    resolver.timeout = 2
-    resolver.lifetime = 5
+def scan_dnssec(domain, dnskey=None, ds=None):
+    """Check DNSSEC with algorithm and key details.
+    
+    Args:
+        domain (str): Domain name
+        dnskey, ds (Finding, optional): scan_dnskey() / scan_ds() results from the
+            strategy graph, used instead of querying DNSKEY/DS again
+    """
+    if dnskey or ds:
+        return _summarize(domain, dnskey, ds)
+    
+    resolver = get_broker()
     
     results = {'enabled': False}
     
@@ -44,4 +52,34 @@ def scan_dnssec(domain):
     except:
         pass
     
-    return results if results['enabled'] else {}
+    return Finding(domain, results) if results['enabled'] else None
+
+
+def _summarize(domain, dnskey, ds):
+    """Same summary, from the already parsed DNSKEY and DS records."""
+    results = {'enabled': False}
+    
+    if dnskey:
+        zone_keys = dnskey.data.get('ksk_keys', []) + dnskey.data.get('zsk_keys', [])
+        keys = []
+        for record in zone_keys[:3]:  # First 3 keys
+            keys.append({
+                'flags': record['flags'],
+                'protocol': record['protocol'],
+                'algorithm': record['algorithm'],
+                'key_type': 'ZSK' if record['flags'] == 256 else 'KSK' if record['flags'] == 257 else 'unknown'
+            })
+        if keys:
+            results['keys'] = keys
+            results['enabled'] = True
+    
+    if ds:
+        ds_records = [{'key_tag': record['key_tag'],
+                       'algorithm': record['algorithm'],
+                       'digest_type': record['digest_type']}
+                      for record in ds.data[:2]]
+        if ds_records:
+            results['ds_records'] = ds_records
+            results['enabled'] = True
+    
+    return Finding(domain, results) if results['enabled'] else None
@@ -3,13 +3,16 @@
 import dns.resolver
 from datetime import datetime, timedelta
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_domain_age(domain, resolver_obj=None):
     """
     Estimate domain age and zone update patterns from SOA serial number.
     Serial formats: YYYYMMDDnn (RFC 1912) or Unix timestamp
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     try:
         soa_answers = resolver_obj.resolve(domain, 'SOA')
@@ -66,7 +69,7 @@ def scan_domain_age(domain, resolver_obj=None):
                     else:
                         results['update_pattern'] = f'Infrequent updates (refresh every {refresh // 86400}d)'
                     
-                    return {domain: results}
+                    return Finding(domain, results)
             except ValueError:
                 pass
         
@@ -95,7 +98,7 @@ def scan_domain_age(domain, resolver_obj=None):
                         else:
                             results['age_category'] = f'Established ({age // 365} years)'
                         
-                        return {domain: results}
+                        return Finding(domain, results)
             except (ValueError, OSError):
                 pass
         
@@ -124,7 +127,7 @@ def scan_domain_age(domain, resolver_obj=None):
         else:
             results['zone_stability'] = 'High (long expiry)'
         
-        return {domain: results}
+        return Finding(domain, results)
         
     except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
         return None
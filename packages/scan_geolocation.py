@@ -1,7 +1,10 @@
 """Geolocation lookup using DNS-based IP geolocation services."""
 
-import dns.resolver
-import socket
+import dns.reversename
+
+from .query_broker import get_broker
+from .records import Finding
+from .team_cymru import ip_asn
 
 def scan_geolocation(ip):
     """Get geolocation info for IP using DNS-based services.
@@ -10,51 +13,19 @@ def scan_geolocation(ip):
         ip (str): IP address
     
     Returns:
-        dict: Geolocation information (country, city, ASN)
+        Finding: Geolocation information (country, city, ASN), or None
     """
     result = {'ip': ip}
     
-    # Try to get ASN info via DNS (Team Cymru)
-    try:
-        # Reverse IP for DNS query
-        parts = ip.split('.')
-        if len(parts) == 4:
-            reversed_ip = '.'.join(reversed(parts))
-            asn_query = f"{reversed_ip}.origin.asn.cymru.com"
-            
-            answers = dns.resolver.resolve(asn_query, 'TXT')
-            for rdata in answers:
-                txt = str(rdata).strip('"')
-                # Format: "ASN | IP | BGP Prefix | CC | Registry | Allocated"
-                parts = [p.strip() for p in txt.split('|')]
-                if len(parts) >= 4:
-                    result['asn'] = parts[0]
-                    result['bgp_prefix'] = parts[2]
-                    result['country'] = parts[3]
-                    if len(parts) >= 5:
-                        result['registry'] = parts[4]
-                break
-    except:
-        pass
-    
-    # Try to get ASN name
-    if 'asn' in result:
-        try:
-            asn_name_query = f"AS{result['asn']}.asn.cymru.com"
-            answers = dns.resolver.resolve(asn_name_query, 'TXT')
-            for rdata in answers:
-                txt = str(rdata).strip('"')
-                # Format: "ASN | CC | Registry | Allocated | AS Name"
-                parts = [p.strip() for p in txt.split('|')]
-                if len(parts) >= 5:
-                    result['asn_name'] = parts[4]
-                break
-        except:
-            pass
+    # ASN, prefix, country and AS name via DNS (Team Cymru)
+    info = ip_asn(ip)
+    if info:
+        result.update(info)
     
     # Try reverse DNS for hostname
     try:
-        hostname = socket.gethostbyaddr(ip)[0]
+        ptr_answers = get_broker().resolve(dns.reversename.from_address(ip), 'PTR')
+        hostname = str(ptr_answers[0]).rstrip('.')
         result['hostname'] = hostname
         
         # Infer location from hostname
@@ -78,4 +49,4 @@ def scan_geolocation(ip):
     except:
         pass
     
-    return result if len(result) > 1 else {}
+    return Finding(ip, result) if len(result) > 1 else None
@@ -2,13 +2,16 @@
 
 import dns.resolver
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_hinfo(domain, resolver_obj=None):
     """
     Scan for HINFO records (Host Information).
     Provides CPU and OS information (rarely used due to security concerns).
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     try:
         answers = resolver_obj.resolve(domain, 'HINFO')
@@ -26,7 +29,7 @@ def scan_hinfo(domain, resolver_obj=None):
             }
             records.append(record_info)
         
-        return {domain: records} if records else None
+        return Finding(domain, records) if records else None
         
     except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
         return None
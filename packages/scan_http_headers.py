@@ -2,6 +2,8 @@
 
 import socket
 
+from .records import Finding
+
 def scan_http_headers(domain):
     """Check HTTP headers for server info, security headers, and redirects."""
     results = {}
@@ -43,4 +45,4 @@ def scan_http_headers(domain):
         except:
             pass
     
-    return results
+    return Finding(domain, results) if results else None
@@ -4,15 +4,16 @@ import dns.resolver
 import time
 from collections import Counter
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_loadbalancer(domain, resolver_obj=None):
     """
     Detect load balancing by analyzing multiple DNS queries for response patterns.
     Identifies round-robin, weighted, and geographic load balancing.
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
-    
-    results = {}
+        resolver_obj = get_broker()
     
     # Perform multiple queries to detect rotation
     num_queries = 10
@@ -21,7 +22,8 @@ def scan_loadbalancer(domain, resolver_obj=None):
     
     for i in range(num_queries):
         try:
-            answers = resolver_obj.resolve(domain, 'A')
+            # Bypass the shared cache, otherwise every query sees the same answer
+            answers = resolver_obj.resolve(domain, 'A', use_cache=False)
             ips = [str(rdata) for rdata in answers]
             all_responses.extend(ips)
             response_patterns.append(tuple(sorted(ips)))
@@ -109,7 +111,7 @@ def scan_loadbalancer(domain, resolver_obj=None):
         # Determine confidence
         confidence = 'HIGH' if len(indicators) >= 3 else ('MEDIUM' if len(indicators) == 2 else 'LOW')
         
-        results[domain] = {
+        return Finding(domain, {
             'load_balanced': True,
             'load_balancer_type': lb_type or 'Unknown',
             'ip_count': len(unique_ips),
@@ -120,15 +122,11 @@ def scan_loadbalancer(domain, resolver_obj=None):
             'indicators': indicators,
             'confidence': confidence,
             'hostnames': hostnames if hostnames else None
-        }
-        
-        return results
+        }, ips=unique_ips)
     
     # Single IP - not load balanced
-    return {
-        domain: {
-            'load_balanced': False,
-            'ip': unique_ips[0],
-            'note': 'Single IP - no load balancing detected'
-        }
-    }
+    return Finding(domain, {
+        'load_balanced': False,
+        'ip': unique_ips[0],
+        'note': 'Single IP - no load balancing detected'
+    }, ips=unique_ips)
@@ -2,13 +2,16 @@
 
 import dns.resolver
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_loc(domain, resolver_obj=None):
     """
     Scan for LOC records (Location).
     Provides geographic coordinates of hosts/services.
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     try:
         answers = resolver_obj.resolve(domain, 'LOC')
@@ -53,7 +56,7 @@ def scan_loc(domain, resolver_obj=None):
             }
             records.append(record_info)
         
-        return {domain: records} if records else None
+        return Finding(domain, records) if records else None
         
     except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
         return None
@@ -2,15 +2,12 @@
 
 import dns.resolver
 
-def scan_mail_blacklist(domain, resolver_obj=None):
-    """
-    Check mail server IPs against major DNS blacklists.
-    Queries: Spamhaus, SpamCop, SORBS, Barracuda, etc.
-    """
-    if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
-    
-    # Get MX records first
+from .memo import get_memo
+from .query_broker import get_broker
+from .records import Finding
+
+def _mail_servers(domain, resolver_obj):
+    """mx_host/ip/priority of every mail server, from MX or else the domain's A records."""
     mail_servers = []
     try:
         mx_answers = resolver_obj.resolve(domain, 'MX')
@@ -41,77 +38,110 @@ def scan_mail_blacklist(domain, resolver_obj=None):
                     'priority': 0
                 })
         except:
-            return None
+            pass
+    
+    return mail_servers
+
+# Major DNSBLs
+BLACKLISTS = {
+    'zen.spamhaus.org': 'Spamhaus ZEN (combined list)',
+    'bl.spamcop.net': 'SpamCop',
+    'dnsbl.sorbs.net': 'SORBS',
+    'b.barracudacentral.org': 'Barracuda',
+    'dnsbl-1.uceprotect.net': 'UCEPROTECT Level 1',
+    'cbl.abuseat.org': 'Composite Blocking List',
+    'psbl.surriel.com': 'Passive Spam Block List',
+    'dnsbl.dronebl.org': 'DroneBL',
+    'spam.dnsbl.anonmails.de': 'AnonMails DNSBL',
+}
+
+def _listings(ip, resolver_obj):
+    """
+    (names of the DNSBLs listing ip, their details, DNSBLs that could not be asked),
+    memoized per IP by the caller unless a lookup failed.
+    """
+    # Reverse IP for DNSBL queries
+    reversed_ip = '.'.join(reversed(ip.split('.')))
+    
+    blacklist_hits = []
+    blacklist_details = []
+    failed = []
+    
+    for dnsbl, name in BLACKLISTS.items():
+        query = f"{reversed_ip}.{dnsbl}"
+        
+        try:
+            # Query DNSBL
+            answer = resolver_obj.resolve(query, 'A')
+            # If we get a response, IP is listed
+            response_ips = [str(rdata) for rdata in answer]
+            
+            # Get TXT record for details
+            reason = None
+            try:
+                txt_answer = resolver_obj.resolve(query, 'TXT')
+                for txt_rdata in txt_answer:
+                    reason = txt_rdata.to_text().strip('"')
+                    break
+            except:
+                pass
+            
+            blacklist_hits.append(name)
+            blacklist_details.append({
+                'blacklist': name,
+                'dnsbl': dnsbl,
+                'listed': True,
+                'response': response_ips[0] if response_ips else None,
+                'reason': reason
+            })
+            
+        except dns.resolver.NXDOMAIN:
+            # Not listed (good)
+            continue
+        except Exception:
+            # Timeout, SERVFAIL, refused...: unknown, not "not listed"
+            failed.append(name)
+    
+    return blacklist_hits, blacklist_details, failed
+
+def scan_mail_blacklist(domain, resolver_obj=None, mx=None):
+    """
+    Check mail server IPs against major DNS blacklists.
+    Queries: Spamhaus, SpamCop, SORBS, Barracuda, etc.
+    
+    Args:
+        mx (list, optional): scan_mx() MX Records from the strategy graph
+    """
+    if resolver_obj is None:
+        resolver_obj = get_broker()
+    
+    # Get MX records first (already resolved by scan_mx when given)
+    mail_servers = [
+        {'mx_host': record.value.name, 'ip': ip.address, 'priority': record.get('priority')}
+        for record in mx or [] for ip in record.value.ips
+    ] or _mail_servers(domain, resolver_obj)
     
     if not mail_servers:
         return None
     
-    # Major DNSBLs
-    blacklists = {
-        'zen.spamhaus.org': 'Spamhaus ZEN (combined list)',
-        'bl.spamcop.net': 'SpamCop',
-        'dnsbl.sorbs.net': 'SORBS',
-        'b.barracudacentral.org': 'Barracuda',
-        'dnsbl-1.uceprotect.net': 'UCEPROTECT Level 1',
-        'cbl.abuseat.org': 'Composite Blocking List',
-        'psbl.surriel.com': 'Passive Spam Block List',
-        'dnsbl.dronebl.org': 'DroneBL',
-        'spam.dnsbl.anonmails.de': 'AnonMails DNSBL',
-    }
-    
     results = []
     
     for server in mail_servers:
         ip = server['ip']
         mx_host = server['mx_host']
         
-        # Reverse IP for DNSBL queries
-        reversed_ip = '.'.join(reversed(ip.split('.')))
-        
-        blacklist_hits = []
-        blacklist_details = []
-        
-        for dnsbl, name in blacklists.items():
-            query = f"{reversed_ip}.{dnsbl}"
-            
-            try:
-                # Query DNSBL
-                answer = resolver_obj.resolve(query, 'A')
-                # If we get a response, IP is listed
-                response_ips = [str(rdata) for rdata in answer]
-                
-                # Get TXT record for details
-                reason = None
-                try:
-                    txt_answer = resolver_obj.resolve(query, 'TXT')
-                    for txt_rdata in txt_answer:
-                        reason = txt_rdata.to_text().strip('"')
-                        break
-                except:
-                    pass
-                
-                blacklist_hits.append(name)
-                blacklist_details.append({
-                    'blacklist': name,
-                    'dnsbl': dnsbl,
-                    'listed': True,
-                    'response': response_ips[0] if response_ips else None,
-                    'reason': reason
-                })
-                
-            except dns.resolver.NXDOMAIN:
-                # Not listed (good)
-                continue
-            except:
-                # Query failed or timeout
-                continue
+        # Same verdict for every domain sharing this mail server (asked again
+        # later if a DNSBL could not be reached)
+        blacklist_hits, blacklist_details, failed = get_memo().get(
+            'dnsbl', ip, lambda: _listings(ip, resolver_obj), keep=lambda listings: not listings[2])
         
-        # Reputation score
-        total_checked = len(blacklists)
+        # Reputation score, over the DNSBLs that answered
+        total_checked = len(BLACKLISTS) - len(failed)
         listed_count = len(blacklist_hits)
         clean_count = total_checked - listed_count
         
-        reputation = 'EXCELLENT' if listed_count == 0 else \
+        reputation = 'UNKNOWN' if total_checked == 0 else \
+                    'EXCELLENT' if listed_count == 0 else \
                     'GOOD' if listed_count == 1 else \
                     'POOR' if listed_count <= 3 else \
                     'CRITICAL'
@@ -124,9 +154,10 @@ def scan_mail_blacklist(domain, resolver_obj=None):
             'blacklists_checked': total_checked,
             'blacklists_listed': listed_count,
             'blacklists_clean': clean_count,
-            'listed_on': blacklist_hits if blacklist_hits else None,
-            'blacklist_details': blacklist_details if blacklist_details else None,
-            'clean': listed_count == 0
+            'listed_on': list(blacklist_hits) if blacklist_hits else None,
+            'blacklist_details': [dict(d) for d in blacklist_details] if blacklist_details else None,
+            'blacklists_failed': list(failed) if failed else None,
+            'clean': listed_count == 0 and total_checked > 0
         }
         
         results.append(server_result)
@@ -136,12 +167,12 @@ def scan_mail_blacklist(domain, resolver_obj=None):
         total_servers = len(results)
         clean_servers = sum(1 for r in results if r['clean'])
         
-        return {
-            domain: {
-                'mail_servers': results,
-                'summary': f'{clean_servers}/{total_servers} mail servers clean',
-                'overall_status': 'CLEAN' if clean_servers == total_servers else 'ISSUES_DETECTED'
-            }
-        }
+        return Finding(domain, {
+            'mail_servers': results,
+            'summary': f'{clean_servers}/{total_servers} mail servers clean',
+            'overall_status': 'CLEAN' if clean_servers == total_servers else
+                              'ISSUES_DETECTED' if any(r['blacklists_listed'] for r in results) else
+                              'UNKNOWN'
+        })
     
     return None
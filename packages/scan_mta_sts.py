@@ -1,6 +1,7 @@
 """Check for MTA-STS (Mail Transfer Agent Strict Transport Security) records."""
 
-import dns.resolver
+from .query_broker import get_broker
+from .records import Finding
 
 def scan_mta_sts(domain):
     """Query MTA-STS policy for secure email transport.
@@ -9,11 +10,11 @@ def scan_mta_sts(domain):
         domain (str): Domain name
     
     Returns:
-        dict: MTA-STS configuration and policy ID
+        Finding: MTA-STS configuration and policy ID, or None
     """
     try:
         mta_sts_domain = f"_mta-sts.{domain}"
-        answers = dns.resolver.resolve(mta_sts_domain, 'TXT')
+        answers = get_broker().resolve(mta_sts_domain, 'TXT')
         
         for rdata in answers:
             txt = str(rdata).strip('"')
@@ -30,8 +31,8 @@ def scan_mta_sts(domain):
                 # Note: Full policy at https://mta-sts.{domain}/.well-known/mta-sts.txt
                 result['policy_url'] = f"https://mta-sts.{domain}/.well-known/mta-sts.txt"
                 
-                return result
+                return Finding(domain, result)
         
-        return {}
+        return None
     except:
-        return {}
+        return None
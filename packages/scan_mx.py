@@ -19,12 +19,11 @@ example.com MX records:
 Email senders try priority 10 first, then 20 if it fails.
 """
 
-import dns.resolver
+import asyncio
 
-# Global resolver with reasonable timeouts
-resolver = dns.resolver.Resolver()
-resolver.timeout = 2  # 2 seconds per query
-resolver.lifetime = 5  # 5 seconds total with retries
+from .async_broker import get_async_broker
+from .query_broker import get_broker
+from .records import Host, Record
 
 def scan_mx(domain):
     """
@@ -41,18 +40,18 @@ def scan_mx(domain):
         domain (str): Domain to check (e.g., "example.com")
     
     Returns:
-        list: Array of mail servers sorted by priority:
-              [{'host': 'mail1.example.com',
-                'priority': 10,
-                'ips': ['1.2.3.4', '1.2.3.5']},
-               {'host': 'mail2.example.com',
-                'priority': 20,
-                'ips': ['5.6.7.8']}]
+        list: One Record per mail server, sorted by priority:
+              [Record(domain, 'MX', Host('mail1.example.com', ['1.2.3.4', '1.2.3.5']),
+                      ttl, priority=10),
+               Record(domain, 'MX', Host('mail2.example.com', ['5.6.7.8']),
+                      ttl, priority=20)]
               
     PRESENTATION TIP:
     Lower priority = Higher importance!
     Priority 10 is tried BEFORE priority 20.
     """
+    resolver = get_broker()
+    
     try:
         # Query MX records from DNS
         answers = resolver.resolve(domain, 'MX')
@@ -72,17 +71,35 @@ def scan_mx(domain):
             except:
                 pass  # Failed to resolve (MX may be misconfigured)
             
-            # Build result dictionary
-            results.append({
-                'host': mx_host,
-                'priority': priority,
-                'ips': ips
-            })
+            # Build the record (the addresses travel with the host, to be crawled)
+            results.append(Record(domain, 'MX', Host(mx_host, ips), answers.rrset.ttl,
+                                  priority=priority))
         
         # === SORT BY PRIORITY ===
         # Email senders try lowest priority first
         # Priority 10 before priority 20 before priority 30, etc.
-        return sorted(results, key=lambda x: x['priority'])
+        return sorted(results, key=lambda x: x.get('priority'))
     
     except:
         return []  # No MX records or query failed
+
+
+async def scan_mx_async(domain):
+    """Coroutine version of scan_mx(): the mail servers are resolved concurrently."""
+    resolver = get_async_broker()
+    
+    async def resolve_ips(mx_host):
+        try:
+            return [str(ip) for ip in await resolver.resolve(mx_host, 'A')]
+        except Exception:
+            return []
+    
+    try:
+        answers = await resolver.resolve(domain, 'MX')
+        hosts = [(str(rdata.exchange).rstrip('.'), rdata.preference) for rdata in answers]
+        ips = await asyncio.gather(*(resolve_ips(host) for host, _ in hosts))
+        results = [Record(domain, 'MX', Host(host, host_ips), answers.rrset.ttl, priority=priority)
+                   for (host, priority), host_ips in zip(hosts, ips)]
+        return sorted(results, key=lambda x: x.get('priority'))
+    except Exception:
+        return []
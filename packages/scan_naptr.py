@@ -2,13 +2,16 @@
 
 import dns.resolver
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_naptr(domain, resolver_obj=None):
     """
     Scan for NAPTR records (Name Authority Pointer).
     Used for VoIP/SIP, ENUM (telephone number mapping), and service discovery.
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     try:
         answers = resolver_obj.resolve(domain, 'NAPTR')
@@ -46,7 +49,7 @@ def scan_naptr(domain, resolver_obj=None):
         # Sort by priority
         records.sort(key=lambda x: x['priority_score'])
         
-        return {domain: records} if records else None
+        return Finding(domain, records) if records else None
         
     except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
         return None
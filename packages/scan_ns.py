@@ -17,7 +17,8 @@ example.com NS records:
   ns2.cloudflare.com (104.16.133.229) - Provider: Cloudflare
 """
 
-import dns.resolver
+from .query_broker import get_broker
+from .records import Host, Record
 
 
 def scan_ns(domain):
@@ -35,16 +36,12 @@ def scan_ns(domain):
         domain (str): Target domain (e.g., "example.com")
     
     Returns:
-        list: Array of nameserver details:
-              [{'nameserver': 'ns1.example.com',
-                'ipv4': ['1.2.3.4'],
-                'ipv6': ['2001:db8::1'],
-                'provider': 'Cloudflare'}]
+        list: One Record per nameserver, its IPv4 + IPv6 addresses on the Host:
+              [Record(domain, 'NS', Host('ns1.example.com', ['1.2.3.4', '2001:db8::1']),
+                      ttl, provider='Cloudflare')]
     """
-    # Configure resolver with reasonable timeouts
-    resolver = dns.resolver.Resolver()
-    resolver.timeout = 2  # 2 seconds per query
-    resolver.lifetime = 5  # 5 seconds total including retries
+    # Shared broker (coalesces duplicate lookups across strategies)
+    resolver = get_broker()
     
     try:
         # Query NS records from authoritative servers
@@ -92,16 +89,10 @@ def scan_ns(domain):
             elif 'gandi' in ns_lower:
                 provider = 'Gandi'
             
-            # Build result dictionary
-            result = {'nameserver': ns_host}
-            if ips_v4:
-                result['ipv4'] = ips_v4
-            if ips_v6:
-                result['ipv6'] = ips_v6
-            if provider:
-                result['provider'] = provider
-            
-            results.append(result)
+            # Build the record (the addresses travel with the host, to be crawled)
+            extra = {'provider': provider} if provider else {}
+            results.append(Record(domain, 'NS', Host(ns_host, ips_v4 + ips_v6),
+                                  answers.rrset.ttl, **extra))
         
         return results
     
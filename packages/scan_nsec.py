@@ -2,6 +2,9 @@
 
 import dns.resolver
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_nsec(domain, resolver_obj=None):
     """
     Scan for NSEC and NSEC3 records (Next Secure).
@@ -9,7 +12,7 @@ def scan_nsec(domain, resolver_obj=None):
     NSEC3 provides zone enumeration protection.
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     results = {}
     
@@ -100,4 +103,7 @@ def scan_nsec(domain, resolver_obj=None):
     except:
         pass
     
-    return {domain: results} if results else None
+    if not results:
+        return None
+    # NSEC names the next owner in the zone: a name worth crawling
+    return Finding(domain, results, hosts=[r['next_domain'] for r in results.get('nsec', [])])
@@ -1,32 +1,48 @@
 """Scan PTR (Pointer) records for reverse DNS."""
 
-import dns.resolver
 import dns.reversename
 
+from .async_broker import get_async_broker
+from .query_broker import get_broker
+from .records import Host, Record
+
 def scan_ptr(ip):
     """Query PTR records with hostname details."""
-    resolver = dns.resolver.Resolver()
-    resolver.timeout = 2
-    resolver.lifetime = 5
+    resolver = get_broker()
     
     try:
         rev_name = dns.reversename.from_address(ip)
         answers = resolver.resolve(rev_name, 'PTR')
-        results = []
-        for rdata in answers:
-            hostname = str(rdata).rstrip('.')
-            result = {'ip': ip, 'hostname': hostname}
-            # Check if hostname is cloud provider
-            h_lower = hostname.lower()
-            if 'amazonaws' in h_lower or 'aws' in h_lower:
-                result['provider'] = 'AWS'
-            elif 'googleusercontent' in h_lower or 'google' in h_lower:
-                result['provider'] = 'Google Cloud'
-            elif 'cloudflare' in h_lower:
-                result['provider'] = 'Cloudflare'
-            elif 'azure' in h_lower or 'microsoft' in h_lower:
-                result['provider'] = 'Azure'
-            results.append(result)
-        return results
+        return _ptr_details(ip, answers)
     except:
         return []
+
+
+async def scan_ptr_async(ip):
+    """Coroutine version of scan_ptr()."""
+    try:
+        rev_name = dns.reversename.from_address(ip)
+        answers = await get_async_broker().resolve(rev_name, 'PTR')
+        return _ptr_details(ip, answers)
+    except Exception:
+        return []
+
+
+def _ptr_details(ip, answers):
+    results = []
+    for rdata in answers:
+        hostname = str(rdata).rstrip('.')
+        extra = {}
+        # Check if hostname is cloud provider
+        h_lower = hostname.lower()
+        if 'amazonaws' in h_lower or 'aws' in h_lower:
+            extra['provider'] = 'AWS'
+        elif 'googleusercontent' in h_lower or 'google' in h_lower:
+            extra['provider'] = 'Google Cloud'
+        elif 'cloudflare' in h_lower:
+            extra['provider'] = 'Cloudflare'
+        elif 'azure' in h_lower or 'microsoft' in h_lower:
+            extra['provider'] = 'Azure'
+        # Owner: the address itself rather than its in-addr.arpa name
+        results.append(Record(ip, 'PTR', Host(hostname), answers.rrset.ttl, **extra))
+    return results
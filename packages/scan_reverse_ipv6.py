@@ -1,14 +1,16 @@
 """Perform reverse DNS lookups for IPv6."""
 
-import dns.resolver
 import dns.reversename
 
+from .query_broker import get_broker
+from .records import Host
+
 
 def scan_reverse_ipv6(ipv6):
-    """Perform reverse DNS lookup on IPv6 address."""
+    """Perform reverse DNS lookup on IPv6 address (list of Host)."""
     try:
         rev_name = dns.reversename.from_address(ipv6)
-        answers = dns.resolver.resolve(rev_name, 'PTR')
-        return [str(rdata) for rdata in answers]
+        answers = get_broker().resolve(rev_name, 'PTR')
+        return [Host(rdata) for rdata in answers]
     except Exception:
         return []
@@ -1,6 +1,7 @@
 """Check for security.txt file via DNS TXT records."""
 
-import dns.resolver
+from .query_broker import get_broker
+from .records import Finding
 
 def scan_security_txt(domain):
     """Look for security contact information in TXT records.
@@ -9,14 +10,14 @@ def scan_security_txt(domain):
         domain (str): Domain name
     
     Returns:
-        dict: Security contact and policy information
+        Finding: Security contact and policy information, or None
     """
     result = {}
     
     try:
         # Check _security.domain TXT records
         security_domain = f"_security.{domain}"
-        answers = dns.resolver.resolve(security_domain, 'TXT')
+        answers = get_broker().resolve(security_domain, 'TXT')
         
         for rdata in answers:
             txt = str(rdata).strip('"')
@@ -33,7 +34,7 @@ def scan_security_txt(domain):
     
     # Also check main domain TXT for security info
     try:
-        answers = dns.resolver.resolve(domain, 'TXT')
+        answers = get_broker().resolve(domain, 'TXT')
         for rdata in answers:
             txt = str(rdata).strip('"').lower()
             if 'security@' in txt or 'abuse@' in txt or 'cert@' in txt:
@@ -43,4 +44,4 @@ def scan_security_txt(domain):
     except:
         pass
     
-    return result
+    return Finding(domain, result) if result else None
@@ -1,6 +1,8 @@
 """Scan SOA (Start of Authority) records."""
 
-import dns.resolver
+from .async_broker import get_async_broker
+from .query_broker import get_broker
+from .records import Finding
 
 
 def scan_soa(domain):
@@ -10,23 +12,34 @@ def scan_soa(domain):
         domain (str): Domain name
     
     Returns:
-        dict: SOA record details
+        Finding: SOA record details (primary name server to crawl), or None
     """
     try:
-        answers = dns.resolver.resolve(domain, 'SOA')
-        for rdata in answers:
-            # Extract email from rname (format: admin.domain.com -> admin@domain.com)
-            rname_str = str(rdata.rname)
-            email = rname_str.replace('.', '@', 1).rstrip('.')
-            
-            return {
-                'mname': str(rdata.mname).rstrip('.'),
-                'rname': email,
-                'serial': rdata.serial,
-                'refresh': rdata.refresh,
-                'retry': rdata.retry,
-                'expire': rdata.expire,
-                'minimum': rdata.minimum
-            }
+        return _soa_details(domain, get_broker().resolve(domain, 'SOA'))
     except Exception:
-        return {}
+        return None
+
+
+async def scan_soa_async(domain):
+    """Coroutine version of scan_soa()."""
+    try:
+        return _soa_details(domain, await get_async_broker().resolve(domain, 'SOA'))
+    except Exception:
+        return None
+
+
+def _soa_details(domain, answers):
+    for rdata in answers:
+        # Extract email from rname (format: admin.domain.com -> admin@domain.com)
+        rname_str = str(rdata.rname)
+        email = rname_str.replace('.', '@', 1).rstrip('.')
+        
+        return Finding(domain, {
+            'mname': str(rdata.mname).rstrip('.'),
+            'rname': email,
+            'serial': rdata.serial,
+            'refresh': rdata.refresh,
+            'retry': rdata.retry,
+            'expire': rdata.expire,
+            'minimum': rdata.minimum
+        }, hosts=[rdata.mname])
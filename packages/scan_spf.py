@@ -16,7 +16,8 @@ EXAMPLE:
   Means: Allow Google servers + 203.0.113.0/24, reject everything else
 """
 
-import dns.resolver
+from .query_broker import get_broker
+from .records import Finding
 
 
 def scan_spf(domain):
@@ -37,13 +38,14 @@ def scan_spf(domain):
         domain (str): Domain to check
     
     Returns:
-        dict: {'record': 'full SPF string',
-               'mechanisms': [{'type': 'include', 'value': '_spf.google.com'}],
-               'policy': '-all'}
+        Finding: {'record': 'full SPF string',
+                  'mechanisms': [{'type': 'include', 'value': '_spf.google.com'}],
+                  'policy': '-all'},
+            with the include:/a: domains and single ip4:/ip6: addresses to crawl
     """
     try:
         # Query all TXT records
-        answers = dns.resolver.resolve(domain, 'TXT')
+        answers = get_broker().resolve(domain, 'TXT')
         
         # Find SPF record (starts with "v=spf1")
         for rdata in answers:
@@ -105,9 +107,10 @@ def scan_spf(domain):
                         # +all = pass (accept all - INSECURE!)
                         # ?all = neutral
                 
-                return result
+                values = [m['value'] for m in result['mechanisms']]
+                return Finding(domain, result, hosts=values, ips=values)
         
-        return {}  # No SPF record found
+        return None  # No SPF record found
     
     except Exception:
-        return {}  # Query failed or parse error
+        return None  # Query failed or parse error
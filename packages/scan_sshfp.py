@@ -2,13 +2,16 @@
 
 import dns.resolver
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_sshfp(domain, resolver_obj=None):
     """
     Scan for SSHFP records (SSH Fingerprint).
     Allows SSH clients to verify host keys via DNS.
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     try:
         answers = resolver_obj.resolve(domain, 'SSHFP')
@@ -44,7 +47,7 @@ def scan_sshfp(domain, resolver_obj=None):
             }
             records.append(record_info)
         
-        return {domain: records} if records else None
+        return Finding(domain, records) if records else None
         
     except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
         return None
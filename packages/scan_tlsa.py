@@ -2,13 +2,16 @@
 
 import dns.resolver
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_tlsa(domain, resolver_obj=None):
     """
     Scan for TLSA records (DNS-based Authentication of Named Entities).
     Used for securing SMTP, HTTPS, and other services.
     """
     if resolver_obj is None:
-        resolver_obj = dns.resolver.Resolver()
+        resolver_obj = get_broker()
     
     results = {}
     
@@ -74,4 +77,4 @@ def scan_tlsa(domain, resolver_obj=None):
         except Exception:
             continue
     
-    return results if results else None
+    return Finding(domain, results) if results else None
@@ -1,12 +1,11 @@
 """Extract TTL information from DNS records for cache analysis."""
 
-import dns.resolver
+from .query_broker import get_broker
+from .records import Finding
 
 def scan_ttl(domain):
     """Query multiple record types and extract TTL values for analysis."""
-    resolver_obj = dns.resolver.Resolver()
-    resolver_obj.timeout = 2
-    resolver_obj.lifetime = 5
+    resolver_obj = get_broker()
     
     record_types = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'SOA', 'CNAME']
     results = {}
@@ -36,4 +35,4 @@ def scan_ttl(domain):
         except:
             pass
     
-    return results
+    return Finding(domain, results) if results else None
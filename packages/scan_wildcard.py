@@ -1,14 +1,14 @@
 """Check for wildcard DNS entries."""
 
-import dns.resolver
 import random
 import string
 
+from .query_broker import get_broker
+from .records import Finding
+
 def scan_wildcard(domain):
     """Detect wildcard DNS by checking random subdomains."""
-    resolver_obj = dns.resolver.Resolver()
-    resolver_obj.timeout = 1
-    resolver_obj.lifetime = 2
+    resolver_obj = get_broker()
     
     # Generate random subdomains
     random_subdomains = [
@@ -28,12 +28,12 @@ def scan_wildcard(domain):
             pass
     
     if wildcard_ips:
-        return {
+        return Finding(domain, {
             'wildcard_detected': True,
             'wildcard_ips': list(wildcard_ips),
             'note': 'Domain uses wildcard DNS - subdomain enumeration may be unreliable'
-        }
+        })
     
-    return {
+    return Finding(domain, {
         'wildcard_detected': False
-    }
+    })
@@ -1,21 +1,27 @@
 """Scan for SRV (Service) records - OPTIMIZED."""
 
-import dns.resolver
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-resolver = dns.resolver.Resolver()
-resolver.timeout = 1
-resolver.lifetime = 2
+from .executor import get_executor
+from .query_broker import get_broker
+from .records import Finding
 
 def _check_srv(service, domain):
     """Check single SRV record."""
     query = f"{service}.{domain}"
     try:
-        answers = resolver.resolve(query, 'SRV')
+        answers = get_broker().resolve(query, 'SRV')
         return [(query, str(rdata)) for rdata in answers]
     except:
         return []
 
+def _lookup_srv(service, domain):
+    """SRV targets of one service, or None if it has no records."""
+    try:
+        srv_domain = f"{service}.{domain}"
+        answers = get_broker().resolve(srv_domain, 'SRV')
+        return [str(rdata.target) for rdata in answers]
+    except Exception:
+        return None
+
 def srv_scan(domain, services=None):
     """Query SRV records for common services.
     
@@ -24,7 +30,7 @@ def srv_scan(domain, services=None):
         services (list, optional): List of service names to check
     
     Returns:
-        dict: Found SRV records by service
+        Finding: SRV targets by service (the targets to crawl), or None
     """
     if services is None:
         services = [
@@ -46,13 +52,15 @@ def srv_scan(domain, services=None):
             '_kpasswd._tcp', '_kpasswd._udp',
         ]
     
+    # Parallel lookups on the shared workers; results keep the services order
+    executor = get_executor()
+    futures = [(service, executor.submit(_lookup_srv, service, domain)) for service in services]
     results = {}
-    for service in services:
-        try:
-            srv_domain = f"{service}.{domain}"
-            answers = dns.resolver.resolve(srv_domain, 'SRV')
-            results[service] = [str(rdata.target) for rdata in answers]
-        except Exception:
-            pass
+    for service, future in futures:
+        targets = future.result()
+        if targets is not None:
+            results[service] = targets
     
-    return results
+    if not results:
+        return None
+    return Finding(domain, results, hosts=[t for targets in results.values() for t in targets])
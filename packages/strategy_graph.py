@@ -0,0 +1,76 @@
+"""
+Per-domain strategy scheduling as a dependency graph.
+
+Strategies that can reuse other strategies' results declare them in
+STRATEGY_INPUTS; the graph starts every strategy whose producers have
+finished and hands it their results as keyword arguments. Intermediate
+results several strategies need (SHARED_INPUTS) become extra nodes that
+run once per domain. A missing or empty input is passed as None and the
+strategy fetches the data itself, so disabled producers only cost speed.
+"""
+
+import threading
+
+from . import SHARED_INPUTS, STRATEGY_INPUTS
+
+
+class StrategyGraph:
+    """
+    Scheduling state of one domain's strategies.
+
+    Args:
+        strategies (dict): {result key: strategy name} to run
+        enabled (callable): enabled(strategy name) -> bool; disabled
+            strategies wait for nothing and pull in no shared input
+    """
+
+    def __init__(self, strategies, enabled):
+        self.strategies = dict(strategies)
+        self._lock = threading.Lock()
+        self._outputs = {}
+        self._started = set()
+        self._waiting = {}  # node -> producers not finished yet
+
+        producers = {name: key for key, name in self.strategies.items()}
+        for key, name in list(self.strategies.items()):
+            if not enabled(name):
+                self._waiting[key] = set()
+                continue
+            needs = set()
+            for producer in STRATEGY_INPUTS.get(name, {}).values():
+                if producer in producers:
+                    needs.add(producers[producer])
+                elif producer in SHARED_INPUTS:
+                    self.strategies.setdefault(producer, producer)
+                    needs.add(producer)
+            self._waiting[key] = needs
+        for node in self.strategies:
+            self._waiting.setdefault(node, set())
+
+    def is_shared(self, node):
+        """True for intermediate nodes, whose results are not reported."""
+        return node in SHARED_INPUTS
+
+    def ready(self):
+        """Nodes whose producers have all finished and that have not started yet."""
+        with self._lock:
+            nodes = [node for node, needs in self._waiting.items()
+                     if not needs and node not in self._started]
+            self._started.update(nodes)
+        return nodes
+
+    def done(self, node, result):
+        """Record node's result; returns the nodes it unblocked."""
+        with self._lock:
+            self._outputs[node] = result
+            for needs in self._waiting.values():
+                needs.discard(node)
+        return self.ready()
+
+    def inputs(self, node):
+        """Keyword arguments for node: its producers' results (None if empty)."""
+        name = self.strategies[node]
+        producers = {n: key for key, n in self.strategies.items()}
+        with self._lock:
+            return {argument: self._outputs.get(producers.get(producer)) or None
+                    for argument, producer in STRATEGY_INPUTS.get(name, {}).items()}
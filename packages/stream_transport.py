@@ -0,0 +1,339 @@
+"""
+Persistent, pipelined DNS-over-TCP and DNS-over-TLS connections (RFC 7766, RFC 7858).
+
+Instead of one TCP (and TLS) handshake per query, each upstream gets a
+long-lived connection that carries many queries at once. Answers may come
+back in any order and are matched by message ID. TLS sessions are kept and
+resumed when a connection has to be reopened.
+
+Every connection is driven by one I/O thread that does all reads and
+writes on its socket, so TLS sockets are never used from two threads.
+"""
+
+import collections
+import random
+import select
+import selectors
+import socket
+import ssl
+import struct
+import threading
+import time
+
+import dns.exception
+import dns.message
+
+from .udp_transport import matches_request
+
+_random = random.SystemRandom()
+
+
+class StreamTicket:
+    """One query waiting on a stream connection."""
+
+    __slots__ = ('request', 'event', 'response', 'error', 'qid')
+
+    def __init__(self, request):
+        self.request = request
+        self.event = threading.Event()
+        self.response = None
+        self.error = None
+        self.qid = None
+
+
+class _Connection:
+    """One TCP/TLS connection and the I/O thread that drives it."""
+
+    def __init__(self, transport, key, sock):
+        self.transport = transport
+        self.key = key
+        self.sock = sock
+        self.alive = True
+        self.pending = {}  # message ID -> StreamTicket
+        self.last_used = time.time()
+
+        self._lock = threading.Lock()
+        self._outbox = collections.deque()
+        self._wakeup = socket.socketpair()
+        self._wakeup[0].setblocking(False)
+        self._thread = threading.Thread(target=self._run, name=f'dns-stream-{key[0]}',
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, request):
+        """Queue request for sending; returns its ticket, or None if the connection is gone."""
+        ticket = StreamTicket(request)
+        with self._lock:
+            if not self.alive:
+                return None
+            qid = _random.randrange(65536)
+            while qid in self.pending:
+                qid = _random.randrange(65536)
+            ticket.qid = qid
+            request.id = qid
+            wire = request.to_wire()
+            self.pending[qid] = ticket
+            self._outbox.append(struct.pack('!H', len(wire)) + wire)
+            self.last_used = time.time()
+        self._poke()
+        return ticket
+
+    def cancel(self, ticket):
+        with self._lock:
+            if self.pending.get(ticket.qid) is ticket:
+                del self.pending[ticket.qid]
+
+    def load(self):
+        with self._lock:
+            return len(self.pending)
+
+    def _poke(self):
+        try:
+            self._wakeup[1].send(b'\0')
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # I/O thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self.sock, selectors.EVENT_READ)
+        selector.register(self._wakeup[0], selectors.EVENT_READ)
+        buffer = bytearray()
+        error = EOFError("connection closed")
+        try:
+            while True:
+                with self._lock:
+                    outgoing = list(self._outbox)
+                    self._outbox.clear()
+                    idle = not self.pending and time.time() - self.last_used > self.transport.idle_timeout
+                for data in outgoing:
+                    self._send_all(data)
+                if idle:
+                    return  # Quietly retire an idle connection
+
+                events = selector.select(timeout=1.0)
+                for key, _ in events:
+                    if key.fileobj is self._wakeup[0]:
+                        try:
+                            self._wakeup[0].recv(4096)
+                        except OSError:
+                            pass
+                        continue
+                    try:
+                        chunk = self.sock.recv(65535)
+                    except (ssl.SSLWantReadError, ssl.SSLWantWriteError, BlockingIOError):
+                        continue  # Readable, but only TLS housekeeping (e.g. session tickets)
+                    if not chunk:
+                        return
+                    buffer += chunk
+                    # TLS may hold decrypted bytes the selector cannot see
+                    while isinstance(self.sock, ssl.SSLSocket) and self.sock.pending():
+                        buffer += self.sock.recv(self.sock.pending())
+                    self._deliver(buffer)
+        except (OSError, ValueError) as e:
+            error = e
+        finally:
+            self._close(error)
+            selector.close()
+
+    def _send_all(self, data):
+        """Write data on the non-blocking socket, waiting for room when needed."""
+        view = memoryview(data)
+        deadline = time.time() + self.transport.write_timeout
+        while view:
+            try:
+                view = view[self.sock.send(view):]
+            except (ssl.SSLWantReadError, ssl.SSLWantWriteError, BlockingIOError):
+                # TLS wants the same buffer again once the socket is ready
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise socket.timeout("write timed out")
+                select.select([self.sock], [self.sock], [], remaining)
+
+    def _deliver(self, buffer):
+        """Hand every complete framed message in buffer to its ticket."""
+        while len(buffer) >= 2:
+            length = struct.unpack_from('!H', buffer)[0]
+            if len(buffer) < 2 + length:
+                return
+            wire = bytes(buffer[2:2 + length])
+            del buffer[:2 + length]
+            if length < 2:
+                continue
+            qid = int.from_bytes(wire[:2], 'big')
+            with self._lock:
+                ticket = self.pending.get(qid)
+            if ticket is None:
+                continue  # Late answer for a query that already gave up
+            try:
+                response = dns.message.from_wire(wire)
+            except dns.exception.DNSException as e:
+                response, ticket.error = None, e
+            else:
+                if not matches_request(ticket.request, response):
+                    continue
+            with self._lock:
+                if self.pending.get(qid) is not ticket:
+                    continue
+                del self.pending[qid]
+                self.last_used = time.time()
+            ticket.response = response
+            ticket.event.set()
+
+    def _close(self, error):
+        """Fail every waiting ticket and release the socket."""
+        with self._lock:
+            self.alive = False
+            pending, self.pending = self.pending, {}
+        self.transport._forget(self)
+        for ticket in pending.values():
+            ticket.error = error
+            ticket.event.set()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        for sock in self._wakeup:
+            sock.close()
+
+
+class StreamTransport:
+    """
+    Pool of pipelined TCP or TLS connections, keyed by (address, port).
+
+    Args:
+        tls (bool): Speak DNS over TLS instead of plain TCP
+        ssl_context (ssl.SSLContext, optional): TLS settings (default: system trust store)
+        server_hostname (str, optional): Name to verify in the server certificate
+            (default: the upstream IP address)
+        connections (int): Max connections per upstream
+        pipeline (int): Outstanding queries per connection before another one is opened
+        idle_timeout (float): Seconds an unused connection stays open
+    """
+
+    def __init__(self, tls=False, ssl_context=None, server_hostname=None, connections=2,
+                 pipeline=64, idle_timeout=30.0):
+        self.tls = tls
+        self.ssl_context = ssl_context
+        if tls and ssl_context is None:
+            self.ssl_context = ssl.create_default_context()
+        self.server_hostname = server_hostname
+        self.connections = connections
+        self.pipeline = pipeline
+        self.idle_timeout = idle_timeout
+        self.write_timeout = 5.0
+
+        self._lock = threading.Lock()
+        self._pools = {}      # (address, port) -> [_Connection]
+        self._connecting = {} # (address, port) -> threading.Lock
+        self._sessions = {}   # (address, port) -> ssl.SSLSession
+        self.stats = {'queries': 0, 'connections': 0, 'reused': 0, 'tls_resumed': 0}
+
+    def _forget(self, connection):
+        """Drop a closed connection from its pool, keeping its TLS session."""
+        with self._lock:
+            pool = self._pools.get(connection.key, [])
+            if connection in pool:
+                pool.remove(connection)
+            session = getattr(connection.sock, 'session', None)
+            if session is not None:
+                self._sessions[connection.key] = session
+
+    def _open(self, key, timeout):
+        """Connect (and handshake) a new connection to key."""
+        address, port = key
+        sock = socket.create_connection((address, port), timeout=timeout)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.tls:
+                with self._lock:
+                    session = self._sessions.get(key)
+                sock = self.ssl_context.wrap_socket(
+                    sock, server_hostname=self.server_hostname or address, session=session)
+                if sock.session_reused:
+                    with self._lock:
+                        self.stats['tls_resumed'] += 1
+            sock.setblocking(False)  # The I/O thread must never block in recv()
+        except Exception:
+            sock.close()
+            raise
+        with self._lock:
+            self.stats['connections'] += 1
+        return _Connection(self, key, sock)
+
+    def _connection(self, key, timeout):
+        """A live connection to key with room in its pipeline, opening one if needed."""
+        with self._lock:
+            pool = [c for c in self._pools.get(key, []) if c.alive]
+            best = min(pool, key=lambda c: c.load(), default=None)
+            if best is not None and (best.load() < self.pipeline or len(pool) >= self.connections):
+                self.stats['reused'] += 1
+                return best, False
+            gate = self._connecting.setdefault(key, threading.Lock())
+
+        # One handshake at a time per upstream; others may find it ready afterwards
+        if not gate.acquire(timeout=timeout):
+            raise dns.exception.Timeout(timeout=timeout)
+        try:
+            with self._lock:
+                pool = [c for c in self._pools.get(key, []) if c.alive]
+                best = min(pool, key=lambda c: c.load(), default=None)
+                if best is not None and best.load() < self.pipeline:
+                    self.stats['reused'] += 1
+                    return best, False
+            connection = self._open(key, timeout)
+            with self._lock:
+                self._pools.setdefault(key, []).append(connection)
+            return connection, True
+        finally:
+            gate.release()
+
+    def query(self, request, address, port, timeout):
+        """
+        Send request over a pooled connection and wait for its answer.
+
+        Args:
+            request (dns.message.Message): Query (its ID is replaced)
+            address (str): Upstream IP address
+            port (int): Upstream port
+            timeout (float): Seconds to wait, including any connection setup
+
+        Returns:
+            dns.message.Message: The response
+
+        Raises:
+            dns.exception.Timeout: No answer in time
+            OSError / EOFError: The connection failed
+        """
+        key = (address, port)
+        deadline = time.time() + timeout
+        with self._lock:
+            self.stats['queries'] += 1
+
+        for attempt in range(2):
+            connection, fresh = self._connection(key, max(deadline - time.time(), 0.001))
+            ticket = connection.submit(request)
+            if ticket is None:
+                continue  # Closed under us: take another
+            if not ticket.event.wait(max(deadline - time.time(), 0)):
+                connection.cancel(ticket)
+                raise dns.exception.Timeout(timeout=timeout)
+            if ticket.error is None:
+                return ticket.response
+            # A reused connection may have been closed by the server while idle
+            if fresh or attempt or isinstance(ticket.error, dns.exception.DNSException):
+                raise ticket.error
+        raise EOFError("connection closed")
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            connections = [c for pool in self._pools.values() for c in pool]
+        for connection in connections:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
@@ -1,20 +1,18 @@
 """Enumerate subdomains through bruteforce - OPTIMIZED."""
 
-import dns.resolver
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from tqdm import tqdm
 
-# Fast resolver
-resolver = dns.resolver.Resolver()
-resolver.timeout = 1
-resolver.lifetime = 2
+from .executor import get_executor
+from .query_broker import get_broker
+from .records import Host
 
 def _check_subdomain(sub, domain):
     """Check single subdomain."""
     subdomain = f"{sub}.{domain}"
     try:
-        resolver.resolve(subdomain, 'A')
-        return subdomain
+        get_broker().resolve(subdomain, 'A')
+        return Host(subdomain)
     except:
         return None
 
@@ -26,7 +24,7 @@ def subdomains_enumeration(domain, wordlist=None):
         wordlist (list, optional): Custom subdomain wordlist
     
     Returns:
-        list: Found subdomains
+        list: Found subdomains (Host)
     """
     if wordlist is None:
         wordlist = [
@@ -36,12 +34,12 @@ def subdomains_enumeration(domain, wordlist=None):
         ]
     
     found = []
-    # Parallel execution with 30 threads for speed (silent mode)
-    with ThreadPoolExecutor(max_workers=30) as executor:
-        futures = {executor.submit(_check_subdomain, sub, domain): sub for sub in wordlist}
-        for future in as_completed(futures):
-            result = future.result()
-            if result:
-                found.append(result)
+    # Parallel execution on the shared workers (silent mode)
+    executor = get_executor()
+    futures = {executor.submit(_check_subdomain, sub, domain): sub for sub in wordlist}
+    for future in as_completed(futures):
+        result = future.result()
+        if result:
+            found.append(result)
     
     return found
@@ -0,0 +1,95 @@
+"""
+Shared lookups used by several strategies: a domain's addresses and their
+origin ASN from Team Cymru's DNS service (origin.asn.cymru.com).
+
+domain_addresses() is a shared input of the strategy graph: it runs once
+per domain and its result is handed to anycast and cdn_enhanced instead of
+each of them resolving the same A records and ASNs.
+
+ASN data is memoized per IP and AS names per ASN (see memo.py), so domains
+sharing addresses or providers reuse the same verdicts.
+"""
+
+import ipaddress
+
+from .memo import get_memo
+from .query_broker import get_broker
+
+
+def ip_asn(ip, resolver_obj=None):
+    """
+    Origin ASN of an IPv4 address (memoized per IP).
+
+    Args:
+        ip (str): IPv4 address
+        resolver_obj (optional): Resolver to use (default: shared query broker)
+
+    Returns:
+        dict: {'asn', 'bgp_prefix', 'country', 'registry', 'asn_name'} (only
+              the fields Team Cymru returned), or None if unknown
+    """
+    if resolver_obj is None:
+        resolver_obj = get_broker()
+    info = get_memo().get('asn', ip, lambda: _origin(ip, resolver_obj))
+    return dict(info) if info is not None else None
+
+
+def _origin(ip, resolver_obj):
+    try:
+        if not isinstance(ipaddress.ip_address(ip), ipaddress.IPv4Address):
+            return None
+        reversed_ip = '.'.join(reversed(ip.split('.')))
+        answer = resolver_obj.resolve(f"{reversed_ip}.origin.asn.cymru.com", 'TXT')
+    except Exception:
+        return None
+
+    info = None
+    for rdata in answer:
+        # Format: "ASN | BGP Prefix | CC | Registry | Allocated"
+        parts = [p.strip() for p in rdata.to_text().strip('"').split('|')]
+        info = {'asn': parts[0]}
+        for field, value in zip(('bgp_prefix', 'country', 'registry'), parts[1:4]):
+            info[field] = value
+        break
+    if info is None:
+        return None
+
+    asn_name = get_memo().get('as_name', info['asn'], lambda: _as_name(info['asn'], resolver_obj))
+    if asn_name:
+        info['asn_name'] = asn_name
+    return info
+
+
+def _as_name(asn, resolver_obj):
+    try:
+        answer = resolver_obj.resolve(f"AS{asn}.asn.cymru.com", 'TXT')
+        for rdata in answer:
+            # Format: "ASN | CC | Registry | Allocated | AS Name"
+            parts = [p.strip() for p in rdata.to_text().strip('"').split('|')]
+            if len(parts) >= 5:
+                return parts[4]
+    except Exception:
+        pass
+    return None
+
+
+def domain_addresses(domain, resolver_obj=None):
+    """
+    A records of domain, their TTL and the origin ASN of each address.
+
+    Returns:
+        dict: {'ips': [...], 'ttl': int, 'asn': {ip: ip_asn() result}},
+              or None if the domain has no A records
+    """
+    if resolver_obj is None:
+        resolver_obj = get_broker()
+    try:
+        answers = resolver_obj.resolve(domain, 'A')
+    except Exception:
+        return None
+    ips = [str(rdata) for rdata in answers]
+    return {
+        'ips': ips,
+        'ttl': answers.rrset.ttl,
+        'asn': {ip: ip_asn(ip, resolver_obj) for ip in ips},
+    }
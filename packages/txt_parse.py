@@ -1,7 +1,8 @@
 """Parse TXT records for IPs and domains."""
 
 import re
-import dns.resolver
+from .query_broker import get_broker
+from .records import Finding
 
 
 def txt_parse(domain):
@@ -11,10 +12,11 @@ def txt_parse(domain):
         domain (str): Domain name
     
     Returns:
-        dict: Extracted data including verification, security, CDN, and ownership info
+        Finding: Extracted data including verification, security, CDN, and ownership
+            info, with the domains and IPs found in the text to crawl
     """
     try:
-        answers = dns.resolver.resolve(domain, 'TXT')
+        answers = get_broker().resolve(domain, 'TXT')
         
         result = {
             'raw_records': [],
@@ -95,7 +97,9 @@ def txt_parse(domain):
         result['domains'] = list(set(result['domains']))[:5]
         
         # Remove empty sections
-        return {k: v for k, v in result.items() if v}
+        result = {k: v for k, v in result.items() if v}
+        return Finding(domain, result, hosts=result.get('domains', ()),
+                       ips=result.get('ips', ())) if result else None
         
     except Exception:
-        return {}
+        return None
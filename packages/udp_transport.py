@@ -0,0 +1,267 @@
+"""
+Shared UDP transport: a few long-lived sockets, many queries in flight.
+
+dns.query.udp() opens and closes a socket for every query. Here a small set
+of sockets per address family stays open for the whole scan; each query gets
+a random message ID that is unique on its socket, and one receiver thread
+reads every answer and hands it to the waiting query by (socket, ID).
+Sockets are replaced after a number of queries, so source ports keep
+changing during long runs.
+"""
+
+import random
+import selectors
+import socket
+import threading
+import time
+
+import dns.exception
+import dns.flags
+import dns.message
+import dns.rcode
+
+_random = random.SystemRandom()
+
+
+def matches_request(request, response):
+    """
+    Does response answer request? Like Message.is_response(), minus the ID
+    check: transports match the ID they put on the wire themselves, and
+    hedged copies of one request carry different IDs.
+    """
+    if not response.flags & dns.flags.QR or response.opcode() != request.opcode():
+        return False
+    if response.rcode() in (dns.rcode.FORMERR, dns.rcode.SERVFAIL, dns.rcode.NOTIMP,
+                            dns.rcode.REFUSED) and not response.question:
+        return True
+    return response.question == request.question
+
+
+class UdpTicket:
+    """One outstanding query; ``event`` is set once it has an outcome."""
+
+    __slots__ = ('request', 'destination', 'event', 'response', 'received_at',
+                 'error', 'done', 'slot', 'qid')
+
+    def __init__(self, request, destination, event):
+        self.request = request
+        self.destination = destination
+        self.event = event
+        self.response = None
+        self.received_at = None
+        self.error = None
+        self.done = False
+        self.slot = None
+        self.qid = None
+
+
+class _Slot:
+    """A socket plus the tickets waiting for an answer on it."""
+
+    __slots__ = ('sock', 'pending', 'uses', 'retired_at')
+
+    def __init__(self, af):
+        self.sock = socket.socket(af, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.pending = {}  # message ID -> UdpTicket
+        self.uses = 0
+        self.retired_at = None
+
+
+class UdpTransport:
+    """
+    Multiplexed UDP sockets with a background receiver thread.
+
+    Args:
+        sockets (int): Open sockets per address family
+        rotate_after (int): Queries sent on a socket before it is replaced
+        linger (float): Seconds a replaced socket keeps listening for late answers
+    """
+
+    def __init__(self, sockets=4, rotate_after=2000, linger=10.0):
+        self.sockets = sockets
+        self.rotate_after = rotate_after
+        self.linger = linger
+
+        self._lock = threading.Lock()
+        self._slots = {}      # address family -> [_Slot]
+        self._retired = []    # Replaced slots still draining late answers
+        self._register = []   # Slots the receiver thread has not registered yet
+        self._selector = None
+        self._wakeup = None
+        self._thread = None
+        self._closed = False
+        self.stats = {'sent': 0, 'received': 0, 'unexpected': 0, 'rotated': 0}
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+
+    def _start(self):
+        """Create the selector and receiver thread (caller holds the lock)."""
+        self._selector = selectors.DefaultSelector()
+        self._wakeup = socket.socketpair()
+        self._wakeup[0].setblocking(False)
+        self._selector.register(self._wakeup[0], selectors.EVENT_READ)
+        self._thread = threading.Thread(target=self._receive_loop, name='dns-udp-receiver',
+                                        daemon=True)
+        self._thread.start()
+
+    def _new_slot(self, af):
+        slot = _Slot(af)
+        self._register.append(slot)
+        return slot
+
+    def _poke(self):
+        try:
+            self._wakeup[1].send(b'\0')
+        except OSError:
+            pass
+
+    def send(self, request, destination, af, event):
+        """
+        Send request to destination and return its ticket.
+
+        The request's ID is replaced by a random one that is free on the
+        chosen socket. ``event`` is set when the answer (or an error) arrives;
+        several tickets may share one event.
+
+        Raises:
+            OSError: The datagram could not be sent
+        """
+        ticket = UdpTicket(request, destination, event)
+        with self._lock:
+            if self._closed:
+                raise OSError("UDP transport is closed")
+            if self._thread is None:
+                self._start()
+            slots = self._slots.get(af)
+            if slots is None:
+                slots = self._slots[af] = [self._new_slot(af) for _ in range(self.sockets)]
+                self._poke()
+            index = _random.randrange(len(slots))
+            slot = slots[index]
+            if slot.uses >= self.rotate_after:
+                # Fresh socket, fresh source port; the old one drains in the background
+                slot.retired_at = time.time()
+                self._retired.append(slot)
+                slot = slots[index] = self._new_slot(af)
+                self.stats['rotated'] += 1
+                self._poke()
+            qid = _random.randrange(65536)
+            while qid in slot.pending:
+                qid = _random.randrange(65536)
+            slot.pending[qid] = ticket
+            slot.uses += 1
+            ticket.slot = slot
+            ticket.qid = qid
+            request.id = qid
+            wire = request.to_wire()
+
+        try:
+            slot.sock.sendto(wire, destination)
+        except OSError:
+            self.cancel(ticket)
+            raise
+        with self._lock:
+            self.stats['sent'] += 1
+        return ticket
+
+    def cancel(self, ticket):
+        """Stop waiting for ticket (timed out, or the query already has an answer)."""
+        with self._lock:
+            if ticket.slot is not None and ticket.slot.pending.get(ticket.qid) is ticket:
+                del ticket.slot.pending[ticket.qid]
+
+    # ------------------------------------------------------------------
+    # Receiving
+    # ------------------------------------------------------------------
+
+    def _receive_loop(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                register, self._register = self._register, []
+                now = time.time()
+                drained = [s for s in self._retired
+                           if not s.pending or now - s.retired_at > self.linger]
+                self._retired = [s for s in self._retired if s not in drained]
+            for slot in register:
+                self._selector.register(slot.sock, selectors.EVENT_READ, slot)
+            for slot in drained:
+                try:
+                    self._selector.unregister(slot.sock)
+                except (KeyError, ValueError):
+                    pass
+                slot.sock.close()
+
+            for key, _ in self._selector.select(timeout=1.0):
+                if key.data is None:
+                    try:
+                        self._wakeup[0].recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self._drain(key.data)
+
+    def _drain(self, slot):
+        """Read every datagram waiting on slot's socket."""
+        while True:
+            try:
+                wire, source = slot.sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # ICMP unreachable surfaces here on some platforms; nothing to match it to
+                return
+            received_at = time.time()
+            if len(wire) < 2:
+                continue
+            qid = int.from_bytes(wire[:2], 'big')
+            with self._lock:
+                ticket = slot.pending.get(qid)
+                if ticket is None or source[:2] != ticket.destination[:2]:
+                    self.stats['unexpected'] += 1
+                    continue
+            try:
+                response = dns.message.from_wire(wire, raise_on_truncation=True)
+            except dns.message.Truncated as e:
+                response, error = None, e
+            except dns.exception.DNSException:
+                # Malformed or forged: keep waiting for the real answer
+                with self._lock:
+                    self.stats['unexpected'] += 1
+                continue
+            else:
+                error = None
+                if not matches_request(ticket.request, response):
+                    with self._lock:
+                        self.stats['unexpected'] += 1
+                    continue
+            with self._lock:
+                if slot.pending.get(qid) is not ticket:
+                    continue
+                del slot.pending[qid]
+                self.stats['received'] += 1
+            ticket.response = response
+            ticket.error = error
+            ticket.received_at = received_at
+            ticket.done = True
+            ticket.event.set()
+
+    def close(self):
+        """Stop the receiver thread and close every socket."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            slots = [s for group in self._slots.values() for s in group] + self._retired
+        if self._thread is not None:
+            self._poke()
+            self._thread.join(timeout=2)
+            self._selector.close()
+            for sock in self._wakeup:
+                sock.close()
+        for slot in slots:
+            slot.sock.close()
@@ -0,0 +1,90 @@
+"""
+Zone cut detection: which discovered names are zone apexes.
+
+NS, SOA, DNSSEC keys, DMARC, MTA-STS, BIMI, registration data and the
+zone-wide discovery strategies only make sense at the apex of a zone, yet
+recursion feeds them every hostname found (www, mail, api...). A single SOA
+query tells them apart: an apex answers it, any other name gets the SOA of
+its enclosing zone in the authority section. The answer goes through the
+broker, so the soa strategy reuses it.
+"""
+
+import threading
+
+import dns.exception
+import dns.name
+import dns.rdatatype
+import dns.resolver
+
+from .query_broker import get_broker
+
+
+def soa_owner(response):
+    """Zone apex named by the SOA record in a response (answer or authority), or None."""
+    for rrset in response.answer + response.authority:
+        if rrset.rdtype == dns.rdatatype.SOA:
+            return rrset.name
+    return None
+
+
+class ZoneCuts:
+    """
+    Cached zone apex of each name looked at. Apexes learned from a host's
+    answer are cached too, so each zone is asked about once.
+
+    Args:
+        resolver_obj (optional): Resolver to use (default: shared query broker)
+    """
+
+    def __init__(self, resolver_obj=None):
+        self.resolver_obj = resolver_obj
+        self._lock = threading.Lock()
+        self._zones = {}  # name -> apex (None when unknown)
+        self.stats = {'apexes': 0, 'hosts': 0, 'unknown': 0}
+
+    def _find_apex(self, name):
+        resolver_obj = self.resolver_obj or get_broker()
+        try:
+            answer = resolver_obj.resolve(name, 'SOA')
+            # Through a CNAME the SOA belongs to the alias target's zone
+            return name if answer.rrset.name == name else answer.rrset.name
+        except dns.resolver.NXDOMAIN as e:
+            response = e.kwargs.get('responses', {}).get(name)
+        except dns.resolver.NoAnswer as e:
+            response = e.kwargs.get('response')
+        except dns.exception.DNSException:
+            return None
+        return soa_owner(response) if response is not None else None
+
+    def apex(self, name):
+        """
+        Apex of the zone name belongs to.
+
+        Args:
+            name (str): Domain name
+
+        Returns:
+            str: Apex without the trailing dot, or None if it could not be found
+        """
+        qname = dns.name.from_text(name)
+        with self._lock:
+            if qname in self._zones:
+                apex = self._zones[qname]
+                return apex.to_text(omit_final_dot=True) if apex is not None else None
+
+        apex = self._find_apex(qname)
+        with self._lock:
+            if qname not in self._zones:
+                self._zones[qname] = apex
+                self.stats['unknown' if apex is None else
+                           'apexes' if apex == qname else 'hosts'] += 1
+            # A host's answer names its zone: the apex needs no query of its own
+            if apex is not None and apex not in self._zones:
+                self._zones[apex] = apex
+                self.stats['apexes'] += 1
+        return apex.to_text(omit_final_dot=True) if apex is not None else None
+
+    def is_apex(self, name):
+        """True if name is a zone apex; also True when that cannot be told (fail open)."""
+        apex = self.apex(name)
+        return apex is None or dns.name.from_text(apex) == dns.name.from_text(name)
@@ -0,0 +1,89 @@
+"""Shared helpers: canned DNS responses and a resolver pool that never touches the network."""
+
+import os
+import sys
+import threading
+import types
+
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+UPSTREAM = types.SimpleNamespace(address='192.0.2.53', port=53)
+
+
+def response(qname, rdtype='A', answer=(), soa=None, rcode=dns.rcode.NOERROR, ttl=300):
+    """
+    Response to a (qname, rdtype) query.
+
+    Args:
+        answer (iterable): Rdata texts of the answer RRset
+        soa (str, optional): Zone whose SOA goes in the authority section (negative TTL = ttl)
+    """
+    qname = dns.name.from_text(qname) if isinstance(qname, str) else qname
+    rdtype = dns.rdatatype.RdataType.make(rdtype)
+    message = dns.message.make_response(dns.message.make_query(qname, rdtype))
+    message.set_rcode(rcode)
+    if answer:
+        _add(message, message.answer, dns.rrset.from_text(qname, ttl, 'IN', rdtype, *answer))
+    if soa:
+        _add(message, message.authority, dns.rrset.from_text(
+            soa, ttl, 'IN', 'SOA', f'ns1.{soa} hostmaster.{soa} 1 7200 900 1209600 {ttl}'))
+    return message
+
+
+def _add(message, section, rrset):
+    # Through find_rrset, so the message's lookup index knows the RRset
+    message.find_rrset(section, rrset.name, rrset.rdclass, rrset.rdtype, create=True).update(rrset)
+
+
+class FakePool:
+    """
+    ResolverPool stand-in answering from handler(qname, rdtype).
+
+    Queries are recorded in sent; clear gate to hold them until it is set.
+    """
+
+    def __init__(self, handler, lifetime=2.0):
+        self.handler = handler
+        self.lifetime = lifetime
+        self.sent = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self._lock = threading.Lock()
+
+    def query(self, qname, rdtype, rdclass=1, tcp=False, lifetime=None):
+        with self._lock:
+            self.sent.append((qname.to_text(), dns.rdatatype.to_text(rdtype)))
+        self.gate.wait(5)
+        return self.handler(qname, rdtype), UPSTREAM
+
+
+class FakeClock:
+    """time.time / time.monotonic / time.sleep replacement that only moves when told to."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
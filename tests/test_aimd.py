@@ -0,0 +1,81 @@
+import pytest
+
+from packages import aimd
+from packages.aimd import AimdLimit
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(aimd, 'time', clock)
+    return clock
+
+
+def test_slow_start_adds_one_per_answer(clock):
+    limit = AimdLimit(ceiling=32, initial=4)
+    for _ in range(4):
+        limit.succeeded(0.01)
+    assert limit.limit == 8
+
+
+def test_overload_halves_and_ends_slow_start(clock):
+    limit = AimdLimit(ceiling=32, initial=16)
+    limit.overloaded()
+    assert limit.limit == 8 and not limit.slow_start
+    # Additive increase: one per limit's worth of answers
+    for _ in range(8):
+        limit.succeeded(0.01)
+    assert int(limit.limit) == 8
+    limit.succeeded(0.01)
+    assert int(limit.limit) == 9
+
+
+def test_one_burst_of_losses_counts_once(clock):
+    limit = AimdLimit(ceiling=32, initial=16)
+    limit.succeeded(0.05)
+    limit.overloaded()
+    clock.advance(0.01)  # Still within the round trip
+    limit.overloaded()
+    assert limit.limit == 8.5
+    clock.advance(0.1)
+    limit.overloaded()
+    assert limit.limit == 4.25
+    assert limit.stats['decreases'] == 2
+
+
+def test_inflated_latency_holds_the_limit(clock):
+    limit = AimdLimit(ceiling=32, initial=4)
+    limit.succeeded(0.01)
+    limit.succeeded(0.05)  # Over LATENCY_TOLERANCE x the best RTT
+    assert limit.limit == 5
+
+
+def test_limit_stays_within_floor_and_ceiling(clock):
+    limit = AimdLimit(ceiling=6, initial=4, floor=2)
+    for _ in range(10):
+        limit.succeeded()
+    assert limit.limit == 6
+    for _ in range(5):
+        clock.advance(1)
+        limit.overloaded()
+    assert limit.limit == 2
+
+
+def test_slots_follow_the_limit(clock):
+    limit = AimdLimit(ceiling=8, initial=2)
+    assert limit.try_acquire() and limit.try_acquire()
+    assert not limit.try_acquire()
+    assert not limit.acquire(timeout=0)
+    limit.release()
+    assert limit.acquire(timeout=0)
+    assert limit.stats['peak_in_flight'] == 2
+
+
+def test_history_records_limit_changes(clock):
+    limit = AimdLimit(ceiling=8, initial=2)
+    clock.advance(1)
+    limit.succeeded()
+    clock.advance(1)
+    limit.overloaded()
+    summary = limit.summary()
+    assert summary['history'] == [(0.0, 2), (1.0, 3), (2.0, 1)]
+    assert summary['peak_limit'] == 3
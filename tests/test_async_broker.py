@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import dns.rcode
+import dns.resolver
+import pytest
+
+from conftest import FakePool, response
+from packages import memo
+from packages.async_broker import AsyncQueryBroker
+from packages.deadline import Deadline, deadline_scope
+from packages.negative_cache import NegativeCache
+from packages.query_broker import QueryBroker
+from packages.resolver_pool import ResolverPool
+from packages.udp_transport import UdpTicket
+
+
+class AnsweringUdp:
+    """UDP transport answering every query at once."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, request, destination, af, event):
+        ticket = UdpTicket(request, destination, event)
+        self.sent.append(request.question[0].name.to_text())
+        ticket.response = response(request.question[0].name, answer=['192.0.2.1'])
+        ticket.received_at = time.time()
+        ticket.done = True
+        event.set()
+        return ticket
+
+    def cancel(self, ticket):
+        pass
+
+
+def test_upstream_qps_paces_async_queries():
+    udp = AnsweringUdp()
+    pool = ResolverPool(['192.0.2.1'], udp=udp, qps=20)  # Burst of 2
+    broker = AsyncQueryBroker(QueryBroker(pool, cache=dns.resolver.LRUCache()))
+
+    async def scan():
+        return await asyncio.gather(*(broker.resolve(f'h{i}.example.test') for i in range(6)))
+
+    started = time.monotonic()
+    assert len(asyncio.run(scan())) == 6
+    assert len(udp.sent) == 6
+    bucket = pool.upstreams[0].bucket
+    assert bucket.stats['acquired'] == 6 and bucket.stats['waits'] >= 3
+    assert time.monotonic() - started >= 0.15
+
+
+def test_cache_hits_bound_memoized_verdicts():
+    broker = AsyncQueryBroker(QueryBroker(ResolverPool(['192.0.2.1'], udp=AnsweringUdp()),
+                                          cache=dns.resolver.LRUCache()))
+
+    async def lookup():
+        noted = []
+        token = memo._expirations.set(noted)
+        try:
+            answer = await broker.resolve('www.example.test')
+        finally:
+            memo._expirations.reset(token)
+        return answer, noted
+
+    first, noted = asyncio.run(lookup())
+    assert noted == [first.expiration]
+    cached, noted = asyncio.run(lookup())
+    assert broker.broker.stats['cache_hits'] == 1
+    assert noted == [cached.expiration]
+
+
+# ----------------------------------------------------------------------
+# Coalescing and caches
+# ----------------------------------------------------------------------
+
+def answers(qname, rdtype):
+    if qname.to_text().startswith('nx.'):
+        return response(qname, rdtype, soa='example.test.', rcode=dns.rcode.NXDOMAIN)
+    return response(qname, rdtype, answer=['192.0.2.1'])
+
+
+@pytest.fixture
+def pool():
+    return FakePool(answers)
+
+
+@pytest.fixture
+def broker(pool):
+    return AsyncQueryBroker(QueryBroker(pool, cache=dns.resolver.LRUCache(),
+                                        negative_cache=NegativeCache()))
+
+
+def test_concurrent_identical_lookups_share_one_query(pool, broker):
+    async def scan():
+        return await asyncio.gather(*(broker.resolve('www.example.test') for _ in range(5)))
+
+    results = asyncio.run(scan())
+    assert len({id(answer) for answer in results}) == 1
+    assert pool.sent == [('www.example.test.', 'A')]
+    assert broker.broker.stats['coalesced'] == 4
+
+
+def test_nxdomain_is_answered_from_the_negative_cache(pool, broker):
+    for _ in range(2):
+        with pytest.raises(dns.resolver.NXDOMAIN):
+            asyncio.run(broker.resolve('nx.example.test'))
+    assert len(pool.sent) == 1 and broker.broker.stats['negative_hits'] == 1
+
+
+def test_cancelled_owner_leaves_waiters_a_timeout(pool, broker):
+    pool.gate.clear()
+
+    async def scan():
+        owner = asyncio.ensure_future(broker.resolve('www.example.test'))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.ensure_future(broker.resolve('www.example.test'))
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        try:
+            return await waiter
+        finally:
+            pool.gate.set()
+
+    with pytest.raises(dns.resolver.LifetimeTimeout):
+        asyncio.run(scan())
+
+
+def test_waiter_gives_up_at_its_deadline(pool, broker):
+    pool.gate.clear()
+
+    async def scan():
+        owner = asyncio.ensure_future(broker.resolve('www.example.test'))
+        await asyncio.sleep(0.05)
+        try:
+            with deadline_scope(Deadline(0.1)):
+                await broker.resolve('www.example.test')
+        finally:
+            pool.gate.set()
+            await owner
+
+    with pytest.raises(dns.resolver.LifetimeTimeout):
+        asyncio.run(scan())
+
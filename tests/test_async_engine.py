@@ -0,0 +1,73 @@
+import asyncio
+import types
+
+import pytest
+
+from packages import async_engine
+from packages.async_engine import AsyncScanEngine
+from packages.deadline import Deadline
+
+
+class Mapper:
+    """The parts of DNSMapper the engine's strategy calls use."""
+
+    def __init__(self):
+        self.args = types.SimpleNamespace(domain_timeout=None)
+        self.deadline = Deadline()
+        self.logs = []
+
+    def strategy_enabled(self, strategy, depth):
+        return strategy != 'disabled'
+
+    def strategy_params(self, strategy):
+        return ()
+
+    def run_strategy(self, strategy, target, depth, inputs):
+        return [f'{strategy} (sync) {target}']
+
+    def log(self, message, level='info'):
+        self.logs.append((level, message))
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    in_flight = []
+
+    async def probe(target):
+        in_flight.append(1)
+        engine.peak = max(engine.peak, len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return [f'probe {target}']
+
+    async def failing(target):
+        raise RuntimeError('no answer')
+
+    monkeypatch.setattr(async_engine, 'ASYNC_STRATEGIES',
+                        {'probe': probe, 'failing': failing, 'disabled': probe})
+    engine = AsyncScanEngine(Mapper(), concurrency=2)
+    engine.peak = 0
+    return engine
+
+
+def run(engine, *calls):
+    async def main():
+        engine._limit = asyncio.Semaphore(engine.concurrency)
+        return await asyncio.gather(*(engine.run_strategy(name, 'example.test') for name in calls))
+
+    return asyncio.run(main())
+
+
+def test_ported_strategies_are_awaited_and_others_shimmed(engine):
+    assert run(engine, 'probe', 'sync_only') == [['probe example.test'], ['sync_only (sync) example.test']]
+    assert engine.stats == {'coroutines': 1, 'shimmed': 1}
+
+
+def test_failing_strategy_is_logged_not_raised(engine):
+    assert run(engine, 'failing', 'disabled') == [[], []]
+    assert engine.mapper.logs[-1] == ('error', 'Error in failing: no answer')
+
+
+def test_strategy_calls_in_flight_are_bounded(engine):
+    run(engine, *['probe'] * 6)
+    assert engine.peak == 2
@@ -0,0 +1,68 @@
+import contextvars
+import threading
+
+import pytest
+
+from packages import STRATEGY_LANES
+from packages.bulkhead import Bulkheads, Lane
+
+current = contextvars.ContextVar('current', default=None)
+
+
+@pytest.fixture
+def lane():
+    lane = Lane('slow', workers=2, limits={'loadbalancer': 1})
+    yield lane
+    lane.shutdown()
+
+
+def test_limited_strategy_does_not_hold_the_whole_lane(lane):
+    release = threading.Event()
+    started = []
+
+    def call(name):
+        started.append(name)
+        if name == 'loadbalancer 1':
+            release.wait(5)
+        return name
+
+    first = lane.submit('loadbalancer', call, 'loadbalancer 1')
+    second = lane.submit('loadbalancer', call, 'loadbalancer 2')
+    other = lane.submit('mail_blacklist', call, 'mail_blacklist')
+    # The second loadbalancer call waits for the first; the other strategy goes ahead
+    assert other.result(2) == 'mail_blacklist'
+    assert not second.done()
+    release.set()
+    assert [first.result(2), second.result(2)] == ['loadbalancer 1', 'loadbalancer 2']
+    assert started[-1] == 'loadbalancer 2'
+
+
+def test_lane_errors_end_up_in_the_future(lane):
+    def fail():
+        raise RuntimeError('timed out')
+
+    with pytest.raises(RuntimeError):
+        lane.submit('mail_blacklist', fail).result(2)
+
+
+def test_lane_runs_in_the_submitters_context(lane):
+    current.set('domain deadline')
+    assert lane.submit('mail_blacklist', current.get).result(2) == 'domain deadline'
+
+
+def test_strategies_are_routed_to_their_lane(monkeypatch):
+    monkeypatch.setitem(STRATEGY_LANES, 'probe', 'slow')
+    lane = Lane('slow', workers=1)
+    bulkheads = Bulkheads({'slow': lane})
+    try:
+        assert bulkheads.lane('probe') is lane
+        assert bulkheads.lane('a') is None
+        assert bulkheads.submit('probe', threading.current_thread).result(2).name == 'dns-slow-0'
+        assert not bulkheads.submit('a', threading.current_thread).result(2).name.startswith('dns-slow')
+    finally:
+        bulkheads.shutdown()
+
+
+def test_lane_workers_are_a_quarter_of_the_threads():
+    assert Bulkheads.lane_workers(30) == 7
+    assert Bulkheads.lane_workers(4) == 2
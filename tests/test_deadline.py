@@ -0,0 +1,170 @@
+import threading
+import time
+
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import pytest
+
+from conftest import FakePool, response
+from packages import deadline as deadline_module
+from packages.deadline import Deadline, current_deadline, deadline_scope
+from packages.query_broker import QueryBroker
+from packages.resolver_pool import ResolverPool
+from packages.udp_transport import UdpTicket
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(deadline_module, 'time', clock)
+    return clock
+
+
+def test_remaining_counts_down_and_never_goes_negative(clock):
+    deadline = Deadline(10)
+    clock.advance(4)
+    assert deadline.remaining() == 6 and deadline.timeout() == 6
+    clock.advance(7)
+    assert deadline.remaining() == 0 and deadline.expired()
+
+
+def test_parent_bounds_derived_deadlines(clock):
+    scan = Deadline(5)
+    assert Deadline(60, parent=scan).remaining() == 5
+    assert Deadline(parent=scan).remaining() == 5
+    assert Deadline(2, parent=scan).remaining() == 2
+
+
+def test_no_limit_means_no_timeout():
+    assert Deadline().timeout() is None and not Deadline().expired()
+
+
+def test_clamp_shortens_lifetimes_and_refuses_once_expired(clock):
+    deadline = Deadline(3)
+    assert deadline.clamp(4) == 3 and deadline.clamp(1) == 1
+    deadline.cancel()
+    with pytest.raises(dns.resolver.LifetimeTimeout):
+        deadline.clamp(4)
+
+
+def test_scope_installs_and_restores_the_current_deadline():
+    outer, inner = Deadline(), Deadline()
+    assert current_deadline() is None
+    with deadline_scope(outer):
+        with deadline_scope(inner):
+            assert current_deadline() is inner
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_broker_clamps_the_wire_query_to_the_deadline(clock):
+    lifetimes = []
+
+    class Pool(FakePool):
+        def query(self, qname, rdtype, rdclass=1, tcp=False, lifetime=None):
+            lifetimes.append(lifetime)
+            return super().query(qname, rdtype, rdclass, tcp, lifetime)
+
+    broker = QueryBroker(Pool(lambda qname, rdtype: response(qname, rdtype, answer=['192.0.2.1'])))
+    with deadline_scope(Deadline(0.5)):
+        broker.resolve('www.example.test')
+        clock.advance(1)
+        with pytest.raises(dns.resolver.LifetimeTimeout):
+            broker.resolve('mail.example.test')
+    assert lifetimes == [0.5]
+
+
+def in_thread(target):
+    """Start target in a thread; returns (thread, outcome list filled with (result or error, seconds))."""
+    outcome = []
+
+    def run():
+        started = time.monotonic()
+        try:
+            result = target()
+        except Exception as e:
+            result = e
+        outcome.append((result, time.monotonic() - started))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_cancel_wakes_a_waiter():
+    deadline = Deadline(30)
+    thread, outcome = in_thread(lambda: deadline.wait(threading.Event()))
+    time.sleep(0.05)
+    deadline.cancel()
+    thread.join(5)
+    result, seconds = outcome[0]
+    assert result is False and seconds < 5
+
+
+def test_cancelling_the_parent_wakes_waiters_of_derived_deadlines():
+    scan = Deadline(30)
+    domain = Deadline(30, parent=scan)
+    thread, outcome = in_thread(lambda: domain.wait(threading.Event()))
+    time.sleep(0.05)
+    scan.cancel()
+    thread.join(5)
+    assert outcome[0][0] is False and domain.expired()
+
+
+def test_wait_returns_true_when_the_event_comes_first():
+    event = threading.Event()
+    event.set()
+    assert Deadline(30).wait(event)
+
+
+def test_coalesced_waiter_stops_waiting_when_its_deadline_is_cancelled():
+    pool = FakePool(lambda qname, rdtype: response(qname, rdtype, answer=['192.0.2.1']))
+    pool.gate.clear()
+    broker = QueryBroker(pool)
+    owner, owned = in_thread(lambda: broker.resolve('www.example.test'))
+    while not pool.sent:
+        time.sleep(0.01)
+
+    deadline = Deadline(30)
+
+    def wait_for_owner():
+        with deadline_scope(deadline):
+            return broker.resolve('www.example.test')
+
+    waiter, waited = in_thread(wait_for_owner)
+    time.sleep(0.05)
+    deadline.cancel()
+    waiter.join(5)
+    assert isinstance(waited[0][0], dns.resolver.LifetimeTimeout)
+
+    pool.gate.set()
+    owner.join(5)
+    assert owned[0][0].rrset is not None
+
+
+class SilentUdp:
+    """UDP transport whose queries are never answered."""
+
+    def send(self, request, destination, af, event):
+        return UdpTicket(request, destination, event)
+
+    def cancel(self, ticket):
+        pass
+
+
+def test_pool_abandons_the_wire_query_when_the_deadline_is_cancelled():
+    pool = ResolverPool(['192.0.2.1'], udp=SilentUdp(), timeout=10)
+    deadline = Deadline(30)
+
+    def query():
+        with deadline_scope(deadline):
+            return pool.query(dns.name.from_text('www.example.test'), dns.rdatatype.A,
+                              dns.rdataclass.IN)
+
+    thread, outcome = in_thread(query)
+    time.sleep(0.05)
+    deadline.cancel()
+    thread.join(5)
+    error, seconds = outcome[0]
+    assert isinstance(error, dns.resolver.LifetimeTimeout) and seconds < 5
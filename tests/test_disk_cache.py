@@ -0,0 +1,117 @@
+import struct
+
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import pytest
+
+from conftest import response
+from packages import disk_cache
+from packages.disk_cache import DiskCache
+from packages.negative_cache import NegativeCache
+
+
+def key(name, rdtype='A'):
+    return (dns.name.from_text(name), dns.rdatatype.RdataType.make(rdtype), dns.rdataclass.IN)
+
+
+def answer(name, ttl=300):
+    qname, rdtype, rdclass = key(name)
+    return dns.resolver.Answer(qname, rdtype, rdclass, response(qname, answer=['192.0.2.1'], ttl=ttl))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DiskCache(str(tmp_path / 'answers.cache'), slots=64)
+    yield cache
+    cache.close()
+
+
+def test_round_trip(cache):
+    cache.put(key('www.example.test'), answer('www.example.test'))
+    cached = cache.get(key('www.example.test'))
+    assert [rdata.to_text() for rdata in cached] == ['192.0.2.1']
+    assert cache.get(key('www.example.test', 'AAAA')) is None
+    assert cache.stats == {'hits': 1, 'misses': 1, 'stores': 1}
+
+
+def test_entries_are_shared_with_other_instances(cache):
+    cache.put(key('www.example.test'), answer('www.example.test'))
+    other = DiskCache(cache.path)
+    assert other.get(key('www.example.test')) is not None
+    other.close()
+
+
+def test_entries_expire_and_report_the_remaining_ttl(cache, clock, monkeypatch):
+    monkeypatch.setattr(disk_cache, 'time', clock)
+    stored = answer('www.example.test', ttl=300)
+    cache.put(key('www.example.test'), stored)
+
+    clock.now = stored.expiration - 100
+    assert cache.get(key('www.example.test')).rrset.ttl <= 100
+    clock.now = stored.expiration + 1
+    assert cache.get(key('www.example.test')) is None
+
+
+def test_odd_sequence_counter_hides_the_slot(cache):
+    cache.put(key('www.example.test'), answer('www.example.test'))
+    offset = cache._offset(cache._hash(key('www.example.test')), 0)
+    seq = struct.unpack_from('<I', cache._mm, offset)[0]
+    assert seq % 2 == 0
+
+    struct.pack_into('<I', cache._mm, offset, seq + 1)  # A writer is in the slot
+    assert cache.get(key('www.example.test')) is None
+    struct.pack_into('<I', cache._mm, offset, seq + 2)  # and finished
+    assert cache.get(key('www.example.test')) is not None
+
+
+def test_slot_rewritten_during_a_read_is_a_miss(cache, monkeypatch):
+    cache.put(key('www.example.test'), answer('www.example.test'))
+    offset = cache._offset(cache._hash(key('www.example.test')), 0)
+    from_wire = dns.message.from_wire
+
+    def concurrent_write(wire, *args, **kwargs):
+        seq = struct.unpack_from('<I', cache._mm, offset)[0]
+        struct.pack_into('<I', cache._mm, offset, seq + 2)
+        return from_wire(wire, *args, **kwargs)
+
+    monkeypatch.setattr(dns.message, 'from_wire', concurrent_write)
+    assert cache.get(key('www.example.test')) is None
+
+
+def test_negative_entries_are_kept_apart(cache):
+    reply = response('nx.example.test', soa='example.test.', rcode=3)
+    cache.put_negative(key('nx.example.test'), reply, answer('nx.example.test').expiration)
+    assert cache.get(key('nx.example.test')) is None
+    assert cache.get_negative(key('nx.example.test'))[0].rcode() == 3
+
+    cache.flush(key('nx.example.test'))
+    assert cache.get_negative(key('nx.example.test')) is None
+
+
+def test_expired_answers_are_not_stored(cache, clock, monkeypatch):
+    stored = answer('www.example.test')
+    monkeypatch.setattr(disk_cache, 'time', clock)
+    clock.now = stored.expiration + 1
+    cache.put(key('www.example.test'), stored)
+    assert cache.stats['stores'] == 0
+
+
+def test_negative_cache_entries_survive_in_the_store(cache):
+    qname = dns.name.from_text('dev.example.test')
+    reply = response(qname, soa='example.test.', rcode=dns.rcode.NXDOMAIN)
+    NegativeCache(store=cache).add(key('dev.example.test'),
+                                   dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: reply}))
+    NegativeCache(store=cache).add(key('www.example.test', 'AAAA'), dns.resolver.NoAnswer(
+        response=response('www.example.test', 'AAAA', soa='example.test.')))
+
+    later = NegativeCache(store=cache)
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        later.check(key('a.dev.example.test'))
+    with pytest.raises(dns.resolver.NoAnswer):
+        later.check(key('www.example.test', 'AAAA'))
+    later.check(key('www.example.test', 'A'))
+    assert later.stats['stored_hits'] == 2
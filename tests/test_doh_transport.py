@@ -0,0 +1,116 @@
+import sys
+
+import dns.exception
+import dns.message
+import dns.rdatatype
+import pytest
+
+import main
+from packages import doh_transport
+from packages.argparse_args import argparse_args
+from packages.doh_transport import DNS_MESSAGE, DohTransport
+from packages.resolver_pool import ResolverPool
+
+URL = 'https://192.0.2.53/dns-query'
+
+
+def query(name='www.example.test'):
+    return dns.message.make_query(name, dns.rdatatype.A)
+
+
+def reply(httpx, message, status=200, content_type=DNS_MESSAGE):
+    return httpx.Response(status, content=message.to_wire(), headers={'content-type': content_type})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """DoH server stand-in (httpx.MockTransport): server.handler(request) -> httpx.Response."""
+    httpx = pytest.importorskip('httpx')
+
+    class Server:
+        requests = []
+
+        @staticmethod
+        def handler(request):
+            asked = dns.message.from_wire(request.content)
+            return reply(httpx, dns.message.make_response(asked))
+
+    def dispatch(request):
+        Server.requests.append(request)
+        return Server.handler(request)
+
+    async def make_client(verify, http2):
+        return httpx.AsyncClient(transport=httpx.MockTransport(dispatch), headers={'accept': DNS_MESSAGE})
+
+    monkeypatch.setattr(DohTransport, '_make_client', staticmethod(make_client))
+    Server.httpx = httpx
+    return Server
+
+
+@pytest.fixture
+def transport(server):
+    transport = DohTransport()
+    yield transport
+    transport.close()
+
+
+def test_query_is_posted_as_a_dns_message(server, transport):
+    response = transport.query(query(), URL, 443, 2)
+    assert response.question == query().question
+    request, = server.requests
+    assert request.method == 'POST' and str(request.url) == URL
+    assert request.headers['content-type'] == DNS_MESSAGE
+    assert dns.message.from_wire(request.content).id == 0  # Cache friendly (RFC 8484)
+    assert transport.stats['queries'] == 1
+
+
+def test_http_errors_are_connection_errors(server, transport):
+    server.handler = lambda request: server.httpx.Response(503)
+    with pytest.raises(ConnectionError):
+        transport.query(query(), URL, 443, 2)
+
+
+def test_replies_that_are_not_dns_messages_are_refused(server, transport):
+    server.handler = lambda request: reply(server.httpx, query(), content_type='text/html')
+    with pytest.raises(ConnectionError):
+        transport.query(query(), URL, 443, 2)
+
+
+def test_answer_to_another_question_is_refused(server, transport):
+    server.handler = lambda request: reply(server.httpx, dns.message.make_response(query('other.test')))
+    with pytest.raises(dns.exception.FormError):
+        transport.query(query(), URL, 443, 2)
+
+
+def test_http_timeout_is_a_dns_timeout(server, transport):
+    def slow(request):
+        raise server.httpx.ReadTimeout('no answer', request=request)
+
+    server.handler = slow
+    with pytest.raises(dns.exception.Timeout):
+        transport.query(query(), URL, 443, 2)
+    assert transport.stats['errors'] == 1
+
+
+def test_bare_addresses_become_doh_urls():
+    pool = ResolverPool(['192.0.2.1', '[2001:db8::1]:8443', 'https://dns.example.test/q'],
+                        transport='https', stream=object())
+    assert [u.address for u in pool.upstreams] == [
+        'https://192.0.2.1/dns-query', 'https://[2001:db8::1]:8443/dns-query', 'https://dns.example.test/q']
+    with pytest.raises(ValueError):
+        ResolverPool(['https://dns.example.test/q'])
+
+
+@pytest.fixture
+def no_httpx(monkeypatch):
+    monkeypatch.setattr(doh_transport, 'httpx', None)
+    monkeypatch.setitem(sys.modules, 'httpx', None)  # import httpx raises ImportError
+
+
+def test_missing_httpx_is_reported_as_a_usage_error(no_httpx, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['dns_mapper', 'example.test', '--transport', 'https',
+                                      '--nameserver', '192.0.2.53', '--no-cache'])
+    with pytest.raises(SystemExit) as exited:
+        main.configure_broker(argparse_args())
+    assert exited.value.code == 2
+    assert "pip install 'httpx[http2]'" in capsys.readouterr().err
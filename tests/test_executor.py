@@ -0,0 +1,76 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from packages import executor as executor_module
+from packages.executor import BoundedExecutor, get_executor, set_executor
+
+current = contextvars.ContextVar('current', default=None)
+
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor(2)
+    yield executor
+    executor.shutdown()
+
+
+def test_tasks_run_on_workers(executor):
+    assert executor.submit(threading.current_thread).result(2).name.startswith('dns-worker')
+
+
+def test_full_budget_runs_the_task_in_the_caller(executor):
+    release = threading.Event()
+    busy = [executor.submit(release.wait, 5) for _ in range(2)]
+    try:
+        assert executor.submit(threading.current_thread).result(0) is threading.current_thread()
+        assert executor.stats['caller_runs'] == 1 and executor.stats['peak_in_flight'] == 2
+    finally:
+        release.set()
+    assert all(future.result(2) for future in busy)
+
+
+def test_caller_runs_errors_end_up_in_the_future(executor):
+    release = threading.Event()
+    for _ in range(2):
+        executor.submit(release.wait, 5)
+
+    def fail():
+        raise ValueError('bad input')
+
+    future = executor.submit(fail)
+    release.set()
+    with pytest.raises(ValueError):
+        future.result(0)
+
+
+def test_event_loop_thread_never_runs_tasks_inline(executor):
+    release = threading.Event()
+    for _ in range(2):
+        executor.submit(release.wait, 5)
+
+    async def submit_from_the_loop():
+        future = executor.submit(threading.current_thread)
+        assert not future.done()  # Queued for a worker, the loop keeps running
+        release.set()
+        return await asyncio.wrap_future(future)
+
+    assert asyncio.run(submit_from_the_loop()) is not threading.current_thread()
+    assert executor.stats['caller_runs'] == 0
+
+
+def test_workers_see_the_submitters_context(executor):
+    current.set('scan deadline')
+    assert executor.submit(current.get).result(2) == 'scan deadline'
+
+
+def test_set_executor_replaces_the_shared_one(monkeypatch):
+    monkeypatch.setattr(executor_module, '_executor', None)
+    first = get_executor()
+    assert get_executor() is first and first.max_workers == executor_module.DEFAULT_WORKERS
+    replacement = BoundedExecutor(4)
+    set_executor(replacement)
+    assert get_executor() is replacement
+    replacement.shutdown()
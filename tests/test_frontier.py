@@ -0,0 +1,68 @@
+import sys
+
+import pytest
+
+import main
+from packages.argparse_args import argparse_args
+
+
+@pytest.fixture
+def mapper(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['dns_mapper', 'example.test', '--depth', '2', '-q'])
+    return main.DNSMapper(argparse_args())
+
+
+def taken(mapper, limit=100):
+    return mapper._take_frontier(limit)[0]
+
+
+def test_best_scored_targets_come_first(mapper):
+    mapper._discover('domain', 'host.ptr.example.test', 1, 'ptr')
+    mapper._discover('domain', 'mail.example.test', 1, 'mx')
+    mapper._discover('domain', 'www.example.test', 1, 'txt')
+    mapper._discover('domain', 'ns.example.test', 2, 'ns')
+    assert [target for _, target, _ in taken(mapper)] == [
+        'mail.example.test', 'ns.example.test', 'www.example.test', 'host.ptr.example.test']
+
+
+def test_out_of_scope_names_go_last(mapper):
+    mapper._discover('domain', 'ns1.provider.net', 1, 'ns')
+    mapper._discover('domain', 'host.example.test', 1, 'txt')
+    assert [target for _, target, _ in taken(mapper)] == ['host.example.test', 'ns1.provider.net']
+
+
+def test_ties_keep_discovery_order(mapper):
+    for name in ('c', 'a', 'b'):
+        mapper._discover('domain', f'{name}.example.test', 1, 'ns')
+    assert [target for _, target, _ in taken(mapper)] == [
+        'c.example.test', 'a.example.test', 'b.example.test']
+
+
+def test_known_and_too_deep_targets_are_not_queued(mapper):
+    mapper._discover('domain', 'example.test', 1, 'ns')  # The scan target itself
+    mapper._discover('ip', '192.0.2.1', 1, 'mx')
+    mapper._discover('ip', '192.0.2.1', 1, 'mx')
+    mapper._discover('domain', 'deep.example.test', 3, 'ns')
+    assert taken(mapper) == [('ip', '192.0.2.1', 1)]
+
+
+def test_at_most_max_per_strategy_per_kind_and_depth(mapper):
+    mapper.args.max_per_strategy = 2
+    for i in range(3):
+        mapper._discover('domain', f'host{i}.example.test', 1, 'ns')
+        mapper._discover('ip', f'192.0.2.{i}', 1, 'ns')
+        mapper._discover('domain', f'deeper{i}.example.test', 2, 'ns')
+    items = taken(mapper)
+    for kind, depth in (('domain', 1), ('ip', 1), ('domain', 2)):
+        assert sum(1 for k, _, d in items if (k, d) == (kind, depth)) == 2
+    assert not mapper.frontier
+
+
+def test_take_respects_the_limit_and_signals_new_discoveries(mapper):
+    for i in range(3):
+        mapper._discover('domain', f'host{i}.example.test', 1, 'ns')
+    items, signal = mapper._take_frontier(2)
+    assert len(items) == 2 and len(mapper.frontier) == 1
+    assert not signal.done()
+    mapper._discover('domain', 'late.example.test', 1, 'ns')
+    assert signal.done()
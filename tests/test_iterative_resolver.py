@@ -0,0 +1,159 @@
+import types
+
+import dns.flags
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdataclass
+import dns.rdatatype
+import dns.rrset
+import pytest
+
+from packages.iterative_resolver import IterativeResolver
+
+N = dns.name.from_text
+
+# Zone -> (server address, records {(name, type): [rdata]}, delegations {child: ([ns], {ns: address})})
+ZONES = {
+    '.': ('192.0.2.1', {}, {
+        'test.': (['ns.nic.test.'], {'ns.nic.test.': '192.0.2.2'}),
+    }),
+    'test.': ('192.0.2.2', {
+        ('example.test.', 'DS'): ['12345 13 2 ' + '0' * 64],
+    }, {
+        'example.test.': (['ns1.example.test.'], {'ns1.example.test.': '192.0.2.3'}),
+        'glueless.test.': (['ns.example.test.'], {}),  # Its server's address is only in example.test
+    }),
+    'example.test.': ('192.0.2.3', {
+        ('www.example.test.', 'A'): ['192.0.2.80'],
+        ('ns.example.test.', 'A'): ['192.0.2.4'],
+        ('alias.example.test.', 'CNAME'): ['host.glueless.test.'],
+    }, {}),
+    'glueless.test.': ('192.0.2.4', {
+        ('host.glueless.test.', 'A'): ['192.0.2.81'],
+    }, {}),
+}
+
+
+def add(message, section, name, rdtype, *rdatas):
+    rrset = dns.rrset.from_text(name, 3600, 'IN', rdtype, *rdatas)
+    message.find_rrset(section, rrset.name, rrset.rdclass, rrset.rdtype, create=True).update(rrset)
+
+
+def authoritative(zone, records, delegations):
+    """Answers of an authoritative server for zone: referrals, answers, CNAMEs, NODATA, NXDOMAIN."""
+    def answer(request):
+        question = request.question[0]
+        qname, rdtype = question.name, dns.rdatatype.to_text(question.rdtype)
+        response = dns.message.make_response(request)
+        response.flags &= ~dns.flags.RA
+        for child, (servers, glue) in delegations.items():
+            # DS belongs to the parent side of the cut: answered here, not referred
+            if qname.is_subdomain(N(child)) and not (qname == N(child) and rdtype == 'DS'):
+                add(response, response.authority, child, 'NS', *servers)
+                for server, address in glue.items():
+                    add(response, response.additional, server, 'A', address)
+                return response
+        response.flags |= dns.flags.AA
+        key = (qname.to_text(), rdtype)
+        if key in records:
+            add(response, response.answer, qname, rdtype, *records[key])
+        elif (qname.to_text(), 'CNAME') in records:
+            add(response, response.answer, qname, 'CNAME', *records[(qname.to_text(), 'CNAME')])
+        else:
+            if not any(name == qname.to_text() for name, _ in records) and qname != N(zone):
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            add(response, response.authority, zone, 'SOA', f'ns.{zone} hostmaster.{zone} 1 7200 900 1209600 300')
+        return response
+    return answer
+
+
+SERVERS = {address: authoritative(zone, records, delegations)
+           for zone, (address, records, delegations) in ZONES.items()}
+
+
+class AuthPool:
+    """ResolverPool stand-in for one zone: queries go to the in-memory server of its first address."""
+
+    def __init__(self, addresses, sent):
+        self.upstreams = [types.SimpleNamespace(address=address, port=53, sent=0) for address in addresses]
+        self.sent = sent
+        self.stats = {}
+
+    def query(self, qname, rdtype, rdclass, tcp=False, lifetime=None, rd=True):
+        upstream = self.upstreams[0]
+        assert not rd  # Authoritative servers are asked without recursion
+        self.sent.append((upstream.address, qname.to_text(), dns.rdatatype.to_text(rdtype)))
+        return SERVERS[upstream.address](dns.message.make_query(qname, rdtype, rdclass)), upstream
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def resolver(monkeypatch, sent):
+    monkeypatch.setattr(IterativeResolver, '_new_pool', lambda self, addresses: AuthPool(addresses, sent))
+    return IterativeResolver(root_hints=['192.0.2.1'])
+
+
+def resolve(resolver, name, rdtype='A'):
+    response, _ = resolver.query(N(name), dns.rdatatype.from_text(rdtype), dns.rdataclass.IN)
+    return response
+
+
+def test_referrals_are_followed_down_from_the_root(resolver, sent):
+    response = resolve(resolver, 'www.example.test')
+    assert response.answer[0].to_text().endswith('A 192.0.2.80')
+    assert response.flags & dns.flags.RA
+    assert [address for address, _, _ in sent] == ['192.0.2.1', '192.0.2.2', '192.0.2.3']
+    assert resolver.stats['referrals'] == 2
+
+
+def test_known_zone_cuts_are_asked_directly(resolver, sent):
+    resolve(resolver, 'www.example.test')
+    del sent[:]
+    assert resolve(resolver, 'nope.example.test').rcode() == dns.rcode.NXDOMAIN
+    assert sent == [('192.0.2.3', 'nope.example.test.', 'A')]
+    assert resolver.stats['zone_cache_hits'] >= 1
+
+
+def test_glueless_nameservers_are_looked_up(resolver, sent):
+    response = resolve(resolver, 'host.glueless.test')
+    assert response.answer[0].to_text().endswith('A 192.0.2.81')
+    assert resolver.stats['glueless'] == 1
+    assert ('192.0.2.3', 'ns.example.test.', 'A') in sent
+    assert sent[-1] == ('192.0.2.4', 'host.glueless.test.', 'A')
+
+
+def test_ds_is_asked_at_the_parent(resolver, sent):
+    resolve(resolver, 'www.example.test')  # example.test's own servers are known now
+    del sent[:]
+    response = resolve(resolver, 'example.test', 'DS')
+    assert response.answer[0].rdtype == dns.rdatatype.DS
+    assert sent == [('192.0.2.2', 'example.test.', 'DS')]
+
+
+def test_cname_into_another_zone_is_chased_and_spliced(resolver):
+    response = resolve(resolver, 'alias.example.test')
+    assert [dns.rdatatype.to_text(rrset.rdtype) for rrset in response.answer] == ['CNAME', 'A']
+    chain = response.resolve_chaining()
+    assert chain.canonical_name == N('host.glueless.test') and chain.answer is not None
+    assert resolver.stats['cnames'] == 1
+
+
+def test_nodata_is_returned_without_answer(resolver):
+    response = resolve(resolver, 'www.example.test', 'AAAA')
+    assert response.rcode() == dns.rcode.NOERROR and not response.answer
+    assert response.authority[0].rdtype == dns.rdatatype.SOA
+
+
+def test_root_hints_are_read_from_a_named_root_file(tmp_path):
+    hints = tmp_path / 'named.root'
+    hints.write_text('; root hints\n'
+                     '.                        3600000      NS    A.ROOT-SERVERS.NET.\n'
+                     'A.ROOT-SERVERS.NET.      3600000      A     198.41.0.4\n'
+                     'A.ROOT-SERVERS.NET.      3600000      AAAA  2001:503:ba3e::2:30\n')
+    assert IterativeResolver.load_root_hints(str(hints)) == ['198.41.0.4', '2001:503:ba3e::2:30']
+    assert IterativeResolver.load_root_hints('192.0.2.1, 192.0.2.2') == ['192.0.2.1', '192.0.2.2']
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from packages import memo
+from packages.memo import Memo, note_expiration
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(memo, 'time', clock)
+    return clock
+
+
+def test_value_is_computed_once(clock):
+    cache = Memo()
+    calls = []
+    for _ in range(3):
+        assert cache.get('asn', '192.0.2.1', lambda: calls.append(1) or 'AS64500') == 'AS64500'
+    assert len(calls) == 1
+    assert cache.summary() == {'asn': {'hits': 2, 'misses': 1, 'coalesced': 0, 'expired': 0}}
+
+
+def test_entry_expires_with_the_earliest_answer_it_used(clock):
+    cache = Memo(default_ttl=300)
+
+    def compute():
+        note_expiration(clock.now + 60)
+        note_expiration(clock.now + 30)
+        return 'listed'
+
+    cache.get('dnsbl', '192.0.2.1', compute)
+    clock.advance(29)
+    assert cache.get('dnsbl', '192.0.2.1', lambda: 'recomputed') == 'listed'
+    clock.advance(2)
+    assert cache.get('dnsbl', '192.0.2.1', lambda: 'recomputed') == 'recomputed'
+    assert cache.summary()['dnsbl']['expired'] == 1
+
+
+def test_entry_without_answers_lives_default_ttl(clock):
+    cache = Memo(default_ttl=300)
+    cache.get('dnsbl', '192.0.2.1', lambda: 'clean')
+    clock.advance(299)
+    assert cache.get('dnsbl', '192.0.2.1', lambda: 'recomputed') == 'clean'
+    clock.advance(2)
+    assert cache.get('dnsbl', '192.0.2.1', lambda: 'recomputed') == 'recomputed'
+
+
+def test_nested_entries_bound_the_outer_one(clock):
+    cache = Memo()
+
+    def inner():
+        note_expiration(clock.now + 10)
+        return 'AS64500'
+
+    cache.get('asn', '192.0.2.1', inner)
+    # A later verdict built on the cached one inherits its expiration
+    cache.get('provider', '192.0.2.1', lambda: cache.get('asn', '192.0.2.1', inner) + ' (Example)')
+    clock.advance(11)
+    assert cache.get('provider', '192.0.2.1', lambda: 'recomputed') == 'recomputed'
+
+
+def test_none_and_errors_are_not_remembered(clock):
+    def fail():
+        raise RuntimeError('lookup failed')
+
+    cache = Memo()
+    assert cache.get('asn', '192.0.2.1', lambda: None) is None
+    with pytest.raises(RuntimeError):
+        cache.get('asn', '192.0.2.2', fail)
+    assert cache.get('asn', '192.0.2.1', lambda: 'AS64500') == 'AS64500'
+    assert cache.get('asn', '192.0.2.2', lambda: 'AS64501') == 'AS64501'
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = Memo()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'AS64500'
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get('asn', '192.0.2.1', compute)))
+               for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.summary()['asn']['coalesced'] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1 and results == ['AS64500'] * 4
+
+
+def test_values_refused_by_keep_reach_the_caller_but_are_not_remembered(clock):
+    cache = Memo()
+    partial = cache.get('dnsbl', '192.0.2.1', lambda: ([], ['SpamCop']), keep=lambda value: not value[1])
+    assert partial == ([], ['SpamCop'])
+    assert cache.get('dnsbl', '192.0.2.1', lambda: ([], []), keep=lambda value: not value[1]) == ([], [])
+    assert cache.get('dnsbl', '192.0.2.1', lambda: 'recomputed') == ([], [])
@@ -0,0 +1,102 @@
+import dns.name
+import dns.rcode
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import pytest
+
+from conftest import response
+from packages import negative_cache
+from packages.negative_cache import NegativeCache
+
+
+def key(name, rdtype='A'):
+    return (dns.name.from_text(name), dns.rdatatype.RdataType.make(rdtype), dns.rdataclass.IN)
+
+
+def nxdomain(name, ttl=300):
+    qname = dns.name.from_text(name)
+    reply = response(qname, soa='example.test.', rcode=dns.rcode.NXDOMAIN, ttl=ttl)
+    return dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: reply})
+
+
+def nodata(name, rdtype, ttl=300):
+    return dns.resolver.NoAnswer(response=response(name, rdtype, soa='example.test.', ttl=ttl))
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(negative_cache, 'time', clock)
+    return clock
+
+
+def test_nxdomain_cuts_every_name_below_it(clock):
+    cache = NegativeCache()
+    cache.add(key('dev.example.test'), nxdomain('dev.example.test'))
+
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        cache.check(key('dev.example.test', 'TXT'))
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        cache.check(key('a.b.dev.example.test'))
+    cache.check(key('example.test'))  # The parent may exist
+    cache.check(key('www.example.test'))  # So may siblings
+    assert cache.stats['nxdomain_hits'] == 1
+    assert cache.stats['cut_hits'] == 1
+
+
+def test_nxdomain_cut_can_be_disabled(clock):
+    cache = NegativeCache(nxdomain_cut=False)
+    cache.add(key('dev.example.test'), nxdomain('dev.example.test'))
+    cache.check(key('a.dev.example.test'))
+
+
+def test_no_cut_from_a_tld(clock):
+    cache = NegativeCache()
+    qname = dns.name.from_text('test')
+    reply = response(qname, soa='example.test.', rcode=dns.rcode.NXDOMAIN)
+    cache.add(key('test'), dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: reply}))
+    cache.check(key('example.test'))
+
+
+def test_entries_expire_with_the_negative_ttl(clock):
+    cache = NegativeCache()
+    cache.add(key('dev.example.test'), nxdomain('dev.example.test', ttl=60))
+    clock.advance(59)
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        cache.check(key('dev.example.test'))
+    clock.advance(2)
+    cache.check(key('dev.example.test'))
+
+
+def test_negative_ttl_is_capped(clock):
+    cache = NegativeCache(max_ttl=100)
+    cache.add(key('dev.example.test'), nxdomain('dev.example.test', ttl=86400))
+    clock.advance(101)
+    cache.check(key('dev.example.test'))
+
+
+def test_nodata_only_covers_its_type(clock):
+    cache = NegativeCache()
+    cache.add(key('www.example.test', 'AAAA'), nodata('www.example.test', 'AAAA'))
+    with pytest.raises(dns.resolver.NoAnswer):
+        cache.check(key('www.example.test', 'AAAA'))
+    cache.check(key('www.example.test', 'A'))
+    cache.check(key('a.www.example.test', 'AAAA'))
+
+
+def test_responses_without_soa_are_not_cached(clock):
+    cache = NegativeCache()
+    qname = dns.name.from_text('dev.example.test')
+    reply = response(qname, rcode=dns.rcode.NXDOMAIN)
+    cache.add(key('dev.example.test'), dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: reply}))
+    cache.add(key('www.example.test', 'MX'),
+              dns.resolver.NoAnswer(response=response('www.example.test', 'MX')))
+    cache.check(key('dev.example.test'))
+    cache.check(key('www.example.test', 'MX'))
+
+
+def test_other_errors_are_ignored(clock):
+    cache = NegativeCache()
+    cache.add(key('dev.example.test'), dns.resolver.LifetimeTimeout(timeout=1, errors=[]))
+    cache.check(key('dev.example.test'))
+
@@ -0,0 +1,70 @@
+import argparse
+
+import pytest
+
+from packages import STRATEGIES
+from packages.planner import ESSENTIAL, ScanPlanner
+
+ESSENTIALS = ['ns', 'soa', 'mx', 'txt', 'spf']
+EXTRAS = ['loadbalancer', 'mail_blacklist', 'ttl', 'tlsa']
+
+
+@pytest.fixture
+def planner():
+    return ScanPlanner(ESSENTIALS + EXTRAS, depth=2, max_results=100, threads=30)
+
+
+def test_targets_grow_with_depth_and_are_capped_by_max_results(planner):
+    assert planner.targets(0) == {'domains': 1, 'apexes': 1, 'ips': 2}
+    assert planner.targets(2) == {'domains': 21, 'apexes': 7, 'ips': 42}
+    capped = ScanPlanner(ESSENTIALS, depth=2, max_results=30, threads=30).targets(2)
+    assert capped['domains'] + capped['ips'] == 30
+
+
+def test_unknown_strategies_are_left_out():
+    assert ScanPlanner(['ns', 'subdomains'], 1, 100, 30).strategies == ['ns']
+
+
+def test_no_budget_keeps_the_full_scan(planner):
+    plan = planner.plan()
+    assert plan.depth == 2 and plan.dropped == []
+    assert plan.queries == planner.estimate(2, planner.strategies).queries
+
+
+@pytest.mark.parametrize('budget', [300, 150, 40])
+def test_query_budget_is_respected(planner, budget):
+    plan = planner.plan(query_budget=budget)
+    assert plan.queries <= budget
+    assert set(plan.dropped) <= set(EXTRAS)
+
+
+def test_less_valuable_strategies_are_dropped_first(planner):
+    plan = planner.plan(query_budget=300)
+    assert plan.depth == 2
+    assert sorted(plan.dropped) == sorted(EXTRAS)
+    assert all(STRATEGIES.plugin(name).value < ESSENTIAL for name in plan.dropped)
+
+
+def test_depth_is_given_up_before_essential_strategies(planner):
+    plan = planner.plan(query_budget=150)
+    assert plan.depth == 1
+    assert not set(ESSENTIALS) & set(plan.dropped)
+
+
+def test_time_budget_is_respected(planner):
+    plan = planner.plan(time_budget=1)
+    assert plan.duration <= 1
+    assert plan.depth < 2
+
+
+def test_depth_zero_takes_whatever_fits(planner):
+    plan = planner.plan(query_budget=5)
+    assert plan.depth == 0 and plan.queries <= 5
+    assert plan.dropped
+
+
+def test_apply_sets_depth_and_disables_dropped(planner):
+    args = argparse.Namespace(depth=2)
+    planner.plan(query_budget=150).apply(args)
+    assert args.depth == 1
+    assert args.disable_loadbalancer and args.disable_mail_blacklist
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+import pytest
+
+from conftest import FakePool, response
+from packages.negative_cache import NegativeCache
+from packages.query_broker import QueryBroker
+
+
+def answers(qname, rdtype):
+    name = qname.to_text()
+    if name.startswith('nx.') or '.nx.' in name:
+        return response(qname, rdtype, soa='example.test.', rcode=dns.rcode.NXDOMAIN)
+    if rdtype == dns.rdatatype.AAAA:
+        return response(qname, rdtype, soa='example.test.')  # NODATA
+    return response(qname, rdtype, answer=['192.0.2.1'])
+
+
+@pytest.fixture
+def pool():
+    return FakePool(answers)
+
+
+@pytest.fixture
+def broker(pool):
+    return QueryBroker(pool, cache=dns.resolver.LRUCache(), negative_cache=NegativeCache())
+
+
+def test_concurrent_identical_queries_share_one_wire_query(pool, broker):
+    pool.gate.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(broker.resolve('www.example.test', 'A')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while broker.stats['coalesced'] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert pool.sent == [('www.example.test.', 'A')]
+    assert broker.stats['coalesced'] == 4
+    assert len(results) == 5 and all(answer is results[0] for answer in results)
+
+
+def test_cached_answer_is_not_sent_again(pool, broker):
+    first = broker.resolve('www.example.test', 'A')
+    second = broker.resolve('www.example.test.', 'A')
+    assert second is first
+    assert len(pool.sent) == 1
+    assert broker.stats['cache_hits'] == 1
+
+
+def test_use_cache_false_goes_to_the_wire(pool, broker):
+    broker.resolve('www.example.test', 'A')
+    broker.resolve('www.example.test', 'A', use_cache=False)
+    assert len(pool.sent) == 2
+
+
+def test_nxdomain_is_answered_from_the_negative_cache(pool, broker):
+    for _ in range(2):
+        with pytest.raises(dns.resolver.NXDOMAIN):
+            broker.resolve('nx.example.test', 'A')
+    # A different type of the same name, and a name below it, are known missing too
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        broker.resolve('nx.example.test', 'MX')
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        broker.resolve('a.b.nx.example.test', 'A')
+
+    assert pool.sent == [('nx.example.test.', 'A')]
+    assert broker.stats['negative_hits'] == 3
+
+
+def test_nodata_is_cached_per_type(pool, broker):
+    for _ in range(2):
+        with pytest.raises(dns.resolver.NoAnswer):
+            broker.resolve('www.example.test', 'AAAA')
+    broker.resolve('www.example.test', 'A')
+    assert pool.sent == [('www.example.test.', 'AAAA'), ('www.example.test.', 'A')]
+
+
+def test_coalesced_waiters_get_the_owners_error(pool, broker):
+    pool.gate.clear()
+    errors = []
+
+    def lookup():
+        try:
+            broker.resolve('nx.example.test', 'A')
+        except dns.resolver.NXDOMAIN as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while broker.stats['coalesced'] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 3
+    assert len(pool.sent) == 1
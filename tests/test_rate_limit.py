@@ -0,0 +1,172 @@
+import threading
+
+import dns.name
+import dns.rdatatype
+import dns.resolver
+import pytest
+
+from conftest import FakePool, response
+from packages import rate_limit
+from packages.negative_cache import NegativeCache
+from packages.query_broker import QueryBroker
+from packages.rate_limit import TokenBucket, ZoneRateLimiter
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.advance(0.15)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_bucket_never_holds_more_than_burst(clock):
+    bucket = TokenBucket(rate=10, burst=2)
+    clock.advance(60)
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def test_default_burst_is_a_tenth_of_the_rate(clock):
+    assert TokenBucket(rate=50).burst == 5
+    assert TokenBucket(rate=2).burst == 1
+
+
+def test_waiters_reserve_successive_tokens(clock, monkeypatch):
+    monkeypatch.setattr(clock, 'sleep', clock.slept.append)  # Callers all waiting at once
+    bucket = TokenBucket(rate=10, burst=1)
+    assert all(bucket.acquire() for _ in range(3))
+    assert clock.slept == [pytest.approx(0.1), pytest.approx(0.2)]
+    assert bucket.stats['waits'] == 2
+
+
+def test_acquire_gives_up_without_consuming_past_timeout(clock):
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.acquire()
+    assert not bucket.acquire(timeout=0.05)
+    assert bucket.tokens == 0
+    assert bucket.acquire(timeout=0.2)
+    assert clock.slept == [pytest.approx(0.1)]
+
+
+# ----------------------------------------------------------------------
+# Zone limiter
+# ----------------------------------------------------------------------
+
+ZONES = {
+    'com.': ['a.gtld-servers.net.'],
+    'beta.com.': ['ns.beta.com.'],
+    'gamma.com.': ['ns.shared.net.'],
+    'delta.com.': ['ns.shared.net.'],
+}
+
+
+def zone_answers(qname, rdtype):
+    apex = max((dns.name.from_text(zone) for zone in ZONES if qname.is_subdomain(dns.name.from_text(zone))),
+               key=len)
+    if rdtype == dns.rdatatype.SOA:
+        if qname == apex:
+            # The SOA is the answer at the apex itself
+            return response(qname, 'SOA', answer=[f'ns1.{apex} hostmaster.{apex} 1 7200 900 1209600 300'])
+        return response(qname, 'SOA', soa=apex.to_text())
+    if rdtype == dns.rdatatype.NS and qname == apex:
+        return response(qname, 'NS', answer=ZONES[apex.to_text()])
+    if rdtype == dns.rdatatype.A:
+        return response(qname, rdtype, answer=['192.0.2.1'])
+    return response(qname, rdtype, soa=apex.to_text())  # NODATA
+
+
+@pytest.fixture
+def pool():
+    return FakePool(zone_answers)
+
+
+@pytest.fixture
+def limiter():
+    return ZoneRateLimiter(10, burst=1)
+
+
+@pytest.fixture
+def broker(pool, limiter):
+    return QueryBroker(pool, cache=dns.resolver.LRUCache(), negative_cache=NegativeCache(),
+                       zone_limiter=limiter)
+
+
+def zone_key(limiter, name, broker):
+    return sorted(limiter.zone_key(dns.name.from_text(name), broker))
+
+
+def test_zones_below_a_tld_get_their_own_bucket(limiter, broker):
+    assert zone_key(limiter, 'nope.com', broker) == ['a.gtld-servers.net.']
+    assert zone_key(limiter, 'beta.com', broker) == ['ns.beta.com.']
+    assert zone_key(limiter, 'www.beta.com', broker) == ['ns.beta.com.']
+
+
+def test_zones_on_the_same_nameservers_share_a_bucket(limiter, broker):
+    assert zone_key(limiter, 'gamma.com', broker) == zone_key(limiter, 'delta.com', broker)
+
+
+def test_names_up_to_the_apex_are_learned_from_one_soa(limiter, broker, pool):
+    zone_key(limiter, 'a.b.gamma.com', broker)
+    sent = len(pool.sent)
+    assert zone_key(limiter, 'b.gamma.com', broker) == ['ns.shared.net.']
+    assert zone_key(limiter, 'gamma.com', broker) == ['ns.shared.net.']
+    assert len(pool.sent) == sent
+    # A sibling still needs its own SOA query, but not the NS query again
+    zone_key(limiter, 'x.b.gamma.com', broker)
+    assert pool.sent[sent:] == [('x.b.gamma.com.', 'SOA')]
+
+
+def test_discovery_reuses_cached_answers(limiter, broker, pool):
+    with pytest.raises(dns.resolver.NoAnswer):
+        broker.resolve('www.beta.com', 'SOA')  # The apex check made it already
+    del pool.sent[:]
+    zone_key(limiter, 'www.beta.com', broker)
+    assert pool.sent == [('beta.com.', 'NS')]
+
+
+def test_discovery_queries_are_charged_to_the_zone(clock, monkeypatch, broker, pool):
+    monkeypatch.setattr(clock, 'sleep', clock.slept.append)
+    broker.resolve('www.beta.com', 'A')
+    assert pool.sent == [('www.beta.com.', 'SOA'), ('beta.com.', 'NS'), ('www.beta.com.', 'A')]
+    stats, = broker.zone_limiter.summary()
+    assert stats['acquired'] == 3
+    # Burst of 1 at 10 qps: the A query waits for the two discovery queries
+    assert clock.slept == [pytest.approx(0.2)]
+
+
+def test_soa_and_ns_of_unknown_zones_are_not_held(clock, broker, pool):
+    broker.resolve('beta.com', 'NS')
+    with pytest.raises(dns.resolver.NoAnswer):
+        broker.resolve('mail.beta.com', 'SOA')
+    assert pool.sent == [('beta.com.', 'NS'), ('mail.beta.com.', 'SOA')]
+    assert clock.slept == [] and broker.zone_limiter.summary() == []
+
+
+def test_concurrent_discoveries_finish(pool):
+    pool.gate.clear()
+    broker = QueryBroker(pool, cache=dns.resolver.LRUCache(), negative_cache=NegativeCache(),
+                         zone_limiter=ZoneRateLimiter(1000))
+    queries = [(name, rdtype) for name in ('www.beta.com', 'beta.com', 'mail.gamma.com')
+               for rdtype in ('A', 'SOA', 'NS', 'MX')]
+
+    def lookup(name, rdtype):
+        try:
+            broker.resolve(name, rdtype)
+        except dns.resolver.NoAnswer:
+            pass
+
+    threads = [threading.Thread(target=lookup, args=query, daemon=True) for query in queries * 2]
+    for thread in threads:
+        thread.start()
+    pool.gate.set()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+    # Every lookup reached the wire once, discovery included
+    assert len(pool.sent) == len(set(pool.sent))
@@ -0,0 +1,56 @@
+import pytest
+
+from packages.records import IP, Finding, Host, Record, discoveries, plain
+
+
+def test_host_names_are_normalized_and_interned():
+    first, second = Host('WWW.Example.Test.'), Host('www.example.test')
+    assert first == second and first.name == 'www.example.test'
+    assert first.name is second.name
+
+
+@pytest.mark.parametrize('text', ['localhost', 'v=spf1 include:example.test', '-bad.example.test',
+                                  'example.123', 'a..example.test', ''])
+def test_host_parse_rejects_what_is_not_a_host_name(text):
+    assert Host.parse(text) is None
+
+
+def test_host_parse_accepts_service_labels():
+    assert Host.parse('_dmarc.Example.Test.') == Host('_dmarc.example.test')
+
+
+def test_ip_is_canonical():
+    assert IP('2001:DB8:0:0::1').address == '2001:db8::1'
+    assert IP('192.0.2.1').version == 4
+    assert IP.parse('not an ip') is None
+
+
+def test_record_discoveries_are_its_host_and_the_host_ips():
+    mx = Record('example.test', 'MX', Host('mail.example.test', ['192.0.2.25']), 300, priority=10)
+    txt = Record('example.test', 'TXT', 'mail.example.test is not crawled from text')
+    assert discoveries([mx, txt]) == [Host('mail.example.test'), IP('192.0.2.25')]
+
+
+def test_finding_discoveries_are_its_hosts_then_ips():
+    finding = Finding('example.test', {'provider': 'Example CDN'},
+                      hosts=['edge.cdn.test', 'not a host'], ips=['192.0.2.7', 'nope'])
+    assert discoveries(finding) == [Host('edge.cdn.test'), IP('192.0.2.7')]
+
+
+def test_discoveries_are_deduplicated_in_order():
+    results = [IP('192.0.2.1'), Host('a.example.test', ['192.0.2.1']), Host('A.example.test.'),
+               Record('example.test', 'A', IP('192.0.2.2')), 'b.example.test']
+    assert discoveries(results) == [IP('192.0.2.1'), Host('a.example.test'), IP('192.0.2.2')]
+
+
+def test_empty_finding_is_false():
+    assert not Finding('example.test', {})
+    assert Finding('example.test', {}, hosts=['ns1.example.test'])
+
+
+def test_plain_output():
+    mx = Record('example.test', 'MX', Host('mail.example.test', ['192.0.2.25']), 300, priority=10)
+    assert plain([mx]) == [{'type': 'MX', 'value': 'mail.example.test', 'ips': ['192.0.2.25'],
+                            'ttl': 300, 'priority': 10}]
+    assert plain(Finding('192.0.2.1', {'asn': 64500, 'neighbors': [Host('x.example.test')]})) == {
+        '192.0.2.1': {'asn': 64500, 'neighbors': ['x.example.test']}}
@@ -0,0 +1,103 @@
+import sys
+import types
+from importlib import metadata
+
+import pytest
+
+from packages.registry import LazyRegistry, Plugin
+
+
+async def probe_async(domain):
+    return []
+
+
+@pytest.fixture
+def unimported(monkeypatch):
+    """A stdlib module taken out of sys.modules, to see when it gets imported."""
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    return 'colorsys'
+
+
+def test_entries_are_imported_on_first_lookup(unimported):
+    registry = LazyRegistry([Plugin('hls', 'colorsys:rgb_to_hls'), Plugin('hsv', 'colorsys:rgb_to_hsv')])
+    assert 'hls' in registry and sorted(registry) == ['hls', 'hsv']
+    assert unimported not in sys.modules
+    assert registry['hls'](1, 1, 1) == (0.0, 1.0, 0.0)
+    assert unimported in sys.modules
+
+
+def test_async_view_only_lists_coroutine_versions():
+    plugins = [Plugin('probe', 'colorsys:rgb_to_hls', async_target=probe_async),
+               Plugin('sync_only', 'colorsys:rgb_to_hsv')]
+    registry = LazyRegistry(plugins, attribute='load_async')
+    assert list(registry) == ['probe'] and 'sync_only' not in registry
+    assert registry['probe'] is probe_async
+    with pytest.raises(KeyError):
+        registry['sync_only']
+
+
+def test_plugin_metadata():
+    plugin = Plugin('mx', '.scan_mx:scan_mx', ('MX', 'A'), cost='fast', scope='apex')
+    assert plugin.queries == 2
+    with pytest.raises(ValueError):
+        Plugin('bad', 'x:y', cost='expensive')
+    with pytest.raises(ValueError):
+        Plugin('bad', 'x:y', scope='everywhere')
+
+
+def entry(name, loaded):
+    def load():
+        if isinstance(loaded, Exception):
+            raise loaded
+        return loaded
+    return types.SimpleNamespace(name=name, load=load)
+
+
+class EntryPoints(list):
+    """Installed entry points, recording the groups they are read for."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def __call__(self, group=None):
+        self.calls.append(group)
+        return list(self)
+
+
+@pytest.fixture
+def entry_points(monkeypatch):
+    found = EntryPoints()
+    monkeypatch.setattr(metadata, 'entry_points', found)
+    return found
+
+
+def test_entry_points_add_strategies_once(entry_points):
+    def my_check(domain):
+        return ['checked']
+
+    entry_points.extend([entry('my_check', my_check),
+                         entry('described', Plugin('described', my_check, ('TXT',), scope='apex')),
+                         entry('mx', lambda domain: ['not the built-in'])])
+    registered = []
+    registry = LazyRegistry([Plugin('mx', 'colorsys:rgb_to_hls')], group='dns_recon.strategies',
+                            on_register=registered.append)
+    assert registry['my_check']('example.test') == ['checked']
+    assert registry.plugin('described').scope == 'apex'
+    assert registry['mx'] is not entry_points[2].load()  # Built-ins win
+    assert sorted(registry) == ['described', 'mx', 'my_check']
+    assert entry_points.calls == ['dns_recon.strategies']
+    assert [plugin.name for plugin in registered] == ['mx', 'my_check', 'described']
+
+
+def test_broken_entry_point_is_skipped_with_a_warning(entry_points):
+    entry_points.append(entry('broken', ImportError('missing dependency')))
+    registry = LazyRegistry([], group='dns_recon.strategies')
+    with pytest.warns(UserWarning, match='broken'):
+        assert 'broken' not in registry
+
+
+def test_built_in_strategies_are_registered():
+    from packages import STRATEGIES, STRATEGY_LANES
+    assert 'mx' in STRATEGIES and STRATEGIES.plugin('mx').record_types
+    assert STRATEGY_LANES['mail_blacklist'] != 'fast'
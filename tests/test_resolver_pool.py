@@ -0,0 +1,130 @@
+import time
+
+import dns.message
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import pytest
+
+from packages.resolver_pool import ResolverPool, RttEstimator, SharedUpstreams, Upstream
+from packages.udp_transport import UdpTicket
+
+
+def test_timeout_is_max_before_any_sample():
+    assert RttEstimator(0.1, 2).timeout() == 2
+
+
+def test_first_sample_sets_srtt_and_half_variance():
+    rtt = RttEstimator(0.01, 2)
+    rtt.observe(0.1)
+    assert rtt.srtt == 0.1 and rtt.rttvar == 0.05
+    assert rtt.timeout() == pytest.approx(0.3)  # SRTT + 4 * RTTVAR
+
+
+def test_later_samples_are_smoothed():
+    rtt = RttEstimator(0.01, 2)
+    rtt.observe(0.1)
+    rtt.observe(0.2)
+    assert rtt.rttvar == pytest.approx(0.75 * 0.05 + 0.25 * 0.1)
+    assert rtt.srtt == pytest.approx(0.875 * 0.1 + 0.125 * 0.2)
+
+
+def test_timeout_is_clamped():
+    rtt = RttEstimator(0.1, 2)
+    rtt.observe(0.001)
+    assert rtt.timeout() == 0.1
+    rtt.observe(5)
+    assert rtt.timeout() == 2
+
+
+def test_backoff_doubles_until_the_next_sample():
+    rtt = RttEstimator(0.01, 10)
+    rtt.observe(0.1)
+    rtt.timed_out()
+    rtt.timed_out()
+    assert rtt.timeout() == pytest.approx(1.2)
+    rtt.observe(0.1)
+    assert rtt.backoff == 1
+
+
+def test_udp_and_tcp_are_estimated_apart():
+    upstream = Upstream('192.0.2.1')
+    assert upstream.latency is None
+    upstream.rtt['tcp'].observe(0.2)
+    assert upstream.latency == 0.2
+    upstream.rtt['udp'].observe(0.05)
+    assert upstream.latency == 0.05
+    assert upstream.summary(0)['timeout_ms'] == {'udp': 150, 'tcp': 600}
+
+
+def test_pools_share_upstreams():
+    shared = SharedUpstreams()
+    first = ResolverPool(['192.0.2.1', '192.0.2.2'], shared=shared)
+    second = ResolverPool(['192.0.2.2:53'], shared=shared)
+    assert second.upstreams[0] is first.upstreams[1]
+
+
+def test_latency_window_is_bounded():
+    pool = ResolverPool(['192.0.2.1'])
+    for i in range(pool.LATENCY_WINDOW + 100):
+        pool._latencies.append(i / 1000)
+        pool._unhedged_latencies.append(i / 1000)
+    assert len(pool._latencies) == pool.LATENCY_WINDOW
+    assert pool.latency_report()['p50_ms'] == pytest.approx(100 + pool.LATENCY_WINDOW // 2)
+
+
+class SilentPrimaryUdp:
+    """UDP transport where the first query sent goes unanswered and the second answers at once."""
+
+    def __init__(self):
+        self.tickets = []
+        self.cancelled = []
+
+    def send(self, request, destination, af, event):
+        ticket = UdpTicket(request, destination, event)
+        self.tickets.append(ticket)
+        if len(self.tickets) == 2:
+            answer(ticket)
+        return ticket
+
+    def cancel(self, ticket):
+        self.cancelled.append(ticket)
+
+
+def answer(ticket, at=None):
+    ticket.response = dns.message.make_response(ticket.request)
+    ticket.received_at = at or time.time()
+    ticket.done = True
+    ticket.event.set()
+
+
+@pytest.fixture
+def hedged_pool():
+    udp = SilentPrimaryUdp()
+    pool = ResolverPool(['192.0.2.1', '192.0.2.2'], udp=udp, hedge=True)
+    pool._rtt_samples.extend([0.005] * pool.HEDGE_MIN_SAMPLES)
+    return pool, udp
+
+
+def test_unhedged_latency_is_when_the_primary_really_answered(hedged_pool):
+    pool, udp = hedged_pool
+    start = time.time()
+    pool.query(dns.name.from_text('www.example.test'), dns.rdatatype.A, dns.rdataclass.IN)
+    assert pool.stats['hedge_wins'] == 1
+    primary = udp.tickets[0]
+    assert primary not in udp.cancelled  # Still listening for the primary
+
+    answer(primary, at=start + 0.3)
+    report = pool.latency_report()
+    assert report['p99_ms'] < 300
+    assert report['p99_unhedged_ms'] == pytest.approx(300, abs=20)
+    assert primary in udp.cancelled
+
+
+def test_primary_still_out_counts_as_a_lower_bound(hedged_pool):
+    pool, udp = hedged_pool
+    pool.query(dns.name.from_text('www.example.test'), dns.rdatatype.A, dns.rdataclass.IN)
+    time.sleep(0.05)
+    latencies, unhedged = pool.latency_samples()
+    assert unhedged[0] >= 0.05 > latencies[0]
+    assert udp.tickets[0] not in udp.cancelled
@@ -0,0 +1,65 @@
+import threading
+
+from packages.result_store import ResultStore, ShardedSet
+
+
+def hammer(target, threads=8):
+    """Run target(i) on several threads at once."""
+    start = threading.Barrier(threads)
+
+    def run(i):
+        start.wait()
+        target(i)
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+
+
+def test_only_one_thread_wins_an_add():
+    visited = ShardedSet(shards=4)
+    winners = []
+    hammer(lambda i: [winners.append(i) for name in range(200) if visited.add(f'h{name}.example.test')])
+    assert len(winners) == 200 and len(visited) == 200
+
+
+def test_set_contains_and_keeps_initial_items():
+    visited = ShardedSet(['example.test', '192.0.2.1'])
+    assert 'example.test' in visited and 'www.example.test' not in visited
+    assert not visited.add('example.test')
+    assert sorted(visited) == ['192.0.2.1', 'example.test']
+
+
+def test_iteration_while_adding_never_fails():
+    visited = ShardedSet(range(100))
+    seen = []
+    for item in visited:
+        if item < 1000:
+            visited.add(item + 1000)  # May or may not be seen by this loop
+        seen.append(item)
+    assert set(range(100)) <= set(seen) and len(visited) == 200
+
+
+def test_counter_never_loses_an_update():
+    store = ResultStore(shards=4)
+    hammer(lambda i: [store.add(f'strategy{n % 5}', [i]) for n in range(500)])
+    assert store.count == 8 * 500
+    assert sum(len(items) for items in store.snapshot().values()) == 8 * 500
+
+
+def test_keys_keep_first_seen_order_and_weight_counts():
+    store = ResultStore()
+    assert store.add('mx', ['mail.example.test']) == 1
+    assert store.add('ns', ['ns1.example.test', 'ns2.example.test'], weight=0) == 1
+    store.add('mx', ['mx2.example.test'])
+    assert store.keys() == ['mx', 'ns']
+    assert store.snapshot()['mx'] == ['mail.example.test', 'mx2.example.test']
+
+
+def test_filter_drops_results():
+    store = ResultStore()
+    store.add('a', ['192.0.2.1', '10.0.0.1'])
+    store.filter(lambda result: not result.startswith('10.'))
+    assert store.snapshot() == {'a': ['192.0.2.1']}
@@ -0,0 +1,68 @@
+import dns.name
+import dns.resolver
+import pytest
+
+from conftest import response
+from packages import memo
+from packages.memo import Memo
+from packages.scan_mail_blacklist import BLACKLISTS, scan_mail_blacklist
+from packages.records import Host, Record
+
+MX = [Record('example.test', 'MX', Host('mail.example.test', ['192.0.2.25']), 300, priority=10)]
+
+
+class DnsblResolver:
+    """Answers DNSBL lookups: listed on 'listed', a failure on 'failing', NXDOMAIN elsewhere."""
+
+    def __init__(self, listed=(), failing=()):
+        self.listed = listed
+        self.failing = failing
+        self.asked = 0
+
+    def resolve(self, qname, rdtype='A'):
+        self.asked += 1
+        name = dns.name.from_text(qname)
+        dnsbl = qname.split('.', 4)[4]
+        if dnsbl in self.failing:
+            raise dns.resolver.LifetimeTimeout(timeout=2.0, errors=[])
+        if dnsbl in self.listed and rdtype == 'A':
+            return dns.resolver.Answer(name, 1, 1, response(name, answer=['127.0.0.2']))
+        if dnsbl in self.listed:
+            raise dns.resolver.NoAnswer()
+        raise dns.resolver.NXDOMAIN(qnames=[name])
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo(monkeypatch):
+    monkeypatch.setattr(memo, '_memo', Memo())
+
+
+def server(resolver):
+    return scan_mail_blacklist('example.test', resolver, mx=MX).data['mail_servers'][0]
+
+
+def test_only_nxdomain_means_not_listed():
+    result = server(DnsblResolver(listed=['cbl.abuseat.org'], failing=['bl.spamcop.net']))
+    assert result['listed_on'] == ['Composite Blocking List']
+    assert result['blacklists_failed'] == ['SpamCop']
+    assert result['blacklists_checked'] == len(BLACKLISTS) - 1
+    assert result['blacklists_clean'] == len(BLACKLISTS) - 2
+
+
+def test_verdict_with_failed_lookups_is_not_memoized():
+    failing = DnsblResolver(failing=['zen.spamhaus.org'])
+    server(failing)
+    recovered = DnsblResolver()
+    result = server(recovered)
+    assert recovered.asked == len(BLACKLISTS)
+    assert result['clean'] and result['blacklists_failed'] is None
+
+    server(recovered)  # Complete now: remembered
+    assert recovered.asked == len(BLACKLISTS)
+
+
+def test_nothing_answered_is_unknown_not_clean():
+    result = server(DnsblResolver(failing=list(BLACKLISTS)))
+    assert result['reputation'] == 'UNKNOWN' and not result['clean']
+    assert scan_mail_blacklist('example.test', DnsblResolver(failing=list(BLACKLISTS)),
+                               mx=MX).data['overall_status'] == 'UNKNOWN'
@@ -0,0 +1,61 @@
+import pytest
+
+from packages import STRATEGY_INPUTS
+from packages.strategy_graph import StrategyGraph
+
+
+@pytest.fixture(autouse=True)
+def inputs(monkeypatch):
+    # report reads the records and the servers; servers reads the records; audit the shared addresses
+    monkeypatch.setitem(STRATEGY_INPUTS, 'report', {'records': 'records', 'servers': 'servers'})
+    monkeypatch.setitem(STRATEGY_INPUTS, 'servers', {'records': 'records'})
+    monkeypatch.setitem(STRATEGY_INPUTS, 'audit', {'addresses': 'addresses'})
+
+
+def run(graph):
+    """Node completion order, finishing every ready node in turn."""
+    order = []
+    ready = graph.ready()
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        ready.extend(graph.done(node, [node]))
+    return order
+
+
+def test_producers_run_before_their_consumers():
+    graph = StrategyGraph({'report': 'report', 'servers': 'servers', 'records': 'records'},
+                          lambda name: True)
+    assert run(graph) == ['records', 'servers', 'report']
+    assert graph.inputs('report') == {'records': ['records'], 'servers': ['servers']}
+
+
+def test_empty_results_are_passed_as_none():
+    graph = StrategyGraph({'servers': 'servers', 'records': 'records'}, lambda name: True)
+    assert graph.ready() == ['records']
+    assert graph.done('records', []) == ['servers']
+    assert graph.inputs('servers') == {'records': None}
+
+
+def test_missing_producer_is_not_waited_for():
+    graph = StrategyGraph({'servers': 'servers'}, lambda name: True)
+    assert graph.ready() == ['servers']
+    assert graph.inputs('servers') == {'records': None}
+
+
+def test_disabled_strategy_waits_for_nothing():
+    graph = StrategyGraph({'report': 'report', 'records': 'records'},
+                          lambda name: name != 'report')
+    assert sorted(graph.ready()) == ['records', 'report']
+
+
+def test_shared_inputs_become_nodes_of_their_own():
+    graph = StrategyGraph({'audit': 'audit'}, lambda name: True)
+    assert graph.is_shared('addresses') and not graph.is_shared('audit')
+    assert run(graph) == ['addresses', 'audit']
+
+
+def test_nodes_start_once():
+    graph = StrategyGraph({'servers': 'servers', 'records': 'records'}, lambda name: True)
+    assert graph.ready() == ['records']
+    assert graph.ready() == []
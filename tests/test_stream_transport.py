@@ -0,0 +1,129 @@
+import socket
+import struct
+import threading
+
+import dns.exception
+import dns.message
+import dns.rdatatype
+import pytest
+
+from packages.stream_transport import StreamTransport
+
+
+def query(name='www.example.test'):
+    return dns.message.make_query(name, dns.rdatatype.A)
+
+
+def read_message(conn):
+    header = conn.recv(2, socket.MSG_WAITALL)
+    if len(header) < 2:
+        return None
+    return dns.message.from_wire(conn.recv(struct.unpack('!H', header)[0], socket.MSG_WAITALL))
+
+
+def write_message(conn, message):
+    wire = message.to_wire()
+    conn.sendall(struct.pack('!H', len(wire)) + wire)
+
+
+@pytest.fixture
+def server():
+    """
+    Loopback DNS-over-TCP server. server.batch queries are read before
+    answering them in reverse order; server.answer=False reads without
+    answering; server.close_after closes each connection after that many answers.
+    """
+    listener = socket.create_server(('127.0.0.1', 0))
+    state = threading.Event()
+
+    def handle(conn):
+        answered = 0
+        with conn:
+            while True:
+                batch = []
+                while len(batch) < server.batch:
+                    request = read_message(conn)
+                    if request is None:
+                        return
+                    batch.append(request)
+                if not server.answer:
+                    continue
+                for request in reversed(batch):
+                    write_message(conn, dns.message.make_response(request))
+                    answered += 1
+                if server.close_after and answered >= server.close_after:
+                    return
+
+    def accept():
+        while not state.is_set():
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            server.accepted += 1
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+    server = threading.Thread(target=accept, daemon=True)
+    server.address = listener.getsockname()
+    server.accepted, server.batch, server.answer, server.close_after = 0, 1, True, None
+    server.start()
+    yield server
+    state.set()
+    listener.close()
+
+
+@pytest.fixture
+def transport():
+    transport = StreamTransport()
+    yield transport
+    transport.close()
+
+
+def ask(transport, server, request=None, timeout=2):
+    return transport.query(request or query(), *server.address, timeout)
+
+
+def test_queries_reuse_one_connection(transport, server):
+    for _ in range(5):
+        assert ask(transport, server).question == query().question
+    assert server.accepted == 1
+    assert transport.stats['connections'] == 1 and transport.stats['reused'] == 4
+
+
+def test_pipelined_answers_are_matched_by_id(transport, server):
+    server.batch = 3
+    results = {}
+
+    def lookup(name):
+        results[name] = ask(transport, server, query(name))
+
+    names = [f'h{i}.example.test' for i in range(3)]
+    threads = [threading.Thread(target=lookup, args=(name,)) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert {name: results[name].question[0].name.to_text() for name in names} == \
+        {name: name + '.' for name in names}
+    assert server.accepted == 1
+
+
+def test_no_answer_times_out(transport, server):
+    server.answer = False
+    with pytest.raises(dns.exception.Timeout):
+        ask(transport, server, timeout=0.2)
+
+
+def test_connection_closed_while_idle_is_reopened(transport, server):
+    server.close_after = 1
+    ask(transport, server)
+    assert ask(transport, server).question == query().question
+    assert server.accepted == 2
+
+
+def test_unreachable_server_raises_oserror(transport):
+    listener = socket.create_server(('127.0.0.1', 0))
+    address = listener.getsockname()
+    listener.close()
+    with pytest.raises(OSError):
+        transport.query(query(), *address, 1)
@@ -0,0 +1,139 @@
+import socket
+import threading
+
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import pytest
+
+from packages.udp_transport import UdpTransport, matches_request
+
+
+def query(name='www.example.test'):
+    return dns.message.make_query(name, dns.rdatatype.A)
+
+
+@pytest.fixture
+def server():
+    """Loopback responder: server.reply(request) -> list of wire datagrams (default: one plain answer)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(0.1)
+    state = {'stop': False}
+
+    def serve():
+        while not state['stop']:
+            try:
+                wire, source = sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            for reply in server.reply(dns.message.from_wire(wire)):
+                sock.sendto(reply, source)
+
+    server = threading.Thread(target=serve, daemon=True)
+    server.address = sock.getsockname()
+    server.reply = lambda request: [dns.message.make_response(request).to_wire()]
+    server.start()
+    yield server
+    state['stop'] = True
+    server.join(1)
+    sock.close()
+
+
+@pytest.fixture
+def transport():
+    transport = UdpTransport(sockets=2)
+    yield transport
+    transport.close()
+
+
+def send(transport, server, request):
+    event = threading.Event()
+    ticket = transport.send(request, server.address, socket.AF_INET, event)
+    assert event.wait(2)
+    return ticket
+
+
+def test_matches_request():
+    request = query()
+    response = dns.message.make_response(request)
+    assert matches_request(request, response)
+    assert not matches_request(request, dns.message.make_response(query('other.example.test')))
+    response.flags &= ~dns.flags.QR
+    assert not matches_request(request, response)
+    bare = dns.message.make_response(request)
+    bare.question = []
+    bare.set_rcode(dns.rcode.SERVFAIL)
+    assert matches_request(request, bare)
+
+
+def test_answer_reaches_its_ticket(transport, server):
+    request = query()
+    ticket = send(transport, server, request)
+    assert ticket.done and ticket.error is None
+    assert ticket.response.id == ticket.qid == request.id
+    assert ticket.received_at is not None
+    assert transport.stats['sent'] == transport.stats['received'] == 1
+
+
+def test_concurrent_queries_share_the_sockets(transport, server):
+    event = threading.Event()
+    tickets = [transport.send(query(f'h{i}.example.test'), server.address, socket.AF_INET, event)
+               for i in range(20)]
+    for _ in range(50):
+        if all(ticket.done for ticket in tickets):
+            break
+        event.wait(0.1)
+        event.clear()
+    assert all(ticket.response.question == ticket.request.question for ticket in tickets)
+    assert len({ticket.slot for ticket in tickets}) <= 2
+
+
+def test_replies_to_another_question_are_ignored(transport, server):
+    def forged_first(request):
+        forged = dns.message.make_response(query('evil.example.test'))
+        forged.id = request.id
+        return [forged.to_wire(), dns.message.make_response(request).to_wire()]
+
+    server.reply = forged_first
+    ticket = send(transport, server, query())
+    assert ticket.response.question == ticket.request.question
+    assert transport.stats['unexpected'] == 1
+
+
+def test_truncated_answer_is_reported(transport, server):
+    def truncated(request):
+        response = dns.message.make_response(request)
+        response.flags |= dns.flags.TC
+        return [response.to_wire()]
+
+    server.reply = truncated
+    ticket = send(transport, server, query())
+    assert isinstance(ticket.error, dns.message.Truncated) and ticket.response is None
+
+
+def test_cancelled_ticket_is_never_answered(transport, server):
+    server.reply = lambda request: []
+    event = threading.Event()
+    ticket = transport.send(query(), server.address, socket.AF_INET, event)
+    transport.cancel(ticket)
+    assert ticket.qid not in ticket.slot.pending
+    assert not event.wait(0.1) and not ticket.done
+
+
+def test_sockets_are_replaced_after_rotate_after_queries(server):
+    transport = UdpTransport(sockets=1, rotate_after=1)
+    try:
+        first = send(transport, server, query())
+        second = send(transport, server, query())
+        assert first.slot is not second.slot
+        assert transport.stats['rotated'] == 1
+    finally:
+        transport.close()
+
+
+def test_closed_transport_refuses_to_send(transport, server):
+    transport.close()
+    with pytest.raises(OSError):
+        transport.send(query(), server.address, socket.AF_INET, threading.Event())
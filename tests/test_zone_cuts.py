@@ -0,0 +1,73 @@
+import dns.name
+import dns.rcode
+import dns.resolver
+import pytest
+
+from conftest import FakePool, response
+from packages.query_broker import QueryBroker
+from packages.zone_cuts import ZoneCuts, soa_owner
+
+SOA = 'ns1.example.test. hostmaster.example.test. 1 7200 900 1209600 300'
+
+
+def soa_answers(qname, rdtype):
+    name = qname.to_text()
+    if name == 'example.test.':
+        return response(qname, 'SOA', answer=[SOA])
+    if name == 'www.alias.test.':
+        # CNAME to a zone apex: the answer's SOA belongs to the target
+        reply = response(qname, 'SOA')
+        target = dns.name.from_text('cdn.provider.test')
+        for rrset in (response(qname, 'CNAME', answer=['cdn.provider.test.']).answer[0],
+                      response(target, 'SOA', answer=[SOA]).answer[0]):
+            reply.find_rrset(reply.answer, rrset.name, rrset.rdclass, rrset.rdtype, create=True).update(rrset)
+        return reply
+    if name.startswith('broken.'):
+        raise dns.resolver.NoNameservers()
+    if name.startswith('nx.'):
+        return response(qname, 'SOA', soa='example.test.', rcode=dns.rcode.NXDOMAIN)
+    return response(qname, 'SOA', soa='example.test.')  # NODATA below the apex
+
+
+@pytest.fixture
+def pool():
+    return FakePool(soa_answers)
+
+
+@pytest.fixture
+def cuts(pool):
+    return ZoneCuts(QueryBroker(pool, cache=dns.resolver.LRUCache()))
+
+
+def test_apex_answers_its_own_soa(cuts):
+    assert cuts.apex('example.test') == 'example.test'
+    assert cuts.is_apex('example.test.')
+
+
+def test_host_learns_its_zone_from_the_authority_soa(cuts, pool):
+    assert cuts.apex('www.example.test') == 'example.test'
+    assert not cuts.is_apex('www.example.test')
+    # The apex came with the host's answer: no query of its own
+    assert cuts.is_apex('example.test')
+    assert pool.sent == [('www.example.test.', 'SOA')]
+    assert cuts.stats == {'apexes': 1, 'hosts': 1, 'unknown': 0}
+
+
+def test_missing_name_still_names_its_zone(cuts):
+    assert cuts.apex('nx.example.test') == 'example.test'
+
+
+def test_soa_through_a_cname_belongs_to_the_target(cuts):
+    assert cuts.apex('www.alias.test') == 'cdn.provider.test'
+
+
+def test_unknown_zone_fails_open(cuts, pool):
+    assert cuts.apex('broken.example.test') is None
+    assert cuts.is_apex('broken.example.test')
+    cuts.apex('broken.example.test')
+    assert len(pool.sent) == 1 and cuts.stats['unknown'] == 1
+
+
+def test_soa_owner():
+    assert soa_owner(response('www.example.test', soa='example.test.')) == dns.name.from_text('example.test')
+    assert soa_owner(response('www.example.test', answer=['192.0.2.1'])) is None